@@ -0,0 +1,188 @@
+"""ASGI entry point.
+
+Serves the hot read routes -- post listings (including ``?slug=``) and
+comment threads -- from native coroutines on an async engine, and hands
+every other request to the regular Flask app through ``WsgiToAsgi``. One
+process can then hold thousands of idle or slow connections on the read
+path instead of one per worker thread. PostgreSQL additionally needs
+``asyncpg``. Run it under an ASGI server:
+
+    cd server && uvicorn asgi:app --port 5555
+"""
+# Standard library imports
+import os
+import re
+from urllib.parse import parse_qsl
+
+# Remote library imports
+from asgiref.wsgi import WsgiToAsgi
+from sqlalchemy.ext.asyncio import create_async_engine
+from werkzeug.http import generate_etag, http_date, parse_etags, quote_etag
+
+# Local imports
+import cache
+from config import create_app, db
+from controllers.posts import POST_SORTS
+from counters import cached_counts, counts_statement, remember_counts
+from dbtuning import install_pragmas
+from likebuffer import buffer as like_buffer
+from likes import liked_comment_ids_async
+from models import Comment, Post
+from pagination import InvalidPage, make_page, page_window
+from serializers import COMMENT_SCHEMA, POST_SCHEMA, dumps
+
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+}
+
+# Query parameters the async post listing understands; anything else
+# (search, the legacy postId filter, an unknown sort) goes to the Flask view.
+POST_FILTERS = {
+    'userId': Post.user_id,
+    'category': Post.category,
+    'slug': Post.slug,
+}
+POST_ARGS = set(POST_FILTERS) | {'limit', 'cursor', 'before', 'startIndex', 'order', 'sort'}
+
+
+class Response:
+    def __init__(self, body, status=200, headers=None):
+        self.body = body
+        self.status = status
+        self.headers = headers or {}
+
+    async def send(self, scope, send):
+        headers = {'content-type': 'application/json', 'content-length': str(len(self.body))}
+        headers.update(self.headers)
+        await send({
+            'type': 'http.response.start',
+            'status': self.status,
+            'headers': [(name.encode('latin-1'), value.encode('latin-1')) for name, value in headers.items()],
+        })
+        await send({'type': 'http.response.body', 'body': self.body if scope['method'] != 'HEAD' else b''})
+
+
+def error(message, status):
+    return Response(dumps({'error': message}), status)
+
+
+class AsyncReads:
+    """ASGI app: async handlers for the read routes, Flask for the rest."""
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.fallback = WsgiToAsgi(flask_app)
+        with flask_app.app_context():
+            url = db.engine.url
+        self.engine = create_async_engine(url.set(drivername=ASYNC_DRIVERS[url.get_backend_name()]))
+        install_pragmas(self.engine.sync_engine, flask_app.config['DB_PROFILE'])
+        self.routes = [
+            (re.compile(r'/api/posts'), self.list_posts),
+            (re.compile(r'/api/comments/(?P<post_id>\d+)'), self.comment_thread),
+        ]
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        if scope['type'] == 'http' and scope['method'] in ('GET', 'HEAD'):
+            for pattern, handler in self.routes:
+                match = pattern.fullmatch(scope['path'])
+                if match:
+                    response = await self.dispatch(handler, scope, match.groupdict())
+                    if response is not None:
+                        return await response.send(scope, send)
+                    break
+        return await self.fallback(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def dispatch(self, handler, scope, params):
+        params_list = parse_qsl(scope['query_string'].decode('latin-1'))
+        headers = {name.decode('latin-1'): value.decode('latin-1') for name, value in scope['headers']}
+        try:
+            response = await handler(scope, dict(params_list), params_list, headers, **params)
+        except InvalidPage as e:
+            response = error(str(e), 400)
+        except Exception as e:
+            response = error(str(e), 500)
+        if response is not None and 'origin' in headers:
+            # Same answer Flask-CORS gives with its defaults.
+            response.headers['access-control-allow-origin'] = '*'
+        return response
+
+    async def list_posts(self, scope, args, params_list, headers):
+        sort = args.get('sort', 'updated')
+        if not set(args) <= POST_ARGS or sort not in POST_SORTS:
+            return None
+
+        key = cache.make_key('posts', scope['path'], params_list)
+        entry = cache.backend.get(key)
+        if entry is None:
+            stmt = POST_SCHEMA.select()
+            for name, column in POST_FILTERS.items():
+                if args.get(name):
+                    stmt = stmt.where(column == args[name])
+            window = page_window(stmt, POST_SORTS[sort], Post.id, args, args.get('order') != 'asc')
+
+            async with self.engine.connect() as conn:
+                page = make_page((await conn.execute(window.query)).all(), window, POST_SORTS[sort], Post.id)
+                counts = cached_counts('posts')
+                if counts is None:
+                    counts = remember_counts('posts', (await conn.execute(counts_statement('posts'))).one())
+
+            body = dumps({
+                'posts': POST_SCHEMA.dump_rows(page.items),
+                'totalPosts': counts.total,
+                'lastMonthPosts': counts.last_month,
+                'nextCursor': page.next_cursor,
+                'prevCursor': page.prev_cursor,
+            }) + b'\n'
+            timestamps = [row.updated_at for row in page.items if row.updated_at]
+            entry = cache.CachedResponse(
+                body, 'application/json', generate_etag(body), max(timestamps) if timestamps else None
+            )
+            cache.backend.set(key, entry)
+
+        response_headers = {'etag': quote_etag(entry.etag)}
+        if entry.last_modified:
+            response_headers['last-modified'] = http_date(entry.last_modified)
+        # Weak comparison over the whole list, as Werkzeug does for the Flask views.
+        if parse_etags(headers.get('if-none-match')).contains_weak(entry.etag):
+            return Response(b'', 304, response_headers)
+        return Response(entry.body, 200, response_headers)
+
+    async def comment_thread(self, scope, args, params_list, headers, post_id):
+        # Same payload as controllers.comments.get_post_comments.
+        stmt = (
+            COMMENT_SCHEMA.select()
+            .where(Comment.post_id == int(post_id))
+            .order_by(Comment.created_at.desc())
+        )
+        user_id = int(args['userId']) if args.get('userId', '').isdigit() else None
+        async with self.engine.connect() as conn:
+            rows = (await conn.execute(stmt)).all()
+            liked = await liked_comment_ids_async(conn, user_id, [row.id for row in rows])
+
+        return Response(dumps(like_buffer.merge([{
+            'id': row.id,
+            'content': row.content,
+            'postId': row.post_id,
+            'userId': row.user_id,
+            'parentId': row.parent_id,
+            'numberOfLikes': row.number_of_likes,
+            'likedByUser': row.id in liked,
+            'createdAt': row.created_at,
+            'updatedAt': row.updated_at,
+        } for row in rows], user_id)) + b'\n')
+
+
+app = AsyncReads(create_app(LIKE_BUFFER=os.environ.get('LIKE_BUFFER', 'memory')))
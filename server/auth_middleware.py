@@ -0,0 +1,112 @@
+# Standard library imports
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+# Remote library imports
+import jwt
+from flask import current_app, request
+
+# Local imports
+from config import db
+from models import User
+
+DEFAULT_CACHE_SIZE = 10000
+
+
+class TokenCache:
+    """Bounded LRU of verified JWT claims, keyed by a hash of the token.
+
+    Entries are dropped once the token's ``exp`` passes, so a hit never
+    returns claims that ``jwt.decode`` would have rejected for expiry.
+    """
+
+    def __init__(self, max_entries=DEFAULT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, claims = entry
+            if expires <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return claims
+
+    def set(self, key, claims):
+        with self._lock:
+            self._entries[key] = (claims.get('exp', 0), claims)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenCache()
+
+
+class CurrentUser:
+    """The signed-in user as seen by the views.
+
+    ``id`` and ``is_admin`` come straight from the token, which is all the
+    permission checks need. Any other attribute loads the ``User`` row on
+    first use.
+    """
+
+    is_authenticated = True
+
+    def __init__(self, claims):
+        self.id = claims['id']
+        self.is_admin = bool(claims.get('isAdmin'))
+        self._record = None
+
+    @property
+    def record(self):
+        if self._record is None:
+            self._record = db.session.get(User, self.id)
+        return self._record
+
+    def __getattr__(self, name):
+        return getattr(self.record, name)
+
+
+class AnonymousUser:
+    id = None
+    is_admin = False
+    is_authenticated = False
+
+
+def verify_token(token):
+    """Return the token's claims, or ``None`` if it is invalid or expired."""
+    key = hashlib.sha256(token.encode('utf-8')).digest()
+    claims = token_cache.get(key)
+    if claims is not None:
+        return claims
+    try:
+        claims = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
+    except jwt.PyJWTError:
+        return None
+    if 'id' not in claims:
+        return None
+    token_cache.set(key, claims)
+    return claims
+
+
+def _load_user():
+    token = request.cookies.get('access_token')
+    claims = verify_token(token) if token else None
+    request.user = CurrentUser(claims) if claims else AnonymousUser()
+
+
+def init_app(app):
+    token_cache.max_entries = app.config.get('TOKEN_CACHE_SIZE', DEFAULT_CACHE_SIZE)
+    app.before_request(_load_user)
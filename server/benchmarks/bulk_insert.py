@@ -0,0 +1,110 @@
+"""Throughput of the bulk create endpoints against one insert per request.
+
+Creates ``--rows`` users, posts and comments in a throwaway SQLite file,
+first one ``POST`` per row through the single-item endpoints, then through
+``/users/bulk``, ``/posts/bulk`` and ``/comments/bulk`` (as a JSON array,
+or NDJSON with ``--ndjson``), and prints rows/s for each:
+
+    cd server && python -m benchmarks.bulk_insert --rows 5000 --rounds 4
+"""
+# Standard library imports
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+# Remote library imports
+
+# Local imports
+
+
+def timed(label, rows, fn):
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    print(f'  {label:<22}{rows:>8} rows {elapsed:>8.2f}s {rows / elapsed:>12,.0f} rows/s')
+    return rows / elapsed
+
+
+def post_each(client, path, items):
+    for item in items:
+        response = client.post(path, json=item)
+        if response.status_code != 201:
+            raise SystemExit(f'{path} failed ({response.status_code}): {response.get_data()[:200]!r}')
+
+
+def post_bulk(client, path, items, ndjson):
+    if ndjson:
+        body = '\n'.join(json.dumps(item) for item in items)
+        response = client.post(path, data=body, content_type='application/x-ndjson')
+    else:
+        response = client.post(path, json=items)
+    if response.status_code != 201:
+        raise SystemExit(f'{path} failed ({response.status_code}): {response.get_data()[:500]!r}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=2000, help='Rows of each kind per mode.')
+    parser.add_argument('--rounds', type=int, default=4, help='bcrypt cost for the created users.')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Hashing pool size.')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='Rows per bulk INSERT transaction.')
+    parser.add_argument('--ndjson', action='store_true', help='Send bulk bodies as NDJSON.')
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bulk.db')}"
+    os.environ['BCRYPT_LOG_ROUNDS'] = str(args.rounds)
+
+    import jwt
+
+    import passwords
+    from app import app
+    from models import db, User
+
+    app.config['PASSWORD_HASH_WORKERS'] = args.workers
+    app.config['BULK_CHUNK_SIZE'] = args.chunk_size
+    passwords.init_app(app)
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(username='admin', email='admin@example.com', password='x', is_admin=True))
+        db.session.commit()
+    client = app.test_client()
+    # The bulk endpoints are admin only; sign the client in as one.
+    token = jwt.encode({'id': 1, 'isAdmin': True}, app.config['SECRET_KEY'])
+    client.set_cookie('localhost', 'access_token', token)
+
+    n = args.rows
+    speedups = {}
+    for mode in ('single', 'bulk'):
+        tag = mode[0]
+
+        def users():
+            return [{'username': f'{tag}user{i}', 'email': f'{tag}{i}@example.com', 'password': 'password'}
+                    for i in range(n)]
+
+        def posts():
+            return [{'userId': 1, 'title': f'{tag} post {i}', 'slug': f'{tag}-post-{i}', 'content': 'Body'}
+                    for i in range(n)]
+
+        def comments(post_id):
+            return [{'post_id': post_id, 'user_id': 1, 'content': f'Comment {i}'} for i in range(n)]
+
+        print(f'{mode}:')
+        if mode == 'single':
+            speedups['users'] = timed('users', n, lambda: post_each(client, '/users', users()))
+            speedups['posts'] = timed('posts', n, lambda: post_each(client, '/posts', posts()))
+            speedups['comments'] = timed('comments', n, lambda: post_each(client, '/comments', comments(1)))
+        else:
+            bulk_comments = [{'postId': c['post_id'], 'userId': c['user_id'], 'content': c['content']} for c in comments(1)]
+            for kind, items in (('users', users()), ('posts', posts()), ('comments', bulk_comments)):
+                rate = timed(kind, n, lambda: post_bulk(client, f'/{kind}/bulk', items, args.ndjson))
+                speedups[kind] = rate / speedups[kind]
+
+    print('speedup: ' + ', '.join(f'{kind} {factor:.1f}x' for kind, factor in speedups.items()))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
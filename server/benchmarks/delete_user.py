@@ -0,0 +1,151 @@
+"""Time and memory of deleting a prolific user.
+
+Seeds a throwaway SQLite file with one user who wrote ``--comments``
+comments (a tenth of them with a reply from someone else), liked as many,
+and owns ``--posts`` posts that others commented on. It then deletes the
+user with ``deletes.delete_user`` and fails if resident memory grows by
+more than ``--ceiling-mb``, if any of their rows survive, or if the post
+comment counts and daily counters drift from the tables:
+
+    cd server && python -m benchmarks.delete_user --comments 100000
+"""
+# Standard library imports
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+# Remote library imports
+
+# Local imports
+from benchmarks.export_memory import current_rss
+
+SEED_CHUNK_SIZE = 10000
+TARGET_POSTS = 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--comments', type=int, default=100000)
+    parser.add_argument('--posts', type=int, default=200, help='Posts owned by the deleted user.')
+    parser.add_argument('--chunk-size', type=int, default=500)
+    parser.add_argument('--ceiling-mb', type=float, default=64)
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'delete.db')}"
+
+    from sqlalchemy import func, insert, select
+
+    import counters
+    from config import create_app
+    from deletes import delete_user
+    from models import db, Comment, CommentLike, DailyCount, Post, User
+    from threads import segment
+
+    app = create_app(blueprints=(), LIKE_BUFFER='off')
+    victim, other = 1, 2
+    now = datetime.utcnow()
+    with app.app_context():
+        db.create_all()
+        db.session.execute(insert(User), [
+            {'id': user_id, 'username': f'user{user_id}', 'email': f'user{user_id}@example.com',
+             'password': 'x', 'created_at': now, 'updated_at': now}
+            for user_id in (victim, other)
+        ])
+        # Posts 1..TARGET_POSTS belong to someone else; the rest to the victim.
+        db.session.execute(insert(Post), [
+            {'id': post_id, 'user_id': other if post_id <= TARGET_POSTS else victim,
+             'title': f'Post {post_id}', 'slug': f'post-{post_id}', 'content': 'Body',
+             'category': 'python' if post_id % 2 else 'reactjs', 'created_at': now, 'updated_at': now}
+            for post_id in range(1, TARGET_POSTS + args.posts + 1)
+        ])
+
+        def comment_row(comment_id, post_id, user_id, parent=None):
+            path = (parent['path'] if parent else '') + segment(comment_id)
+            return {'id': comment_id, 'post_id': post_id, 'user_id': user_id, 'content': 'Comment',
+                    'parent_id': parent and parent['id'], 'path': path, 'depth': path.count('/') - 1,
+                    'reply_count': 0, 'number_of_likes': 0, 'created_at': now, 'updated_at': now}
+
+        next_id = 1
+        for start in range(0, args.comments, SEED_CHUNK_SIZE):
+            rows, likes = [], []
+            for i in range(start, min(start + SEED_CHUNK_SIZE, args.comments)):
+                # The victim's comment on someone's post, liked by the victim...
+                root = comment_row(next_id, 1 + i % TARGET_POSTS, victim)
+                rows.append(root)
+                likes.append({'comment_id': next_id, 'user_id': victim, 'created_at': now})
+                next_id += 1
+                # ...sometimes replied to by another user...
+                if i % 10 == 0:
+                    root['reply_count'] = 1
+                    rows.append(comment_row(next_id, root['post_id'], other, root))
+                    next_id += 1
+                # ...and another user's comment on each of the victim's posts.
+                if i < args.posts * 10:
+                    rows.append(comment_row(next_id, TARGET_POSTS + 1 + i % args.posts, other))
+                    next_id += 1
+            db.session.execute(insert(Comment), rows)
+            db.session.execute(insert(CommentLike), likes)
+            db.session.commit()
+        counters.rebuild(db.session)
+        counters.reconcile_posts(db.session)
+        counters.rebuild_categories(db.session)
+        seeded = db.session.scalar(select(func.count()).select_from(Comment))
+        db.session.remove()
+
+        baseline = peak = current_rss()
+        sampling = threading.Event()
+
+        def sample():
+            nonlocal peak
+            while not sampling.wait(0.05):
+                peak = max(peak, current_rss())
+
+        sampler = threading.Thread(target=sample, daemon=True)
+        sampler.start()
+        started = time.perf_counter()
+        deleted = delete_user(db.session, victim, args.chunk_size)
+        elapsed = time.perf_counter() - started
+        sampling.set()
+        sampler.join()
+        peak = max(peak, current_rss())
+
+        growth_mb = (peak - baseline) / 1024 / 1024
+        print(f'{seeded} comments seeded; deleted {deleted} rows in {elapsed:.1f}s '
+              f'({deleted / elapsed:,.0f} rows/s), RSS growth {growth_mb:.1f} MiB')
+
+        problems = []
+        leftovers = {
+            'users': select(func.count()).select_from(User).where(User.id == victim),
+            'posts': select(func.count()).select_from(Post).where(Post.user_id == victim),
+            'comments': select(func.count()).select_from(Comment).where(Comment.user_id == victim),
+            'likes': select(func.count()).select_from(CommentLike).where(CommentLike.user_id == victim),
+        }
+        for name, stmt in leftovers.items():
+            if db.session.scalar(stmt):
+                problems.append(f'{name} of the deleted user survived')
+        drifted = db.session.scalar(select(func.count()).select_from(Post).where(
+            Post.comment_count != select(func.count()).where(Comment.post_id == Post.id).scalar_subquery()
+        ))
+        if drifted:
+            problems.append(f'{drifted} posts have a stale comment_count')
+        for name, model in counters.TRACKED.items():
+            counted = db.session.scalar(
+                select(func.coalesce(func.sum(DailyCount.count), 0)).where(DailyCount.name == name)
+            )
+            actual = db.session.scalar(select(func.count()).select_from(model))
+            if counted != actual:
+                problems.append(f'daily counts for {name} say {counted}, table has {actual}')
+        if growth_mb > args.ceiling_mb:
+            problems.append(f'RSS grew past the {args.ceiling_mb} MiB ceiling')
+
+    for problem in problems:
+        print(problem, file=sys.stderr)
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
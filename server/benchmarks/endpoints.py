@@ -0,0 +1,291 @@
+"""Latency benchmark for the HTTP endpoints.
+
+Drives a weighted mix of requests (signup/signin, post listings with
+filters, search, comment threads, like toggles) at a fixed concurrency,
+either in-process through the Flask test client or against a running
+server, and reports p50/p95/p99 latency, throughput and SQL statements per
+request (test client only). Seed the database first, e.g.
+``python seed.py --users 1000 --posts 10000 --comments 100000``.
+
+    cd server && python -m benchmarks.endpoints --concurrency 8 --duration 20 --output run.json
+    cd server && python -m benchmarks.endpoints --url http://localhost:5555 --compare run.json
+"""
+# Standard library imports
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import defaultdict
+from datetime import datetime
+
+# Remote library imports
+
+# Local imports
+
+# Relative weight of each scenario in the request mix.
+MIX = {
+    'signup': 1,
+    'signin': 4,
+    'list_posts': 20,
+    'page_posts': 10,
+    'filter_posts': 10,
+    'search_posts': 5,
+    'post_by_slug': 15,
+    'comment_thread': 20,
+    'comment_tree': 10,
+    'like_toggle': 10,
+}
+
+PASSWORD = 'benchmark-password'
+
+
+class TestClientTarget:
+    name = 'testclient'
+
+    def __init__(self):
+        from sqlalchemy import event
+
+        from app import app
+        from models import db
+
+        self.app = app
+        self._local = threading.local()
+        with app.app_context():
+            event.listen(db.engine, 'before_cursor_execute', self._count)
+
+    def _count(self, *args):
+        self._local.queries = getattr(self._local, 'queries', 0) + 1
+
+    def request(self, method, path, body=None):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        self._local.queries = 0
+        response = client.open(path, method=method, json=body)
+        return response.status_code, response.get_data(), self._local.queries
+
+
+class HTTPTarget:
+    name = 'http'
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    def request(self, method, path, body=None):
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data, method=method)
+        if data is not None:
+            request.add_header('Content-Type', 'application/json')
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, response.read(), None
+        except urllib.error.HTTPError as e:
+            return e.code, e.read(), None
+
+
+class Fixtures:
+    """Ids, slugs and credentials discovered once before the timed run."""
+
+    def __init__(self, target):
+        status, body, _ = target.request('GET', '/api/posts?limit=100')
+        if status != 200:
+            raise SystemExit(f'Could not list posts ({status}); is the database seeded?')
+        listing = json.loads(body)
+        posts = listing['posts']
+        if not posts:
+            raise SystemExit('No posts found; seed the database first.')
+
+        self.post_ids = [post['id'] for post in posts]
+        self.slugs = [post['slug'] for post in posts]
+        self.categories = sorted({post['category'] for post in posts if post.get('category')})
+        self.user_ids = sorted({post['user_id'] for post in posts})
+        self.words = sorted({word for post in posts for word in post['title'].split() if len(word) > 3})
+        self.cursor = listing.get('nextCursor')
+
+        self.comment_ids = []
+        for post_id in self.post_ids[:20]:
+            status, body, _ = target.request('GET', f'/api/comments/{post_id}')
+            if status == 200:
+                self.comment_ids.extend(comment['id'] for comment in json.loads(body))
+
+        self.email = f'bench-{uuid.uuid4().hex}@example.com'
+        target.request('POST', '/api/signup', {
+            'username': f'bench{uuid.uuid4().hex[:12]}', 'email': self.email, 'password': PASSWORD,
+        })
+
+
+def scenario(name, fixtures, rng):
+    """Return ``(method, path, body)`` for one request of scenario ``name``."""
+    if name == 'signup':
+        token = uuid.uuid4().hex
+        return 'POST', '/api/signup', {'username': f'bench{token[:12]}', 'email': f'{token}@example.com', 'password': PASSWORD}
+    if name == 'signin':
+        return 'POST', '/api/signin', {'email': fixtures.email, 'password': PASSWORD}
+    if name == 'list_posts':
+        return 'GET', '/api/posts?limit=9', None
+    if name == 'page_posts' and fixtures.cursor:
+        return 'GET', f'/api/posts?limit=9&cursor={fixtures.cursor}', None
+    if name == 'filter_posts':
+        if fixtures.categories and rng.random() < 0.5:
+            return 'GET', f'/api/posts?limit=9&category={rng.choice(fixtures.categories)}', None
+        return 'GET', f'/api/posts?limit=9&userId={rng.choice(fixtures.user_ids)}', None
+    if name == 'search_posts' and fixtures.words:
+        return 'GET', f'/api/posts?limit=9&searchTerm={rng.choice(fixtures.words)}', None
+    if name == 'post_by_slug':
+        return 'GET', f'/api/posts?slug={rng.choice(fixtures.slugs)}', None
+    if name == 'comment_thread':
+        return 'GET', f'/api/comments/{rng.choice(fixtures.post_ids)}', None
+    if name == 'comment_tree':
+        return 'GET', f'/api/comments/{rng.choice(fixtures.post_ids)}/thread?limit=50', None
+    if name == 'like_toggle' and fixtures.comment_ids:
+        return 'PUT', f'/api/comments/{rng.choice(fixtures.comment_ids)}/like', {'userId': rng.choice(fixtures.user_ids)}
+    return 'GET', '/api/posts?limit=9', None
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    index = min(len(values) - 1, int(round(fraction * (len(values) - 1))))
+    return values[index]
+
+
+def run(target, fixtures, concurrency, duration, mix, seed):
+    samples = defaultdict(list)
+    errors = defaultdict(int)
+    queries = defaultdict(list)
+    lock = threading.Lock()
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    deadline = time.perf_counter() + duration
+
+    def worker(worker_id):
+        rng = random.Random(seed + worker_id)
+        local_samples = defaultdict(list)
+        local_errors = defaultdict(int)
+        local_queries = defaultdict(list)
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            method, path, body = scenario(name, fixtures, rng)
+            started = time.perf_counter()
+            status, _, statements = target.request(method, path, body)
+            local_samples[name].append(time.perf_counter() - started)
+            if status >= 400:
+                local_errors[name] += 1
+            if statements is not None:
+                local_queries[name].append(statements)
+        with lock:
+            for name, values in local_samples.items():
+                samples[name].extend(values)
+            for name, count in local_errors.items():
+                errors[name] += count
+            for name, values in local_queries.items():
+                queries[name].extend(values)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    results = {}
+    for name in sorted(samples):
+        values = sorted(samples[name])
+        results[name] = {
+            'count': len(values),
+            'errors': errors[name],
+            'rps': len(values) / elapsed,
+            'mean_ms': 1000 * sum(values) / len(values),
+            'p50_ms': 1000 * percentile(values, 0.50),
+            'p95_ms': 1000 * percentile(values, 0.95),
+            'p99_ms': 1000 * percentile(values, 0.99),
+            'queries_per_request': sum(queries[name]) / len(queries[name]) if queries[name] else None,
+        }
+    total = sum(len(values) for values in samples.values())
+    return results, {'requests': total, 'rps': total / elapsed, 'elapsed_s': elapsed}
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def report(results, totals):
+    print(f"{'endpoint':<16}{'count':>8}{'err':>6}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'q/req':>7}")
+    for name, row in results.items():
+        qpr = f"{row['queries_per_request']:.1f}" if row['queries_per_request'] is not None else '-'
+        print(f"{name:<16}{row['count']:>8}{row['errors']:>6}{row['rps']:>9.1f}"
+              f"{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}{qpr:>7}")
+    print(f"total: {totals['requests']} requests, {totals['rps']:.1f} req/s")
+
+
+def compare(results, baseline_path, max_regression):
+    with open(baseline_path) as baseline_file:
+        baseline = json.load(baseline_file)['results']
+    regressions = []
+    for name, row in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        change = row['p95_ms'] / before['p95_ms'] - 1 if before['p95_ms'] else 0
+        print(f"{name:<16} p95 {before['p95_ms']:8.1f}ms -> {row['p95_ms']:8.1f}ms ({change:+.0%})")
+        if change > max_regression:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help='Benchmark a running server instead of the in-process test client.')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=10, help='Seconds to run.')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--only', nargs='+', choices=sorted(MIX), help='Run only these scenarios.')
+    parser.add_argument('--output', help='Write results as JSON to this file.')
+    parser.add_argument('--compare', help='Baseline JSON to compare p95 latencies against.')
+    parser.add_argument('--max-regression', type=float, default=0.2,
+                        help='Fail if any p95 grows by more than this fraction over the baseline.')
+    args = parser.parse_args()
+
+    target = HTTPTarget(args.url) if args.url else TestClientTarget()
+    fixtures = Fixtures(target)
+    mix = {name: MIX[name] for name in args.only} if args.only else MIX
+
+    results, totals = run(target, fixtures, args.concurrency, args.duration, mix, args.seed)
+    report(results, totals)
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump({
+                'meta': {
+                    'target': args.url or target.name,
+                    'concurrency': args.concurrency,
+                    'duration_s': args.duration,
+                    'revision': git_revision(),
+                    'python': platform.python_version(),
+                    'timestamp': datetime.utcnow().isoformat(),
+                },
+                'totals': totals,
+                'results': results,
+            }, output, indent=2)
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.max_regression)
+        if regressions:
+            print(f"p95 regressed past {args.max_regression:.0%}: {', '.join(regressions)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""Memory ceiling check for the streaming NDJSON exports.
+
+Seeds a throwaway SQLite file with ``--rows`` comments, streams
+``/comments?format=ndjson`` through the test client and fails if resident
+memory grows by more than ``--ceiling-mb`` while the export runs:
+
+    cd server && python -m benchmarks.export_memory --rows 1000000
+"""
+# Standard library imports
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# Remote library imports
+
+# Local imports
+
+SEED_CHUNK_SIZE = 10000
+SEED_USERS = 100
+SEED_POSTS = 1000
+
+
+def current_rss():
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        # ru_maxrss is a high-water mark (KiB on Linux, bytes on macOS),
+        # which is still good enough to catch unbounded growth.
+        scale = 1 if sys.platform == 'darwin' else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--ceiling-mb', type=float, default=64)
+    parser.add_argument('--path', default='/comments?format=ndjson')
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'export.db')}"
+
+    from sqlalchemy import insert
+
+    from app import app
+    from models import db, Comment, Post, User
+
+    with app.app_context():
+        db.create_all()
+        now = datetime.utcnow()
+        db.session.execute(insert(User), [
+            {'id': user_id, 'username': f'user{user_id}', 'email': f'user{user_id}@example.com',
+             'password': 'x', 'created_at': now, 'updated_at': now}
+            for user_id in range(1, SEED_USERS + 1)
+        ])
+        db.session.execute(insert(Post), [
+            {'id': post_id, 'user_id': 1 + post_id % SEED_USERS, 'title': f'Post {post_id}',
+             'slug': f'post-{post_id}', 'content': 'Body', 'created_at': now, 'updated_at': now}
+            for post_id in range(1, SEED_POSTS + 1)
+        ])
+        for start in range(0, args.rows, SEED_CHUNK_SIZE):
+            db.session.execute(insert(Comment), [{
+                'content': f'Comment {i}',
+                'post_id': 1 + i % SEED_POSTS,
+                'user_id': 1 + i % SEED_USERS,
+                'number_of_likes': 0,
+                'created_at': now,
+                'updated_at': now,
+            } for i in range(start, min(start + SEED_CHUNK_SIZE, args.rows))])
+            db.session.commit()
+
+    client = app.test_client()
+    baseline = peak = current_rss()
+    lines = 0
+    started = time.perf_counter()
+    response = client.get(args.path, buffered=False)
+    for chunk in response.response:
+        lines += chunk.count(b'\n')
+        peak = max(peak, current_rss())
+    response.close()
+    elapsed = time.perf_counter() - started
+
+    growth_mb = (peak - baseline) / 1024 / 1024
+    print(f'{lines} rows in {elapsed:.1f}s ({lines / elapsed:,.0f} rows/s), RSS growth {growth_mb:.1f} MiB')
+    if lines != args.rows:
+        print(f'expected {args.rows} rows', file=sys.stderr)
+        return 1
+    if growth_mb > args.ceiling_mb:
+        print(f'RSS grew past the {args.ceiling_mb} MiB ceiling', file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
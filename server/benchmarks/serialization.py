@@ -0,0 +1,90 @@
+"""Rows/second of the list serialization paths.
+
+Compares the old path (ORM objects, a hand-built dict per row, indented
+JSON) with the schema projection in serializers.py. Runs against a
+throwaway SQLite file:
+
+    cd server && python -m benchmarks.serialization --rows 50000
+"""
+# Standard library imports
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+
+# Remote library imports
+
+# Local imports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+
+    from flask.json.provider import DefaultJSONProvider
+    from sqlalchemy import insert
+
+    from app import app
+    from models import db, Post, User
+    from serializers import POST_SCHEMA, dumps, iter_json_array, orjson
+
+    legacy_json = DefaultJSONProvider(app)
+
+    def legacy():
+        posts = Post.query.all()
+        return legacy_json.dumps([{
+            'id': post.id,
+            'user_id': post.user_id,
+            'content': post.content,
+            'title': post.title,
+            'image': post.image,
+            'category': post.category,
+            'slug': post.slug,
+            'created_at': post.created_at,
+            'updated_at': post.updated_at
+        } for post in posts], indent=2)
+
+    def projection():
+        rows = db.session.execute(POST_SCHEMA.select())
+        return dumps(POST_SCHEMA.dump_rows(rows))
+
+    def streamed():
+        rows = db.session.execute(POST_SCHEMA.select())
+        return b''.join(iter_json_array(map(POST_SCHEMA.dump_row, rows)))
+
+    with app.app_context():
+        db.create_all()
+        now = datetime.utcnow()
+        db.session.execute(insert(User).values(
+            id=1, username='user1', email='user1@example.com', password='x', created_at=now, updated_at=now,
+        ))
+        db.session.execute(insert(Post), [{
+            'user_id': 1,
+            'title': f'Post {i}',
+            'slug': f'post-{i}',
+            'content': 'Lorem ipsum dolor sit amet. ' * 20,
+            'category': 'uncategorized',
+            'created_at': now,
+            'updated_at': now,
+        } for i in range(args.rows)])
+        db.session.commit()
+
+        print(f'{args.rows} rows, JSON backend: {"orjson" if orjson else "json"}')
+        for name, fn in (('legacy', legacy), ('projection', projection), ('streamed', streamed)):
+            best = float('inf')
+            for _ in range(args.repeat):
+                db.session.expunge_all()
+                start = time.perf_counter()
+                fn()
+                best = min(best, time.perf_counter() - start)
+            print(f'{name:>12}: {args.rows / best:12,.0f} rows/s  ({best * 1000:.1f} ms)')
+
+
+if __name__ == '__main__':
+    main()
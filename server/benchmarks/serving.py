@@ -0,0 +1,56 @@
+"""Compare the WSGI and ASGI serving modes on the read-heavy routes.
+
+Runs the same read-only slice of the endpoint mix (post listings, cursor
+pages, filters, post by slug, comment threads) against two running
+servers at each concurrency level and prints both side by side; the
+latency columns are those of the slowest scenario. Start the
+servers on the same database first, e.g.
+
+    cd server && gunicorn -w 4 --threads 8 -b :5555 app:app
+    cd server && uvicorn asgi:app --port 5556
+    cd server && python -m benchmarks.serving --wsgi http://localhost:5555 --asgi http://localhost:5556 --concurrency 16 256 1024
+"""
+# Standard library imports
+import argparse
+import json
+
+# Remote library imports
+
+# Local imports
+from benchmarks.endpoints import MIX, Fixtures, HTTPTarget, run
+
+READ_MIX = {name: MIX[name] for name in ('list_posts', 'page_posts', 'filter_posts', 'post_by_slug', 'comment_thread')}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--wsgi', required=True, help='Base URL of the WSGI server.')
+    parser.add_argument('--asgi', required=True, help='Base URL of the ASGI server.')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[16, 128, 512])
+    parser.add_argument('--duration', type=float, default=10, help='Seconds per mode and concurrency level.')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Write results as JSON to this file.')
+    args = parser.parse_args()
+
+    targets = {'wsgi': HTTPTarget(args.wsgi), 'asgi': HTTPTarget(args.asgi)}
+    fixtures = Fixtures(targets['wsgi'])
+
+    results = {}
+    print(f"{'threads':>8}{'mode':>6}{'rps':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'err':>7}")
+    for concurrency in args.concurrency:
+        for mode, target in targets.items():
+            by_scenario, totals = run(target, fixtures, concurrency, args.duration, READ_MIX, args.seed)
+            rows = by_scenario.values()
+            worst = {key: max(row[key] for row in rows) for key in ('p50_ms', 'p95_ms', 'p99_ms')}
+            errors = sum(row['errors'] for row in rows)
+            results.setdefault(str(concurrency), {})[mode] = {'totals': totals, 'results': by_scenario}
+            print(f"{concurrency:>8}{mode:>6}{totals['rps']:>10.1f}{worst['p50_ms']:>9.1f}"
+                  f"{worst['p95_ms']:>9.1f}{worst['p99_ms']:>9.1f}{errors:>7}")
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(results, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
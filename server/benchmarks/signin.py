@@ -0,0 +1,132 @@
+"""Signin throughput under concurrent load.
+
+Signs up a handful of users, then hammers ``POST /api/signin`` at each
+requested concurrency level and reports throughput and p50/p95/p99
+latency. Run it once per setting to compare bcrypt costs or pool sizes.
+In-process it uses a throwaway SQLite file; with ``--url`` it drives a
+running server (whose own config and database then apply).
+
+    cd server && python -m benchmarks.signin --concurrency 1 4 16 --rounds 12 --workers 4
+    cd server && python -m benchmarks.signin --url http://localhost:5555 --concurrency 8 32
+"""
+# Standard library imports
+import argparse
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+# Remote library imports
+
+# Local imports
+from benchmarks.endpoints import HTTPTarget, percentile
+
+PASSWORD = 'benchmark-password'
+
+
+class AppTarget:
+    name = 'testclient'
+
+    def __init__(self, rounds, workers):
+        # Sign up into a throwaway SQLite file, never the configured database.
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'signin.db')}"
+
+        from app import app
+        from models import db
+        import passwords
+
+        app.config['BCRYPT_LOG_ROUNDS'] = rounds
+        app.config['PASSWORD_HASH_WORKERS'] = workers
+        passwords.init_app(app)
+        with app.app_context():
+            db.create_all()
+        self.app = app
+        self._local = threading.local()
+
+    def request(self, method, path, body=None):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        response = client.open(path, method=method, json=body)
+        return response.status_code, response.get_data(), None
+
+
+def create_users(target, count):
+    emails = []
+    for _ in range(count):
+        token = uuid.uuid4().hex
+        email = f'signin-{token}@example.com'
+        status, body, _ = target.request('POST', '/api/signup', {
+            'username': f'signin{token[:12]}', 'email': email, 'password': PASSWORD,
+        })
+        if status != 201:
+            raise SystemExit(f'Signup failed ({status}): {body[:200]!r}')
+        emails.append(email)
+    return emails
+
+
+def run(target, emails, concurrency, duration):
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(worker_id):
+        local = []
+        failed = 0
+        i = worker_id
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            status, _, _ = target.request('POST', '/api/signin', {
+                'email': emails[i % len(emails)], 'password': PASSWORD,
+            })
+            local.append(time.perf_counter() - started)
+            if status != 200:
+                failed += 1
+            i += concurrency
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'count': len(latencies),
+        'errors': errors[0],
+        'rps': len(latencies) / elapsed,
+        'p50_ms': 1000 * percentile(latencies, 0.50),
+        'p95_ms': 1000 * percentile(latencies, 0.95),
+        'p99_ms': 1000 * percentile(latencies, 0.99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help='Benchmark a running server instead of the in-process test client.')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--duration', type=float, default=10, help='Seconds per concurrency level.')
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--rounds', type=int, default=12, help='bcrypt cost (test client only).')
+    parser.add_argument('--workers', type=int, default=4, help='Hashing pool size (test client only).')
+    args = parser.parse_args()
+
+    target = HTTPTarget(args.url) if args.url else AppTarget(args.rounds, args.workers)
+    emails = create_users(target, args.users)
+
+    print(f"{'threads':>8}{'count':>8}{'err':>6}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for concurrency in args.concurrency:
+        row = run(target, emails, concurrency, args.duration)
+        print(f"{concurrency:>8}{row['count']:>8}{row['errors']:>6}{row['rps']:>9.1f}"
+              f"{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""Read/write concurrency of a SQLite engine profile against the defaults.
+
+Runs ``--readers`` threads paging through comments and ``--writers``
+threads inserting comments for ``--seconds`` against a fresh SQLite file
+per profile, then reports operations/second and lock errors:
+
+    cd server && python -m benchmarks.sqlite_concurrency --profiles default production
+"""
+# Standard library imports
+import argparse
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+# Remote library imports
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.exc import OperationalError
+
+# Local imports
+from dbtuning import PROFILES, engine_options, install_pragmas
+from models import db, Comment, Post, User
+
+
+def run_profile(profile, readers, writers, seconds, seed_rows):
+    uri = f"sqlite:///{os.path.join(tempfile.mkdtemp(), f'{profile}.db')}"
+    engine = create_engine(uri, **engine_options(profile, uri))
+    install_pragmas(engine, profile)
+    db.metadata.create_all(engine)
+
+    now = datetime.utcnow()
+    row = {'content': 'x' * 200, 'post_id': 1, 'user_id': 1, 'number_of_likes': 0, 'created_at': now, 'updated_at': now}
+    with engine.begin() as connection:
+        connection.execute(insert(User).values(
+            id=1, username='user1', email='user1@example.com', password='x', created_at=now, updated_at=now,
+        ))
+        connection.execute(insert(Post).values(
+            id=1, user_id=1, title='Post 1', slug='post-1', content='Body', created_at=now, updated_at=now,
+        ))
+        connection.execute(insert(Comment), [row] * seed_rows)
+
+    page = select(Comment.id, Comment.content).order_by(Comment.created_at.desc(), Comment.id.desc()).limit(20)
+    stats = {'reads': 0, 'writes': 0, 'errors': 0}
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def reader():
+        done = errors = 0
+        while time.monotonic() < deadline:
+            try:
+                with engine.connect() as connection:
+                    connection.execute(page).all()
+                done += 1
+            except OperationalError:
+                errors += 1
+        with lock:
+            stats['reads'] += done
+            stats['errors'] += errors
+
+    def writer():
+        done = errors = 0
+        while time.monotonic() < deadline:
+            try:
+                with engine.begin() as connection:
+                    connection.execute(insert(Comment).values(**row))
+                done += 1
+            except OperationalError:
+                errors += 1
+        with lock:
+            stats['writes'] += done
+            stats['errors'] += errors
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+
+    print(f"{profile:>12}: {stats['reads'] / seconds:10,.0f} reads/s {stats['writes'] / seconds:10,.0f} writes/s "
+          f"{stats['errors']:6d} lock errors")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--profiles', nargs='+', default=['default', 'production'], choices=sorted(PROFILES))
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--seed-rows', type=int, default=10000)
+    args = parser.parse_args()
+
+    for profile in args.profiles:
+        run_profile(profile, args.readers, args.writers, args.seconds, args.seed_rows)
+
+
+if __name__ == '__main__':
+    main()
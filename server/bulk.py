@@ -0,0 +1,279 @@
+# Standard library imports
+from collections import namedtuple
+from datetime import datetime
+
+# Remote library imports
+from flask import current_app, request
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+
+# Local imports
+import counters
+import threads
+from likes import IN_CHUNK_SIZE
+from models import Comment, Post, User
+from passwords import hasher
+from serializers import loads
+from slugs import unique_slugs
+
+BULK_CHUNK_SIZE = 1000
+BULK_MAX_ITEMS = 50000
+
+DEFAULT_PROFILE_PICTURE = 'https://cdn.pixabay.com/photo/2015/10/05/22/37/blank-profile-picture-973460_960_720.png'
+DEFAULT_POST_IMAGE = 'https://www.hostinger.com/tutorials/wp-content/uploads/sites/2/2021/09/how-to-write-a-blog-post.png'
+
+Result = namedtuple('Result', ['created', 'errors'])
+
+
+class BulkError(ValueError):
+    """The request body as a whole is unusable (not per item)."""
+
+
+def parse_items():
+    """Return ``[(index, item_or_error), ...]`` from a JSON array or NDJSON body.
+
+    Lines of an NDJSON body that fail to parse become per-item errors
+    rather than failing the whole request.
+    """
+    if request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+        items = []
+        for index, line in enumerate(request.get_data().splitlines()):
+            if not line.strip():
+                continue
+            try:
+                items.append((len(items), loads(line)))
+            except ValueError as e:
+                items.append((len(items), BulkError(f'line {index + 1}: {e}')))
+    else:
+        try:
+            body = loads(request.get_data())
+        except ValueError as e:
+            raise BulkError(f'Invalid JSON: {e}')
+        if not isinstance(body, list):
+            raise BulkError('Expected a JSON array or an NDJSON body')
+        items = list(enumerate(body))
+
+    limit = current_app.config.get('BULK_MAX_ITEMS', BULK_MAX_ITEMS)
+    if len(items) > limit:
+        raise BulkError(f'At most {limit} items per request')
+    return items
+
+
+def _existing(session, column, values, *extra):
+    """Rows of ``(column, *extra)`` whose ``column`` is in ``values``, one query per chunk."""
+    values = list(values)
+    found = {}
+    for start in range(0, len(values), IN_CHUNK_SIZE):
+        rows = session.execute(select(column, *extra).where(column.in_(values[start:start + IN_CHUNK_SIZE])))
+        for row in rows:
+            found[row[0]] = tuple(row[1:])
+    return found
+
+
+def _required(item, *keys):
+    if not isinstance(item, dict):
+        return 'Each item must be an object'
+    missing = [key for key in keys if not item.get(key)]
+    if missing:
+        return f'Missing required fields: {", ".join(missing)}'
+    return None
+
+
+def _strings(item, *keys):
+    for key in keys:
+        if item.get(key) is not None and not isinstance(item[key], str):
+            return f'{key} must be a string'
+    return None
+
+
+def _integer_ids(item, *keys):
+    for key in keys:
+        value = item.get(key)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, int)):
+            return f'{key} must be an integer'
+    return None
+
+
+def _validate(items, check, unique=()):
+    """Run ``check`` over every item, reporting duplicates of ``unique`` keys in the batch."""
+    valid = []
+    errors = []
+    seen = {key: set() for key in unique}
+    for index, item in items:
+        error = str(item) if isinstance(item, BulkError) else check(item)
+        if error is None:
+            for key in unique:
+                if item.get(key) is not None and item[key] in seen[key]:
+                    error = f'Duplicate {key} in this batch: {item[key]}'
+                    break
+        if error is None:
+            for key in unique:
+                if item.get(key) is not None:
+                    seen[key].add(item[key])
+            valid.append((index, item))
+        else:
+            errors.append({'index': index, 'error': error})
+    return valid, errors
+
+
+def _insert(session, model, rows, after_insert=None):
+    """Insert ``[(index, row), ...]`` in chunks, one transaction each.
+
+    A chunk that fails (say a row raced a unique constraint) is retried
+    row by row under savepoints so only the offending items are reported.
+    """
+    created = 0
+    errors = []
+    chunk_size = current_app.config.get('BULK_CHUNK_SIZE', BULK_CHUNK_SIZE)
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        try:
+            _insert_rows(session, model, [row for _, row in chunk], after_insert)
+            session.commit()
+            created += len(chunk)
+            continue
+        except SQLAlchemyError:
+            session.rollback()
+
+        for index, row in chunk:
+            try:
+                with session.begin_nested():
+                    _insert_rows(session, model, [row], after_insert)
+                created += 1
+            except SQLAlchemyError as e:
+                errors.append({'index': index, 'error': str(getattr(e, 'orig', None) or e)})
+        session.commit()
+    return created, errors
+
+
+def _insert_rows(session, model, rows, after_insert):
+    ids = session.scalars(insert(model).returning(model.id, sort_by_parameter_order=True), rows).all()
+    counters.record_inserts(session, model.__tablename__, rows)
+    if after_insert:
+        after_insert(session, rows, ids)
+
+
+def _result(created, *error_lists):
+    errors = sorted((error for errors in error_lists for error in errors), key=lambda error: error['index'])
+    return Result(created, errors)
+
+
+def create_users(session, items):
+    def check(item):
+        error = _required(item, 'username', 'email', 'password') or _strings(item, 'username', 'email', 'password')
+        if error is None and len(item['password']) < 6:
+            error = 'Password must be at least 6 characters'
+        return error
+
+    valid, errors = _validate(items, check, unique=('username', 'email'))
+    taken_emails = _existing(session, User.email, (item['email'] for _, item in valid))
+    taken_names = _existing(session, User.username, (item['username'] for _, item in valid))
+    accepted = []
+    for index, item in valid:
+        if item['email'] in taken_emails:
+            errors.append({'index': index, 'error': f'Email already registered: {item["email"]}'})
+        elif item['username'] in taken_names:
+            errors.append({'index': index, 'error': f'Username already taken: {item["username"]}'})
+        else:
+            accepted.append((index, item))
+
+    # All the bcrypt work for the batch, spread over the hashing pool.
+    hashes = hasher.hash_many([item['password'] for _, item in accepted])
+    now = datetime.utcnow()
+    rows = [(index, {
+        'username': item['username'],
+        'email': item['email'],
+        'password': hashed,
+        'profile_picture': item.get('profilePicture') or DEFAULT_PROFILE_PICTURE,
+        # Admins are never minted in bulk, whatever the payload says.
+        'is_admin': False,
+        'created_at': now,
+        'updated_at': now,
+    }) for (index, item), hashed in zip(accepted, hashes)]
+
+    created, insert_errors = _insert(session, User, rows)
+    return _result(created, errors, insert_errors)
+
+
+def create_posts(session, items):
+    def check(item):
+        return (_required(item, 'userId', 'title', 'content') or _integer_ids(item, 'userId')
+                or _strings(item, 'title', 'content', 'slug', 'category', 'image'))
+
+    valid, errors = _validate(items, check, unique=('title', 'slug'))
+    users = _existing(session, User.id, {item['userId'] for _, item in valid})
+    titles = _existing(session, Post.title, (item['title'] for _, item in valid))
+    explicit = {item['slug'] for _, item in valid if item.get('slug')}
+    slugs = _existing(session, Post.slug, explicit)
+    accepted = []
+    for index, item in valid:
+        if item['userId'] not in users:
+            errors.append({'index': index, 'error': f'User not found: {item["userId"]}'})
+        elif item['title'] in titles:
+            errors.append({'index': index, 'error': f'Title already exists: {item["title"]}'})
+        elif item.get('slug') in slugs:
+            errors.append({'index': index, 'error': f'Slug already exists: {item["slug"]}'})
+        else:
+            accepted.append((index, item))
+
+    # Items without a slug get one from their title, clear of the stored
+    # slugs and of the explicit ones in this batch.
+    generated = iter(unique_slugs(
+        session, [item['title'] for _, item in accepted if not item.get('slug')], reserved=explicit,
+    ))
+    now = datetime.utcnow()
+    rows = [(index, {
+        'user_id': item['userId'],
+        'title': item['title'],
+        'content': item['content'],
+        'slug': item.get('slug') or next(generated),
+        'image': item.get('image') or DEFAULT_POST_IMAGE,
+        'category': item.get('category') or 'uncategorized',
+        'created_at': now,
+        'updated_at': now,
+    }) for index, item in accepted]
+
+    created, insert_errors = _insert(session, Post, rows)
+    return _result(created, errors, insert_errors)
+
+
+def create_comments(session, items):
+    def check(item):
+        return (_required(item, 'postId', 'userId', 'content') or _integer_ids(item, 'postId', 'userId', 'parentId')
+                or _strings(item, 'content'))
+
+    valid, errors = _validate(items, check)
+    posts = _existing(session, Post.id, {item['postId'] for _, item in valid})
+    users = _existing(session, User.id, {item['userId'] for _, item in valid})
+    parents = _existing(
+        session, Comment.id, {item['parentId'] for _, item in valid if item.get('parentId')},
+        Comment.post_id, Comment.path, Comment.depth,
+    )
+    now = datetime.utcnow()
+    rows = []
+    for index, item in valid:
+        parent = parents.get(item.get('parentId'))
+        if item['postId'] not in posts:
+            errors.append({'index': index, 'error': f'Post not found: {item["postId"]}'})
+        elif item['userId'] not in users:
+            errors.append({'index': index, 'error': f'User not found: {item["userId"]}'})
+        elif item.get('parentId') and (parent is None or parent[0] != item['postId']):
+            errors.append({'index': index, 'error': f'Parent comment not found on this post: {item["parentId"]}'})
+        else:
+            rows.append((index, {
+                'content': item['content'],
+                'post_id': item['postId'],
+                'user_id': item['userId'],
+                'parent_id': item.get('parentId'),
+                'number_of_likes': 0,
+                'created_at': now,
+                'updated_at': now,
+            }))
+
+    paths = {parent_id: (path, depth) for parent_id, (_, path, depth) in parents.items()}
+
+    def after_insert(session, inserted, ids):
+        threads.record_inserts(session, inserted, ids, paths)
+
+    created, insert_errors = _insert(session, Comment, rows, after_insert)
+    return _result(created, errors, insert_errors)
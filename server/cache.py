@@ -0,0 +1,248 @@
+# Standard library imports
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from datetime import datetime
+from functools import wraps
+from itertools import chain
+from urllib.parse import urlencode
+
+# Remote library imports
+from flask import make_response, request
+from sqlalchemy import inspect
+
+# Local imports
+from config import db
+from serializers import dumps, loads
+from sqlhelpers import listen_all
+
+CachedResponse = namedtuple('CachedResponse', ['body', 'mimetype', 'etag', 'last_modified'])
+
+DEFAULT_TTL = 60
+
+# Which cached namespaces a write to each table makes stale. 'posts' is
+# the posts themselves, the others what ?include= adds to them. Comments
+# reach 'posts' because adding or removing one moves its post's
+# comment_count and last_comment_at, which counters writes on the raw
+# connection where the events below never see it.
+INVALIDATES = {
+    'posts': {'posts'},
+    'comments': {'posts', 'post_comments'},
+    'comment_likes': {'post_comments'},
+    'users': {'post_authors'},
+}
+
+# An UPDATE that leaves these columns alone makes only the second set
+# stale: editing or liking a comment does not change its post's stats.
+UPDATE_INVALIDATES = {
+    'comments': ({'post_id', 'created_at'}, {'post_comments'}),
+}
+
+
+class LocalCache:
+    """Bounded in-process LRU with a per-entry TTL."""
+
+    def __init__(self, max_entries=1024, ttl=DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires = time.monotonic() + (ttl or self.ttl)
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def generation(self, namespace):
+        return self._counters.get(namespace, 0)
+
+    def bump(self, namespace):
+        with self._lock:
+            self._counters[namespace] = self._counters.get(namespace, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def _encode(entry):
+    # A JSON header line, then the body as is. Nothing read back from a
+    # shared prefix is ever unpickled.
+    return dumps([entry.mimetype, entry.etag, entry.last_modified]) + b'\n' + entry.body
+
+
+def _decode(value):
+    header, body = value.split(b'\n', 1)
+    mimetype, etag, last_modified = loads(header)
+    return CachedResponse(body, mimetype, etag, last_modified and datetime.fromisoformat(last_modified))
+
+
+class RedisCache:
+    """Shared backend so every worker sees the same entries and invalidations.
+
+    Needs the optional ``redis`` package and stores ``CachedResponse``
+    entries only. Invalidation bumps a per-namespace generation number that
+    is part of every key, so stale entries are never read again and simply
+    age out.
+    """
+
+    def __init__(self, url, prefix='knowledgehub:cache:', ttl=DEFAULT_TTL):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        return _decode(value) if value is not None else None
+
+    def set(self, key, value, ttl=None):
+        self.client.setex(self.prefix + key, ttl or self.ttl, _encode(value))
+
+    def generation(self, namespace):
+        return int(self.client.get(f'{self.prefix}gen:{namespace}') or 0)
+
+    def bump(self, namespace):
+        self.client.incr(f'{self.prefix}gen:{namespace}')
+
+    def clear(self):
+        for namespace in set(chain.from_iterable(INVALIDATES.values())):
+            self.bump(namespace)
+
+
+backend = LocalCache()
+
+
+def configure(new_backend):
+    global backend
+    backend = new_backend
+
+
+def invalidate(namespace):
+    backend.bump(namespace)
+
+
+def stale_namespaces(table_name, updated=None):
+    """Namespaces a write to ``table_name`` makes stale; ``updated`` names the columns an UPDATE set."""
+    narrow = UPDATE_INVALIDATES.get(table_name)
+    if updated is not None and narrow and not updated & narrow[0]:
+        return narrow[1]
+    return INVALIDATES.get(table_name, ())
+
+
+def _touch(session, table_name, updated=None):
+    session.info.setdefault('cache_namespaces', set()).update(stale_namespaces(table_name, updated))
+
+
+def _collect_flushed(session, flush_context):
+    for instance in chain(session.new, session.deleted):
+        _touch(session, getattr(instance, '__tablename__', None))
+    for instance in session.dirty:
+        changed = {attr.key for attr in inspect(instance).attrs if attr.history.has_changes()}
+        _touch(session, getattr(instance, '__tablename__', None), changed)
+
+
+def _collect_executed(orm_execute_state):
+    # Bulk and Core-style writes issued through the session never show up
+    # in new/dirty/deleted.
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        statement = orm_execute_state.statement
+        table = getattr(statement, 'table', None)
+        if table is None:
+            return
+        updated = None
+        if orm_execute_state.is_update and statement._values:
+            # Without inline values (a bulk UPDATE by primary key) any column may change.
+            updated = {getattr(column, 'key', column) for column in statement._values}
+        _touch(orm_execute_state.session, table.name, updated)
+
+
+def _invalidate_committed(session):
+    for namespace in session.info.pop('cache_namespaces', ()):
+        invalidate(namespace)
+
+
+def _discard(session):
+    session.info.pop('cache_namespaces', None)
+
+
+def init_app(app):
+    """Invalidate cached responses on commit.
+
+    Config: ``CACHE_URL`` (a ``redis://`` URL) shares the cache between processes.
+    """
+    if app.config.get('CACHE_URL'):
+        configure(RedisCache(app.config['CACHE_URL']))
+    listen_all(db.session, [
+        ('after_flush', _collect_flushed),
+        ('do_orm_execute', _collect_executed),
+        ('after_commit', _invalidate_committed),
+        ('after_rollback', _discard),
+    ])
+
+
+def make_key(namespaces, path, params):
+    """Key for ``path`` with query ``params`` (a list of pairs), stale once any of ``namespaces`` is."""
+    if isinstance(namespaces, str):
+        namespaces = (namespaces,)
+    generations = ','.join(f'{namespace}:{backend.generation(namespace)}' for namespace in namespaces)
+    return f'{generations}:{path}?{urlencode(sorted(params))}'
+
+
+def cache_key(namespaces):
+    return make_key(namespaces, request.path, request.args.items(multi=True))
+
+
+def _etag_only(environ):
+    # A timestamp can't see deletes or recounted stats, the ETag can: with
+    # one to compare, If-Modified-Since is ignored.
+    return {name: value for name, value in environ.items() if name != 'HTTP_IF_MODIFIED_SINCE'}
+
+
+def cached_response(namespace, ttl=None, depends=None):
+    """Cache a GET view's 200 responses and answer conditional requests.
+
+    Entries are keyed on the normalized query string and carry an ETag of
+    the body plus any ``Last-Modified`` the view set, so a matching
+    ``If-None-Match`` gets a 304 without the view running at all.
+    ``depends(args)`` returns further namespaces a request reads.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            key = cache_key((namespace, *(depends(request.args) if depends else ())))
+            entry = backend.get(key)
+            if entry is None:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200 or response.is_streamed:
+                    return response
+                response.add_etag()
+                entry = CachedResponse(
+                    response.get_data(), response.mimetype, response.get_etag()[0], response.last_modified
+                )
+                backend.set(key, entry, ttl)
+            else:
+                response = make_response(entry.body)
+                response.mimetype = entry.mimetype
+                response.set_etag(entry.etag)
+                response.last_modified = entry.last_modified
+            return response.make_conditional(_etag_only(request.environ))
+        return wrapper
+    return decorator
@@ -0,0 +1,29 @@
+# Standard library imports
+from importlib import import_module
+
+# Remote library imports
+from flask.cli import AppGroup
+
+# Local imports
+
+# name -> (module, attribute). Like the blueprints, a command's module is
+# only imported when that command runs (or ``flask --help`` lists it).
+COMMANDS = {
+    'counters': ('counters', 'counters_cli'),
+    'jobs': ('jobs', 'jobs_cli'),
+    'search': ('search', 'search_cli'),
+    'check-plans': ('queryplans', 'check_plans_command'),
+}
+
+
+class LazyCommands(AppGroup):
+    """``app.cli`` that imports the ``COMMANDS`` on first use."""
+
+    def list_commands(self, ctx):
+        return sorted(set(super().list_commands(ctx)) | set(COMMANDS))
+
+    def get_command(self, ctx, name):
+        if name in COMMANDS and name not in self.commands:
+            module, attribute = COMMANDS[name]
+            self.add_command(getattr(import_module(module), attribute), name)
+        return super().get_command(ctx, name)
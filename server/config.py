@@ -1,4 +1,6 @@
 # Standard library imports
+import os
+from datetime import timedelta
 
 # Remote library imports
 from flask import Flask
@@ -9,23 +11,80 @@ from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy import MetaData
 
 # Local imports
+from dbtuning import engine_options, install_pragmas
 
-# Instantiate app, set attributes
-app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///app.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.json.compact = False
-
-# Define metadata, instantiate db
+# Define metadata, instantiate extensions. They are bound to an app in
+# create_app(), so every blueprint shares this one db and its engine.
 metadata = MetaData(naming_convention={
     "fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s",
 })
 db = SQLAlchemy(metadata=metadata)
-migrate = Migrate(app, db)
-db.init_app(app)
+migrate = Migrate()
+api = Api()
+cors = CORS()
+
+
+def create_app(blueprints=None, **overrides):
+    """Build the Flask app.
+
+    ``blueprints`` limits which of ``controllers.BLUEPRINTS`` are imported
+    and registered (all of them by default); scripts that only need the
+    database can pass ``()`` and skip the view modules entirely.
+    """
+    # Instantiate app, set attributes
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///app.db')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'your_secret_key')
+    app.config['JWT_EXPIRATION_DELTA'] = timedelta(hours=1)
+    app.config['DB_PROFILE'] = os.environ.get('APP_ENV', 'development')
+    app.config['BCRYPT_LOG_ROUNDS'] = int(os.environ.get('BCRYPT_LOG_ROUNDS', 12))
+    app.config['LIKE_BUFFER'] = os.environ.get('LIKE_BUFFER', 'off')
+    app.config['CACHE_URL'] = os.environ.get('CACHE_URL')
+    app.config['METRICS_TOKEN'] = os.environ.get('METRICS_TOKEN')
+    app.config.update(overrides)
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(
+        app.config['DB_PROFILE'], app.config['SQLALCHEMY_DATABASE_URI']
+    ))
+
+    db.init_app(app)
+    with app.app_context():
+        install_pragmas(db.engine, app.config['DB_PROFILE'])
+    migrate.init_app(app, db)
+    api.init_app(app)
+    cors.init_app(app)
+
+    import counters
+    import threads
+    from commands import LazyCommands
+    from controllers import register_blueprints
+
+    # Derived data has to stay right whoever writes, scripts included.
+    counters.init_app(app)
+    threads.init_app(app)
+    cli = LazyCommands(app.name)
+    cli.commands.update(app.cli.commands)
+    app.cli = cli
+
+    # Everything else only matters when serving requests, so an app built
+    # with ``blueprints=()`` never imports it.
+    serving = blueprints is None or bool(blueprints)
+    if serving or app.config.get('CACHE_URL'):
+        import cache
+        cache.init_app(app)
+    if serving:
+        import auth_middleware
+        import instrumentation
+        import passwords
+        from serializers import FastJSONProvider
 
-# Instantiate REST API
-api = Api(app)
+        app.json = FastJSONProvider(app)
+        instrumentation.init_app(app)
+        auth_middleware.init_app(app)
+        passwords.init_app(app)
+    if app.config['LIKE_BUFFER'] != 'off':
+        import likebuffer
+        likebuffer.init_app(app)
+    register_blueprints(app, blueprints)
 
-# Instantiate CORS
-CORS(app)
+    return app
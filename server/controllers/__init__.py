@@ -0,0 +1,23 @@
+# Standard library imports
+from importlib import import_module
+
+# Remote library imports
+
+# Local imports
+
+# name -> (module, url prefix). Modules are only imported when their
+# blueprint is registered, which keeps cold start down for scripts and
+# workers that create an app with a subset of them.
+BLUEPRINTS = {
+    'core': ('controllers.core', None),
+    'auth': ('controllers.auth', '/api'),
+    'users': ('controllers.users', '/api'),
+    'posts': ('controllers.posts', '/api'),
+    'comments': ('controllers.comments', '/api'),
+}
+
+
+def register_blueprints(app, names=None):
+    for name in (BLUEPRINTS if names is None else names):
+        module, url_prefix = BLUEPRINTS[name]
+        app.register_blueprint(import_module(module).bp, url_prefix=url_prefix)
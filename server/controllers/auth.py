@@ -1,37 +1,17 @@
-from flask import Flask, jsonify, request, make_response
-from flask_sqlalchemy import SQLAlchemy
-from flask_bcrypt import Bcrypt
+from flask import Blueprint, current_app, jsonify, request, make_response
 import jwt
-from datetime import datetime, timedelta
-import os
-
-app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///your_database.db'  # Replace with your database URI
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['SECRET_KEY'] = 'your_secret_key'  # Replace with a secure secret key for JWT
-app.config['JWT_EXPIRATION_DELTA'] = timedelta(hours=1)  # JWT expiration time
-
-db = SQLAlchemy(app)
-bcrypt = Bcrypt(app)
-
-# SQLAlchemy User Model
-class User(db.Model):
-    __tablename__ = 'users'
-
-    id = db.Column(db.Integer, primary_key=True)
-    username = db.Column(db.String, nullable=False, unique=True)
-    email = db.Column(db.String, nullable=False, unique=True)
-    password = db.Column(db.String, nullable=False)
-    profile_picture = db.Column(db.String, default='https://cdn.pixabay.com/photo/2015/10/05/22/37/blank-profile-picture-973460_960_720.png')
-    is_admin = db.Column(db.Boolean, default=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-
-    def __repr__(self):
-        return f'<User {self.id} - {self.username}>'
+from datetime import datetime
+import random
+import string
+
+from config import db
+from models import User
+from passwords import HasherBusy, check_password, hash_password, needs_rehash
+
+bp = Blueprint('auth', __name__)
 
 # Flask routes for authentication
-@app.route('/signup', methods=['POST'])
+@bp.route('/signup', methods=['POST'])
 def signup():
     data = request.get_json()
     username = data.get('username')
@@ -41,7 +21,10 @@ def signup():
     if not username or not email or not password:
         return jsonify({'error': 'All fields are required'}), 400
 
-    hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
+    try:
+        hashed_password = hash_password(password)
+    except HasherBusy as e:
+        return jsonify({'error': str(e)}), 503
 
     new_user = User(
         username=username,
@@ -57,7 +40,7 @@ def signup():
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
-@app.route('/signin', methods=['POST'])
+@bp.route('/signin', methods=['POST'])
 def signin():
     data = request.get_json()
     email = data.get('email')
@@ -71,14 +54,23 @@ def signin():
     if not user:
         return jsonify({'error': 'User not found'}), 404
 
-    if not bcrypt.check_password_hash(user.password, password):
-        return jsonify({'error': 'Invalid password'}), 400
+    try:
+        if not check_password(password, user.password):
+            return jsonify({'error': 'Invalid password'}), 400
+
+        # Upgrade hashes made with an older cost (or by Werkzeug) while we
+        # still have the plaintext.
+        if needs_rehash(user.password):
+            user.password = hash_password(password)
+            db.session.commit()
+    except HasherBusy as e:
+        return jsonify({'error': str(e)}), 503
 
     token = jwt.encode({
         'id': user.id,
         'isAdmin': user.is_admin,
-        'exp': datetime.utcnow() + app.config['JWT_EXPIRATION_DELTA']
-    }, app.config['SECRET_KEY'])
+        'exp': datetime.utcnow() + current_app.config['JWT_EXPIRATION_DELTA']
+    }, current_app.config['SECRET_KEY'])
 
     response = make_response(jsonify({
         'id': user.id,
@@ -93,7 +85,7 @@ def signin():
 
     return response
 
-@app.route('/google', methods=['POST'])
+@bp.route('/google', methods=['POST'])
 def google():
     data = request.get_json()
     email = data.get('email')
@@ -107,8 +99,8 @@ def google():
             token = jwt.encode({
                 'id': user.id,
                 'isAdmin': user.is_admin,
-                'exp': datetime.utcnow() + app.config['JWT_EXPIRATION_DELTA']
-            }, app.config['SECRET_KEY'])
+                'exp': datetime.utcnow() + current_app.config['JWT_EXPIRATION_DELTA']
+            }, current_app.config['SECRET_KEY'])
 
             response = make_response(jsonify({
                 'id': user.id,
@@ -124,7 +116,7 @@ def google():
             return response
         else:
             generated_password = ''.join(random.choices(string.ascii_letters + string.digits, k=16))
-            hashed_password = bcrypt.generate_password_hash(generated_password).decode('utf-8')
+            hashed_password = hash_password(generated_password)
 
             new_user = User(
                 username=name.lower().replace(' ', '') + ''.join(random.choices(string.digits, k=4)),
@@ -139,8 +131,8 @@ def google():
             token = jwt.encode({
                 'id': new_user.id,
                 'isAdmin': new_user.is_admin,
-                'exp': datetime.utcnow() + app.config['JWT_EXPIRATION_DELTA']
-            }, app.config['SECRET_KEY'])
+                'exp': datetime.utcnow() + current_app.config['JWT_EXPIRATION_DELTA']
+            }, current_app.config['SECRET_KEY'])
 
             response = make_response(jsonify({
                 'id': new_user.id,
@@ -154,11 +146,8 @@ def google():
             response.set_cookie('access_token', token, httponly=True)
 
             return response
+    except HasherBusy as e:
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
-
-# Run the Flask application
-if __name__ == '__main__':
-    db.create_all()
-    app.run(debug=True)
@@ -0,0 +1,176 @@
+from flask import Blueprint, jsonify, request
+
+from config import db
+from counters import get_counts
+from deletes import delete_subtree
+from likebuffer import buffer as like_buffer
+from likes import liked_comment_ids, toggle_like
+from models import Comment
+from pagination import paginate, InvalidPage
+from serializers import COMMENT_SCHEMA
+from threads import load_thread
+
+bp = Blueprint('comments', __name__)
+
+# Flask routes for comment management
+@bp.route('/comments', methods=['POST'])
+def create_comment():
+    data = request.get_json()
+    content = data.get('content')
+    post_id = data.get('postId')
+    user_id = data.get('userId')
+    parent_id = data.get('parentId')
+
+    if not content or not post_id or not user_id:
+        return jsonify({'error': 'All fields are required'}), 400
+
+    new_comment = Comment(
+        content=content,
+        post_id=post_id,
+        user_id=user_id,
+        parent_id=parent_id,
+    )
+
+    try:
+        if parent_id:
+            parent = Comment.query.get(parent_id)
+            if not parent or parent.post_id != int(post_id):
+                return jsonify({'error': 'Parent comment not found on this post'}), 404
+
+        db.session.add(new_comment)
+        db.session.commit()
+        return jsonify(COMMENT_SCHEMA.dump_object(new_comment)), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/comments/<int:post_id>', methods=['GET'])
+def get_post_comments(post_id):
+    try:
+        comments = Comment.query.filter_by(post_id=post_id).order_by(Comment.created_at.desc()).all()
+        user_id = request.args.get('userId', type=int)
+        liked = liked_comment_ids(db.session, user_id, [comment.id for comment in comments])
+
+        return jsonify(like_buffer.merge([{
+            'id': comment.id,
+            'content': comment.content,
+            'postId': comment.post_id,
+            'userId': comment.user_id,
+            'parentId': comment.parent_id,
+            'numberOfLikes': comment.number_of_likes,
+            'likedByUser': comment.id in liked,
+            'createdAt': comment.created_at,
+            'updatedAt': comment.updated_at,
+        } for comment in comments], user_id)), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/comments/<int:post_id>/thread', methods=['GET'])
+def get_comment_thread(post_id):
+    try:
+        thread = load_thread(db.session, post_id, request.args, like_buffer.merge)
+        if thread is None:
+            return jsonify({'error': 'Comment not found'}), 404
+
+        return jsonify({
+            'comments': thread.comments,
+            'nextCursor': thread.next_cursor,
+        }), 200
+    except InvalidPage as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/comments/<int:comment_id>/like', methods=['PUT'])
+def like_comment(comment_id):
+    try:
+        if not db.session.query(Comment.query.filter_by(id=comment_id).exists()).scalar():
+            return jsonify({'error': 'Comment not found'}), 404
+
+        user_id = request.json.get('userId')
+        if not user_id:
+            return jsonify({'error': 'userId is required'}), 400
+
+        if like_buffer.enabled:
+            liked = like_buffer.toggle(db.session, comment_id, user_id)
+        else:
+            liked = toggle_like(db.session, comment_id, user_id)
+            db.session.commit()
+
+        number_of_likes = db.session.query(Comment.number_of_likes).filter_by(id=comment_id).scalar()
+        number_of_likes = (number_of_likes or 0) + like_buffer.delta(comment_id)
+        return jsonify({
+            'id': comment_id,
+            'numberOfLikes': number_of_likes,
+            'likedByUser': liked,
+        }), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/comments/<int:comment_id>', methods=['PUT'])
+def edit_comment(comment_id):
+    try:
+        comment = Comment.query.get(comment_id)
+
+        if not comment:
+            return jsonify({'error': 'Comment not found'}), 404
+
+        user_id = request.json.get('userId')
+
+        if comment.user_id != user_id:
+            return jsonify({'error': 'You are not allowed to edit this comment'}), 403
+
+        comment.content = request.json.get('content')
+        db.session.commit()
+
+        return jsonify(COMMENT_SCHEMA.dump_object(comment)), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/comments/<int:comment_id>', methods=['DELETE'])
+def delete_comment(comment_id):
+    try:
+        comment = Comment.query.get(comment_id)
+
+        if not comment:
+            return jsonify({'error': 'Comment not found'}), 404
+
+        user_id = request.json.get('userId')
+
+        if comment.user_id != user_id:
+            return jsonify({'error': 'You are not allowed to delete this comment'}), 403
+
+        if not delete_subtree(db.session, comment_id):
+            db.session.rollback()
+            return jsonify({'error': 'Comment not found'}), 404
+        db.session.commit()
+
+        return jsonify({'message': 'Comment has been deleted'}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/comments', methods=['GET'])
+def get_comments():
+    try:
+        if not request.user.is_admin:
+            return jsonify({'error': 'You are not allowed to get all comments'}), 403
+
+        descending = request.args.get('sort') != 'asc'
+
+        page = paginate(Comment.query, Comment.created_at, Comment.id, request.args, descending)
+        counts = get_counts(db.session, 'comments')
+
+        return jsonify({
+            'comments': [COMMENT_SCHEMA.dump_object(comment) for comment in page.items],
+            'totalComments': counts.total,
+            'lastMonthComments': counts.last_month,
+            'nextCursor': page.next_cursor,
+            'prevCursor': page.prev_cursor,
+        }), 200
+    except InvalidPage as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,161 @@
+# Standard library imports
+
+# Remote library imports
+from flask import Blueprint, jsonify, request
+
+# Local imports
+import bulk
+from config import db
+from models import User, Comment, Post
+from includes import (
+    COMMENT_INCLUDES, POST_INCLUDES, InvalidInclude,
+    author_dict, comment_dict, comment_options, dump_posts, parse_include, post_options,
+)
+from likes import likers_by_comment
+from passwords import HasherBusy, hash_password
+from serializers import COMMENT_SCHEMA, POST_SCHEMA, USER_SCHEMA, stream_json_array, stream_ndjson
+from slugs import unique_slug
+
+bp = Blueprint('core', __name__)
+
+@bp.route('/')
+def index():
+    return '<h1>Project Server</h1>'
+
+# Rows fetched per round trip when streaming a whole table.
+EXPORT_BATCH_SIZE = 1000
+
+def bulk_response(create):
+    try:
+        result = create(db.session, bulk.parse_items())
+    except bulk.BulkError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+    # 201 when everything went in, 207 for a partial import, 400 for none.
+    status = 201 if not result.errors else 207 if result.created else 400
+    return jsonify({'created': result.created, 'errors': result.errors}), status
+
+def stream_rows(items):
+    if request.args.get('format') == 'ndjson':
+        return stream_ndjson(items)
+    return stream_json_array(items)
+
+def iter_schema(schema):
+    rows = db.session.execute(schema.select().execution_options(yield_per=EXPORT_BATCH_SIZE))
+    return map(schema.dump_row, rows)
+
+@bp.route('/users', methods=['GET'])
+def get_users():
+    return stream_rows(iter_schema(USER_SCHEMA))
+
+@bp.route('/users', methods=['POST'])
+def create_user():
+    data = request.get_json()
+    try:
+        password = hash_password(data['password'])
+    except HasherBusy as e:
+        return jsonify({'error': str(e)}), 503
+    new_user = User(
+        username=data['username'],
+        email=data['email'],
+        password=password,
+        profile_picture=data.get('profilePicture', 'https://cdn.pixabay.com/photo/2015/10/05/22/37/blank-profile-picture-973460_960_720.png'),
+        is_admin=data.get('isAdmin', False)
+    )
+    db.session.add(new_user)
+    db.session.commit()
+    return jsonify({'message': 'User created successfully'}), 201
+
+@bp.route('/users/bulk', methods=['POST'])
+def create_users_bulk():
+    if not request.user.is_admin:
+        return jsonify({'error': 'You are not allowed to bulk create users'}), 403
+    return bulk_response(bulk.create_users)
+
+@bp.route('/posts', methods=['GET'])
+def get_posts():
+    try:
+        include = parse_include(request.args.get('include'), POST_INCLUDES)
+    except InvalidInclude as e:
+        return jsonify({'error': str(e)}), 400
+
+    if not include:
+        return stream_rows(iter_schema(POST_SCHEMA))
+
+    posts = Post.query.options(*post_options(include)).all()
+    return jsonify(dump_posts(db.session, posts, include))
+
+@bp.route('/posts', methods=['POST'])
+def create_post():
+    data = request.get_json()
+    new_post = Post(
+        user_id=data['userId'],
+        content=data['content'],
+        title=data['title'],
+        image=data.get('image', 'https://www.hostinger.com/tutorials/wp-content/uploads/sites/2/2021/09/how-to-write-a-blog-post.png'),
+        category=data.get('category', 'uncategorized'),
+        slug=data.get('slug') or unique_slug(db.session, data['title'])
+    )
+    db.session.add(new_post)
+    db.session.commit()
+    return jsonify({'message': 'Post created successfully'}), 201
+
+@bp.route('/posts/bulk', methods=['POST'])
+def create_posts_bulk():
+    if not request.user.is_admin:
+        return jsonify({'error': 'You are not allowed to bulk create posts'}), 403
+    return bulk_response(bulk.create_posts)
+
+def iter_comments_with_likes():
+    result = db.session.execute(COMMENT_SCHEMA.select().execution_options(yield_per=EXPORT_BATCH_SIZE))
+    for rows in result.partitions():
+        comments = COMMENT_SCHEMA.dump_rows(rows)
+        likes = likers_by_comment(db.session, [comment['id'] for comment in comments])
+        for comment in comments:
+            comment['likes'] = likes[comment['id']]
+        yield from comments
+
+@bp.route('/comments', methods=['GET'])
+def get_comments():
+    try:
+        include = parse_include(request.args.get('include'), COMMENT_INCLUDES)
+    except InvalidInclude as e:
+        return jsonify({'error': str(e)}), 400
+
+    if not include:
+        return stream_rows(iter_comments_with_likes())
+
+    comments = Comment.query.options(*comment_options(include)).all()
+    likes = likers_by_comment(db.session, [comment.id for comment in comments])
+
+    results = []
+    for comment in comments:
+        result = comment_dict(comment, likes)
+        if 'author' in include:
+            result['author'] = author_dict(comment.author)
+        if 'post' in include:
+            result['post'] = {'id': comment.post.id, 'title': comment.post.title, 'slug': comment.post.slug}
+        results.append(result)
+    return jsonify(results)
+
+@bp.route('/comments', methods=['POST'])
+def create_comment():
+    data = request.get_json()
+    new_comment = Comment(
+        content=data['content'],
+        post_id=data['post_id'],
+        user_id=data['user_id']
+    )
+    db.session.add(new_comment)
+    db.session.commit()
+    return jsonify({'message': 'Comment created successfully'}), 201
+
+@bp.route('/comments/bulk', methods=['POST'])
+def create_comments_bulk():
+    if not request.user.is_admin:
+        return jsonify({'error': 'You are not allowed to bulk create comments'}), 403
+    return bulk_response(bulk.create_comments)
+
@@ -0,0 +1,191 @@
+from flask import Blueprint, jsonify, request
+
+from cache import cached_response
+from config import db
+from counters import get_counts
+from deletes import delete_posts
+from includes import POST_INCLUDES, InvalidInclude, dump_posts, parse_include, post_options
+from models import CategoryCount, Post
+from pagination import paginate, int_arg, page_limit, InvalidPage
+from search import search_posts
+from serializers import CATEGORY_SCHEMA, POST_SCHEMA
+from slugs import find_post, unique_slug
+
+bp = Blueprint('posts', __name__)
+
+# ?sort= orderings for the listing, each served by a (column, id) index.
+# 'active' only lists posts that have comments (paginate skips NULL keys).
+POST_SORTS = {
+    'updated': Post.updated_at,
+    'discussed': Post.comment_count,
+    'active': Post.last_comment_at,
+}
+
+# Cache namespaces each ?include= reads on top of 'posts'.
+INCLUDE_NAMESPACES = {
+    'author': 'post_authors',
+    'comments': 'post_comments',
+}
+
+def included_namespaces(args):
+    names = {name.strip() for name in args.get('include', '').split(',')}
+    return sorted(INCLUDE_NAMESPACES[name] for name in names & set(INCLUDE_NAMESPACES))
+
+# Flask routes for post management
+@bp.route('/posts', methods=['POST'])
+def create_post():
+    data = request.get_json()
+    if not request.user.is_admin:
+        return jsonify({'error': 'You are not allowed to create a post'}), 403
+    if not data.get('title') or not data.get('content'):
+        return jsonify({'error': 'Please provide all required fields'}), 400
+
+    slug = unique_slug(db.session, data.get('title'))
+    new_post = Post(
+        title=data.get('title'),
+        content=data.get('content'),
+        image=data.get('image', 'https://www.hostinger.com/tutorials/wp-content/uploads/sites/2/2021/09/how-to-write-a-blog-post.png'),
+        category=data.get('category', 'uncategorized'),
+        slug=slug,
+        user_id=request.user.id
+    )
+
+    try:
+        db.session.add(new_post)
+        db.session.commit()
+        return jsonify(POST_SCHEMA.dump_object(new_post)), 201
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+def category_facets():
+    # Read from the category_counts summary, so this never touches posts.
+    rows = db.session.execute(
+        CATEGORY_SCHEMA.select()
+        .where(CategoryCount.post_count > 0)
+        .order_by(CategoryCount.post_count.desc(), CategoryCount.category)
+    )
+    return CATEGORY_SCHEMA.dump_rows(rows)
+
+@bp.route('/categories', methods=['GET'])
+@cached_response('posts')
+def get_categories():
+    try:
+        return jsonify({'categories': category_facets()})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def with_last_modified(body, posts):
+    response = jsonify(body)
+    timestamps = [post.updated_at for post in posts if post.updated_at]
+    if timestamps:
+        response.last_modified = max(timestamps)
+    return response
+
+@bp.route('/posts', methods=['GET'])
+@cached_response('posts', depends=included_namespaces)
+def get_posts():
+    try:
+        descending = request.args.get('order') != 'asc'
+        include = parse_include(request.args.get('include'), POST_INCLUDES)
+
+        filters = {}
+        if request.args.get('userId'):
+            filters['user_id'] = request.args.get('userId')
+        if request.args.get('category'):
+            filters['category'] = request.args.get('category')
+        if request.args.get('slug'):
+            filters['slug'] = request.args.get('slug')
+        if request.args.get('postId'):
+            filters['id'] = request.args.get('postId')
+
+        query = Post.query.filter_by(**filters).options(*post_options(include))
+        counts = get_counts(db.session, 'posts')
+
+        # Search results are ordered by relevance, so they page by startIndex
+        # rather than by cursor.
+        if request.args.get('searchTerm'):
+            limit = page_limit(request.args)
+            start_index = int_arg(request.args, 'startIndex', 0, minimum=0)
+            hits = search_posts(query, Post, request.args.get('searchTerm'), limit, start_index)
+
+            return with_last_modified({
+                'posts': dump_posts(db.session, [hit.post for hit in hits], include),
+                'highlights': {hit.post.id: {'title': hit.title_snippet, 'content': hit.content_snippet} for hit in hits},
+                'totalPosts': counts.total,
+                'lastMonthPosts': counts.last_month,
+            }, [hit.post for hit in hits])
+
+        sort = request.args.get('sort', 'updated')
+        if sort not in POST_SORTS:
+            return jsonify({'error': f'sort must be one of {", ".join(POST_SORTS)}'}), 400
+        page = paginate(query, POST_SORTS[sort], Post.id, request.args, descending)
+
+        body = {
+            'posts': dump_posts(db.session, page.items, include),
+            'totalPosts': counts.total,
+            'lastMonthPosts': counts.last_month,
+            'nextCursor': page.next_cursor,
+            'prevCursor': page.prev_cursor,
+        }
+        # ?facets=category adds the per-category post counts for a filter UI.
+        if request.args.get('facets') == 'category':
+            body['facets'] = {'category': category_facets()}
+        return with_last_modified(body, page.items)
+    except (InvalidPage, InvalidInclude) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/posts/<slug>', methods=['GET'])
+@cached_response('posts')
+def get_post(slug):
+    try:
+        post = find_post(db.session, slug)
+        if not post:
+            return jsonify({'error': 'Post not found'}), 404
+        return with_last_modified(POST_SCHEMA.dump_object(post), [post])
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/posts/<int:post_id>', methods=['DELETE'])
+def delete_post(post_id):
+    try:
+        post = Post.query.get(post_id)
+
+        if not post:
+            return jsonify({'error': 'Post not found'}), 404
+
+        if not request.user.is_admin or request.user.id != post.user_id:
+            return jsonify({'error': 'You are not allowed to delete this post'}), 403
+
+        # Comments and likes go first, in chunks, then the post itself.
+        delete_posts(db.session, [post.id])
+
+        return jsonify({'message': 'The post has been deleted'}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/posts/<int:post_id>', methods=['PUT'])
+def update_post(post_id):
+    try:
+        post = Post.query.get(post_id)
+
+        if not post:
+            return jsonify({'error': 'Post not found'}), 404
+
+        if not request.user.is_admin or request.user.id != post.user_id:
+            return jsonify({'error': 'You are not allowed to update this post'}), 403
+
+        post.title = request.json.get('title', post.title)
+        post.content = request.json.get('content', post.content)
+        post.category = request.json.get('category', post.category)
+        post.image = request.json.get('image', post.image)
+
+        db.session.commit()
+
+        return jsonify(POST_SCHEMA.dump_object(post)), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
@@ -1,35 +1,20 @@
-from flask import Flask, jsonify, request
-from flask_sqlalchemy import SQLAlchemy
-from datetime import datetime, timedelta
-import bcrypt
+from flask import Blueprint, jsonify, make_response, request
 
-app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///your_database.db'  # Replace with your database URI
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+from config import db
+from counters import get_counts
+from jobs import enqueue
+from models import User
+from pagination import paginate, InvalidPage
+from passwords import HasherBusy, hash_password
 
-db = SQLAlchemy(app)
-
-# SQLAlchemy User Model
-class User(db.Model):
-    __tablename__ = 'users'
-
-    id = db.Column(db.Integer, primary_key=True)
-    username = db.Column(db.String(20), unique=True, nullable=False)
-    email = db.Column(db.String(120), unique=True, nullable=False)
-    password = db.Column(db.String(60), nullable=False)
-    profile_picture = db.Column(db.String(120), default='https://cdn.pixabay.com/photo/2015/10/05/22/37/blank-profile-picture-973460_960_720.png')
-    is_admin = db.Column(db.Boolean, default=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-
-    def __repr__(self):
-        return f'<User {self.username}>'
+bp = Blueprint('users', __name__)
 
 # Flask routes for user management
-@app.route('/test', methods=['GET'])
+@bp.route('/test', methods=['GET'])
 def test():
     return jsonify({'message': 'API is working!'})
 
-@app.route('/users/<int:user_id>', methods=['PUT'])
+@bp.route('/users/<int:user_id>', methods=['PUT'])
 def update_user(user_id):
     if request.user.id != user_id:
         return jsonify({'error': 'You are not allowed to update this user'}), 403
@@ -43,7 +28,7 @@ def update_user(user_id):
         if request.json.get('password'):
             if len(request.json['password']) < 6:
                 return jsonify({'error': 'Password must be at least 6 characters'}), 400
-            user.password = bcrypt.hashpw(request.json['password'].encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+            user.password = hash_password(request.json['password'])
 
         if request.json.get('username'):
             username = request.json['username']
@@ -70,11 +55,14 @@ def update_user(user_id):
             'isAdmin': user.is_admin,
             'createdAt': user.created_at,
         }), 200
+    except HasherBusy as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
-@app.route('/users/<int:user_id>', methods=['DELETE'])
+@bp.route('/users/<int:user_id>', methods=['DELETE'])
 def delete_user(user_id):
     if not request.user.is_admin and request.user.id != user_id:
         return jsonify({'error': 'You are not allowed to delete this user'}), 403
@@ -85,51 +73,53 @@ def delete_user(user_id):
         if not user:
             return jsonify({'error': 'User not found'}), 404
 
-        db.session.delete(user)
+        # Their posts, comments and likes go in chunks on a worker. The key
+        # includes created_at because SQLite can hand a freed id out again.
+        enqueue(db.session, 'delete_user', {'user_id': user.id}, key=f'delete_user:{user.id}:{user.created_at}')
         db.session.commit()
 
-        return jsonify({'message': 'User has been deleted'}), 200
+        return jsonify({'message': 'User deletion has been scheduled'}), 202
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
-@app.route('/signout', methods=['POST'])
+@bp.route('/signout', methods=['POST'])
 def signout():
     try:
-        return jsonify({'message': 'User has been signed out'}), 200
+        response = make_response(jsonify({'message': 'User has been signed out'}), 200)
+        response.delete_cookie('access_token')
+        return response
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/users', methods=['GET'])
+@bp.route('/users', methods=['GET'])
 def get_users():
     if not request.user.is_admin:
         return jsonify({'error': 'You are not allowed to see all users'}), 403
 
     try:
-        start_index = int(request.args.get('startIndex', 0))
-        limit = int(request.args.get('limit', 9))
-        sort_direction = 1 if request.args.get('sort') == 'asc' else -1
-
-        users = User.query.order_by(User.created_at.desc()).offset(start_index).limit(limit).all()
-        total_users = User.query.count()
+        descending = request.args.get('sort') != 'asc'
 
-        now = datetime.utcnow()
-        one_month_ago = now - timedelta(days=30)
-        last_month_users = User.query.filter(User.created_at >= one_month_ago).count()
+        page = paginate(User.query, User.created_at, User.id, request.args, descending)
+        counts = get_counts(db.session, 'users')
 
         users_without_password = [{'id': user.id, 'username': user.username, 'email': user.email,
                                    'profilePicture': user.profile_picture, 'isAdmin': user.is_admin,
-                                   'createdAt': user.created_at} for user in users]
+                                   'createdAt': user.created_at} for user in page.items]
 
         return jsonify({
             'users': users_without_password,
-            'totalUsers': total_users,
-            'lastMonthUsers': last_month_users,
+            'totalUsers': counts.total,
+            'lastMonthUsers': counts.last_month,
+            'nextCursor': page.next_cursor,
+            'prevCursor': page.prev_cursor,
         }), 200
+    except InvalidPage as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/users/<int:user_id>', methods=['GET'])
+@bp.route('/users/<int:user_id>', methods=['GET'])
 def get_user(user_id):
     try:
         user = User.query.get(user_id)
@@ -147,8 +137,3 @@ def get_user(user_id):
         }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-
-# Run the Flask application
-if __name__ == '__main__':
-    db.create_all()
-    app.run(debug=True)
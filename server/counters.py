@@ -0,0 +1,390 @@
+# Standard library imports
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+# Remote library imports
+import click
+from flask.cli import AppGroup
+from sqlalchemy import case, func, insert, inspect, literal, select
+
+# Local imports
+from config import db
+from models import CategoryCount, DailyCount, User, Post, Comment
+from sqlhelpers import dialect_insert, listen_all
+
+TRACKED = {
+    'users': User,
+    'posts': Post,
+    'comments': Comment,
+}
+
+CACHE_TTL = 30
+
+Counts = namedtuple('Counts', ['total', 'last_month'])
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+posts = Post.__table__
+comments = Comment.__table__
+categories = CategoryCount.__table__
+
+
+def _last_comment_at():
+    return select(func.max(comments.c.created_at)).where(comments.c.post_id == posts.c.id).scalar_subquery()
+
+
+def _last_updated_in_category():
+    return (
+        select(func.max(posts.c.updated_at))
+        .where(posts.c.category == categories.c.category)
+        .scalar_subquery()
+    )
+
+
+def _upsert_statement(connection):
+    stmt = dialect_insert(connection, DailyCount.__table__)
+    return stmt.on_conflict_do_update(
+        index_elements=['name', 'day'],
+        set_={'count': DailyCount.__table__.c.count + stmt.excluded.count},
+    )
+
+
+def _bump(deltas, instance, step):
+    name = getattr(instance, '__tablename__', None)
+    if name not in TRACKED:
+        return
+    created_at = instance.created_at or datetime.utcnow()
+    key = (name, created_at.date())
+    deltas[key] = deltas.get(key, 0) + step
+
+
+def _collect_deletes(session, flush_context, instances):
+    # created_at has to be read before the row is gone.
+    deltas = session.info.setdefault('counter_deltas', {})
+    for instance in session.deleted:
+        _bump(deltas, instance, -1)
+
+
+def _apply_deltas(session, flush_context):
+    deltas = session.info.pop('counter_deltas', {})
+    for instance in session.new:
+        _bump(deltas, instance, 1)
+
+    _write_counts(session, deltas)
+
+
+def _write_counts(session, deltas):
+    rows = [{'name': name, 'day': day, 'count': step} for (name, day), step in deltas.items() if step]
+    if not rows:
+        return
+
+    connection = session.connection()
+    connection.execute(_upsert_statement(connection), rows)
+    session.info.setdefault('counters_dirty', set()).update(row['name'] for row in rows)
+
+
+def _collect_deleted_comments(session, flush_context, instances):
+    stats = session.info.setdefault('post_stats', {})
+    for instance in session.deleted:
+        if isinstance(instance, Comment):
+            _remove_comment(stats, instance.post_id)
+
+
+def _apply_post_stats(session, flush_context):
+    stats = session.info.pop('post_stats', {})
+    for instance in session.new:
+        if isinstance(instance, Comment):
+            _add_comment(stats, instance.post_id, instance.created_at or datetime.utcnow())
+    _write_post_stats(session, stats)
+
+
+def _add_comment(stats, post_id, created_at):
+    entry = stats.setdefault(post_id, [0, None, False])
+    entry[0] += 1
+    entry[1] = max(entry[1] or created_at, created_at)
+
+
+def _remove_comment(stats, post_id):
+    entry = stats.setdefault(post_id, [0, None, False])
+    entry[0] -= 1
+    entry[2] = True
+
+
+def _write_post_stats(session, stats):
+    if not stats:
+        return
+
+    connection = session.connection()
+    for post_id, (step, latest, deleted) in stats.items():
+        values = {'comment_count': posts.c.comment_count + step, 'updated_at': posts.c.updated_at}
+        if deleted:
+            # The deleted comment may have been the newest one.
+            values['last_comment_at'] = _last_comment_at()
+        elif latest:
+            values['last_comment_at'] = case(
+                (posts.c.last_comment_at.is_(None), latest),
+                (posts.c.last_comment_at < latest, latest),
+                else_=posts.c.last_comment_at,
+            )
+        connection.execute(posts.update().where(posts.c.id == post_id).values(**values))
+
+
+def _collect_deleted_posts(session, flush_context, instances):
+    stats = session.info.setdefault('category_stats', {})
+    for instance in session.deleted:
+        if isinstance(instance, Post):
+            _add_post(stats, instance.category, None, -1)
+
+
+def _apply_category_counts(session, flush_context):
+    stats = session.info.pop('category_stats', {})
+    for instance in session.new:
+        if isinstance(instance, Post):
+            _add_post(stats, instance.category, instance.updated_at or datetime.utcnow(), 1)
+    for instance in session.dirty:
+        if isinstance(instance, Post) and session.is_modified(instance, include_collections=False):
+            # Attribute history still holds the pre-flush category here.
+            moved = inspect(instance).attrs.category.history
+            for old in moved.deleted if moved.has_changes() else ():
+                _add_post(stats, old, None, -1)
+            _add_post(stats, instance.category, instance.updated_at or datetime.utcnow(), 1 if moved.has_changes() else 0)
+    _write_category_counts(session, stats)
+
+
+def _add_post(stats, category, updated_at, step):
+    if category is None:
+        return
+    entry = stats.setdefault(category, [0, None, False])
+    entry[0] += step
+    if step < 0:
+        entry[2] = True
+    elif updated_at:
+        entry[1] = max(entry[1] or updated_at, updated_at)
+
+
+def _category_upsert_statement(connection):
+    stmt = dialect_insert(connection, categories)
+    latest = stmt.excluded.last_updated_at
+    return stmt.on_conflict_do_update(
+        index_elements=['category'],
+        set_={
+            'post_count': categories.c.post_count + stmt.excluded.post_count,
+            'last_updated_at': case(
+                (categories.c.last_updated_at.is_(None), latest),
+                (latest > categories.c.last_updated_at, latest),
+                else_=categories.c.last_updated_at,
+            ),
+        },
+    )
+
+
+def _write_category_counts(session, stats):
+    if not stats:
+        return
+
+    connection = session.connection()
+    rows = [
+        {'category': category, 'post_count': step, 'last_updated_at': latest}
+        for category, (step, latest, _) in stats.items() if step or latest
+    ]
+    if rows:
+        connection.execute(_category_upsert_statement(connection), rows)
+    # A post that left the category may have been its most recently updated.
+    shrunk = [category for category, (_, _, removed) in stats.items() if removed]
+    if shrunk:
+        connection.execute(
+            categories.update()
+            .where(categories.c.category.in_(shrunk))
+            .values(last_updated_at=_last_updated_in_category())
+        )
+
+
+def _invalidate(session):
+    for name in session.info.pop('counters_dirty', ()):
+        invalidate(name)
+
+
+def _discard(session):
+    session.info.pop('counter_deltas', None)
+    session.info.pop('counters_dirty', None)
+    session.info.pop('post_stats', None)
+    session.info.pop('category_stats', None)
+
+
+def record_inserts(session, name, rows):
+    """Count ``rows`` (dicts) that were bulk inserted into tracked table ``name``.
+
+    Bulk inserts skip the flush events, so bulk writers call this in the
+    same transaction instead. Comment rows also update their posts'
+    ``comment_count`` and ``last_comment_at``, post rows the category
+    summary.
+    """
+    deltas = {}
+    stats = {}
+    category_stats = {}
+    for row in rows:
+        key = (name, row['created_at'].date())
+        deltas[key] = deltas.get(key, 0) + 1
+        if name == 'comments':
+            _add_comment(stats, row['post_id'], row['created_at'])
+        elif name == 'posts':
+            _add_post(category_stats, row.get('category'), row['updated_at'], 1)
+    _write_counts(session, deltas)
+    _write_post_stats(session, stats)
+    _write_category_counts(session, category_stats)
+
+
+def record_deletes(session, name, rows):
+    """Uncount ``rows`` (dicts) removed from tracked table ``name`` by bulk deletes.
+
+    The counterpart of ``record_inserts``: rows need ``created_at``, plus
+    ``post_id`` for comments and ``category`` for posts.
+    """
+    deltas = {}
+    stats = {}
+    category_stats = {}
+    for row in rows:
+        key = (name, (row['created_at'] or datetime.utcnow()).date())
+        deltas[key] = deltas.get(key, 0) - 1
+        if name == 'comments':
+            _remove_comment(stats, row['post_id'])
+        elif name == 'posts':
+            _add_post(category_stats, row['category'], None, -1)
+    _write_counts(session, deltas)
+    _write_post_stats(session, stats)
+    _write_category_counts(session, category_stats)
+
+
+def invalidate(name=None):
+    with _cache_lock:
+        if name is None:
+            _cache.clear()
+        else:
+            _cache.pop(name, None)
+
+
+def cached_counts(name):
+    with _cache_lock:
+        cached = _cache.get(name)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+    return None
+
+
+def counts_statement(name):
+    since = (datetime.utcnow() - timedelta(days=30)).date()
+    return select(
+        func.coalesce(func.sum(DailyCount.count), 0),
+        func.coalesce(func.sum(case((DailyCount.day >= since, DailyCount.count), else_=0)), 0),
+    ).where(DailyCount.name == name)
+
+
+def remember_counts(name, row):
+    """Cache the ``(total, last_month)`` row of ``counts_statement`` and return it."""
+    total, last_month = row
+    counts = Counts(int(total), int(last_month))
+    with _cache_lock:
+        _cache[name] = (time.monotonic() + CACHE_TTL, counts)
+    return counts
+
+
+def get_counts(session, name):
+    """Return ``Counts(total, last_month)`` for a tracked table.
+
+    Served from the ``daily_counts`` rollup in a single query and cached
+    in-process for ``CACHE_TTL`` seconds. ``last_month`` is bucketed by
+    day, so it includes the whole of the day thirty days ago.
+    """
+    counts = cached_counts(name)
+    if counts is None:
+        counts = remember_counts(name, session.execute(counts_statement(name)).one())
+    return counts
+
+
+def rebuild(session, names=None):
+    """Recompute the rollup from the source tables.
+
+    Bulk ``Query.delete()`` and raw SQL bypass the session events, so this
+    is the way to bring the counters back in line afterwards.
+    """
+    for name in names or TRACKED:
+        model = TRACKED[name]
+        day = func.date(model.created_at)
+        session.execute(DailyCount.__table__.delete().where(DailyCount.name == name))
+        session.execute(
+            insert(DailyCount).from_select(
+                ['name', 'day', 'count'],
+                select(literal(name), day, func.count()).group_by(day),
+            )
+        )
+        invalidate(name)
+    session.commit()
+
+
+def reconcile_posts(session):
+    """Recompute every post's ``comment_count`` and ``last_comment_at``.
+
+    One correlated UPDATE, each subquery a seek on the comments
+    ``(post_id, created_at)`` index. ``updated_at`` is left alone.
+    """
+    session.execute(posts.update().values(
+        comment_count=select(func.count()).where(comments.c.post_id == posts.c.id).scalar_subquery(),
+        last_comment_at=_last_comment_at(),
+        updated_at=posts.c.updated_at,
+    ))
+    session.commit()
+
+
+def rebuild_categories(session):
+    """Recompute the ``category_counts`` summary from ``posts``."""
+    session.execute(categories.delete())
+    session.execute(
+        insert(categories).from_select(
+            ['category', 'post_count', 'last_updated_at'],
+            select(posts.c.category, func.count(), func.max(posts.c.updated_at))
+            .where(posts.c.category.isnot(None))
+            .group_by(posts.c.category),
+        )
+    )
+    session.commit()
+
+
+def init_app(app):
+    """Keep the rollups current on every flush of ``db.session``."""
+    listen_all(db.session, [
+        ('before_flush', _collect_deletes),
+        ('after_flush', _apply_deltas),
+        ('before_flush', _collect_deleted_comments),
+        ('after_flush', _apply_post_stats),
+        ('before_flush', _collect_deleted_posts),
+        ('after_flush', _apply_category_counts),
+        ('after_commit', _invalidate),
+        ('after_rollback', _discard),
+    ])
+
+
+counters_cli = AppGroup('counters', help='Maintain the dashboard counters.')
+
+
+@counters_cli.command('rebuild')
+@click.argument('names', nargs=-1, type=click.Choice(sorted(TRACKED)))
+def rebuild_command(names):
+    rebuild(db.session, names)
+    click.echo('Counters rebuilt.')
+
+
+@counters_cli.command('posts')
+def reconcile_posts_command():
+    """Recompute post comment counts and last comment times."""
+    reconcile_posts(db.session)
+    click.echo('Post comment stats reconciled.')
+
+
+@counters_cli.command('categories')
+def rebuild_categories_command():
+    """Recompute the per-category post counts."""
+    rebuild_categories(db.session)
+    click.echo('Category counts rebuilt.')
@@ -0,0 +1,99 @@
+# Standard library imports
+
+# Remote library imports
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+# Local imports
+
+# Per-environment engine settings, picked with DB_PROFILE (APP_ENV).
+# ``pragmas`` only apply to SQLite and run on every new DBAPI connection.
+# SQLite ignores foreign keys unless asked per connection, so every profile
+# turns them on: the ON DELETE CASCADE in models.py depends on it.
+PROFILES = {
+    'development': {
+        'pragmas': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'busy_timeout': 5000,
+            'foreign_keys': 'ON',
+        },
+        'pool': {
+            'pool_size': 5,
+            'max_overflow': 5,
+            'pool_recycle': 3600,
+            'pool_pre_ping': False,
+        },
+    },
+    'production': {
+        'pragmas': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'busy_timeout': 5000,
+            'cache_size': -64000,
+            'mmap_size': 268435456,
+            'temp_store': 'MEMORY',
+            'foreign_keys': 'ON',
+        },
+        'pool': {
+            'pool_size': 10,
+            'max_overflow': 20,
+            'pool_recycle': 1800,
+            'pool_pre_ping': True,
+        },
+    },
+    'testing': {
+        'pragmas': {
+            'synchronous': 'OFF',
+            'busy_timeout': 1000,
+            'foreign_keys': 'ON',
+        },
+        'pool': {},
+    },
+    # Library defaults: rollback journal, FULL sync, no busy timeout.
+    'default': {
+        'pragmas': {
+            'foreign_keys': 'ON',
+        },
+        'pool': {},
+    },
+}
+
+
+def settings(profile):
+    """Settings for ``profile``, or a ValueError naming the profiles there are."""
+    if profile not in PROFILES:
+        raise ValueError(f'DB_PROFILE (APP_ENV) must be one of {", ".join(PROFILES)}, not {profile!r}')
+    return PROFILES[profile]
+
+
+def _is_memory(url):
+    return url.database in (None, '', ':memory:') or 'mode=memory' in str(url)
+
+
+def engine_options(profile, uri):
+    """``SQLALCHEMY_ENGINE_OPTIONS`` for ``profile`` against ``uri``."""
+    pool = dict(settings(profile)['pool'])
+    url = make_url(uri)
+    if not pool or (url.get_backend_name() == 'sqlite' and _is_memory(url)):
+        return {}
+    if url.get_backend_name() == 'sqlite':
+        # Pooled SQLite connections are handed between threads.
+        return {'poolclass': QueuePool, 'connect_args': {'check_same_thread': False}, **pool}
+    return pool
+
+
+def install_pragmas(engine, profile):
+    pragmas = settings(profile)['pragmas']
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
@@ -0,0 +1,181 @@
+# Standard library imports
+from collections import Counter, defaultdict
+
+# Remote library imports
+from sqlalchemy import and_, bindparam, delete, func, select
+
+# Local imports
+import counters
+from likes import IN_CHUNK_SIZE
+from models import Comment, CommentLike, Post, User
+from threads import PATH_END
+
+# Rows removed per statement, and per transaction for the outer loops.
+DELETE_CHUNK_SIZE = IN_CHUNK_SIZE
+
+users = User.__table__
+posts = Post.__table__
+comments = Comment.__table__
+comment_likes = CommentLike.__table__
+
+
+def _chunks(values, size=DELETE_CHUNK_SIZE):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _recount_likes(session, comment_ids):
+    likes_per_comment = (
+        select(func.count())
+        .where(comment_likes.c.comment_id == comments.c.id)
+        .scalar_subquery()
+    )
+    for chunk in _chunks(comment_ids):
+        session.execute(
+            comments.update()
+            .where(comments.c.id.in_(chunk))
+            .values(number_of_likes=likes_per_comment, updated_at=comments.c.updated_at)
+        )
+
+
+def _with_replies(session, comment_ids):
+    """``comment_ids`` plus every reply below them, from one path-range join."""
+    roots = comments.alias('roots')
+    replies = session.scalars(
+        select(comments.c.id)
+        .join(roots, and_(
+            roots.c.post_id == comments.c.post_id,
+            comments.c.path > roots.c.path,
+            comments.c.path < roots.c.path + PATH_END,
+        ))
+        .where(roots.c.id.in_(comment_ids))
+    )
+    return set(comment_ids) | set(replies)
+
+
+def delete_comments(session, comment_ids):
+    """Delete ``comment_ids`` and their likes with set-based statements.
+
+    The ids must already include every reply below them. Bulk deletes skip
+    the session events, so the daily counters, the posts' comment stats and
+    the ``reply_count`` of parents that survive are updated here. The
+    caller owns the transaction.
+    """
+    # Deepest first, one depth per statement: a parent never goes while a
+    # reply is left, so ON DELETE CASCADE can't remove rows RETURNING misses.
+    by_depth = defaultdict(list)
+    for chunk in _chunks(comment_ids):
+        for comment_id, depth in session.execute(select(comments.c.id, comments.c.depth).where(comments.c.id.in_(chunk))):
+            by_depth[depth].append(comment_id)
+
+    deleted = []
+    for depth in sorted(by_depth, reverse=True):
+        for chunk in _chunks(by_depth[depth]):
+            session.execute(delete(CommentLike).where(CommentLike.comment_id.in_(chunk)))
+            deleted.extend(session.execute(
+                comments.delete()
+                .where(comments.c.id.in_(chunk))
+                .returning(comments.c.post_id, comments.c.parent_id, comments.c.created_at)
+            ))
+
+    gone = set(comment_ids)
+    orphaned = Counter(row.parent_id for row in deleted if row.parent_id and row.parent_id not in gone)
+    if orphaned:
+        session.execute(
+            comments.update()
+            .where(comments.c.id == bindparam('b_id'))
+            .values(reply_count=comments.c.reply_count - bindparam('b_count'), updated_at=comments.c.updated_at),
+            [{'b_id': parent_id, 'b_count': count} for parent_id, count in orphaned.items()],
+        )
+    counters.record_deletes(session, 'comments', [row._asdict() for row in deleted])
+    return len(deleted)
+
+
+def delete_subtree(session, comment_id):
+    """Delete a comment with every reply below it and all their likes.
+
+    A comment whose ``path`` was never filled in has no replies to find,
+    but is still deleted itself. Returns the number of comments deleted, 0
+    if ``comment_id`` does not exist. The caller owns the transaction.
+    """
+    return delete_comments(session, _with_replies(session, [comment_id]))
+
+
+def delete_posts(session, post_ids, chunk_size=DELETE_CHUNK_SIZE):
+    """Delete posts with every comment (and like) on them.
+
+    Comments go ``chunk_size`` at a time with ``WHERE post_id IN``, each
+    chunk in its own transaction, then the posts themselves. Returns the
+    number of rows deleted.
+    """
+    total = 0
+    for batch in _chunks(post_ids, chunk_size):
+        while True:
+            # Deepest first, so no chunk holds a comment whose replies are left.
+            comment_ids = session.scalars(
+                select(comments.c.id).where(comments.c.post_id.in_(batch))
+                .order_by(comments.c.depth.desc()).limit(chunk_size)
+            ).all()
+            if not comment_ids:
+                break
+            # Whole posts are going, so there are no surviving replies to chase.
+            total += delete_comments(session, comment_ids)
+            session.commit()
+        deleted = session.execute(
+            posts.delete().where(posts.c.id.in_(batch)).returning(posts.c.category, posts.c.created_at)
+        ).all()
+        counters.record_deletes(session, 'posts', [row._asdict() for row in deleted])
+        session.commit()
+        total += len(deleted)
+    return total
+
+
+def delete_users(session, user_ids, chunk_size=DELETE_CHUNK_SIZE):
+    """Delete users with their likes, comments (and the replies under them)
+    and posts, using set-based ``WHERE user_id IN`` deletes of at most
+    ``chunk_size`` rows.
+
+    Each chunk commits on its own, so neither the transaction nor the
+    session grows with the size of an account, and a run that dies part way
+    can simply be started again. Returns the number of rows deleted.
+    """
+    total = 0
+    for batch in _chunks(user_ids, chunk_size):
+        while True:
+            liked = session.scalars(
+                select(comment_likes.c.comment_id).where(comment_likes.c.user_id.in_(batch)).limit(chunk_size)
+            ).all()
+            if not liked:
+                break
+            removed = session.execute(
+                delete(CommentLike).where(CommentLike.user_id.in_(batch), CommentLike.comment_id.in_(liked))
+            )
+            _recount_likes(session, liked)
+            session.commit()
+            total += removed.rowcount
+
+        while True:
+            comment_ids = session.scalars(
+                select(comments.c.id).where(comments.c.user_id.in_(batch)).limit(chunk_size)
+            ).all()
+            if not comment_ids:
+                break
+            total += delete_comments(session, _with_replies(session, comment_ids))
+            session.commit()
+
+        while True:
+            post_ids = session.scalars(select(posts.c.id).where(posts.c.user_id.in_(batch)).limit(chunk_size)).all()
+            if not post_ids:
+                break
+            total += delete_posts(session, post_ids, chunk_size)
+
+        deleted = session.execute(users.delete().where(users.c.id.in_(batch)).returning(users.c.created_at)).all()
+        counters.record_deletes(session, 'users', [row._asdict() for row in deleted])
+        session.commit()
+        total += len(deleted)
+    return total
+
+
+def delete_user(session, user_id, chunk_size=DELETE_CHUNK_SIZE):
+    return delete_users(session, [user_id], chunk_size)
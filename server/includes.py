@@ -0,0 +1,74 @@
+# Standard library imports
+
+# Remote library imports
+from sqlalchemy.orm import joinedload, selectinload
+
+# Local imports
+from likes import likers_by_comment
+from models import Comment, Post
+from serializers import COMMENT_SCHEMA, POST_SCHEMA
+
+POST_INCLUDES = {'author', 'comments'}
+COMMENT_INCLUDES = {'author', 'post'}
+
+
+class InvalidInclude(ValueError):
+    pass
+
+
+def parse_include(value, allowed):
+    """Turn ``?include=author,comments`` into a set, rejecting unknown names."""
+    include = {name.strip() for name in (value or '').split(',') if name.strip()}
+    unknown = include - allowed
+    if unknown:
+        raise InvalidInclude(f"Unknown include: {', '.join(sorted(unknown))}")
+    return include
+
+
+def post_options(include):
+    # Many-to-one rides along on the same SELECT; collections get one extra
+    # SELECT ... WHERE post_id IN (...) for the whole page.
+    options = []
+    if 'author' in include:
+        options.append(joinedload(Post.author))
+    if 'comments' in include:
+        options.append(selectinload(Post.comments))
+    return options
+
+
+def comment_options(include):
+    options = []
+    if 'author' in include:
+        options.append(joinedload(Comment.author))
+    if 'post' in include:
+        options.append(joinedload(Comment.post))
+    return options
+
+
+
+def author_dict(user):
+    return {
+        'id': user.id,
+        'username': user.username,
+        'profile_picture': user.profile_picture,
+    }
+
+
+def comment_dict(comment, likes):
+    result = COMMENT_SCHEMA.dump_object(comment)
+    result['likes'] = likes[comment.id]
+    return result
+
+
+def dump_posts(session, posts, include):
+    """Serialize ``posts`` (loaded with ``post_options(include)``) with their includes."""
+    likes = likers_by_comment(session, [comment.id for post in posts for comment in post.comments]) if 'comments' in include else {}
+    results = []
+    for post in posts:
+        result = POST_SCHEMA.dump_object(post)
+        if 'author' in include:
+            result['author'] = author_dict(post.author)
+        if 'comments' in include:
+            result['comments'] = [comment_dict(comment, likes) for comment in post.comments]
+        results.append(result)
+    return results
@@ -0,0 +1,180 @@
+# Standard library imports
+import hmac
+import logging
+import random
+import threading
+import time
+from collections import defaultdict
+
+# Remote library imports
+from flask import Response, abort, g, has_request_context, request
+from sqlalchemy import event
+
+# Local imports
+from config import db
+
+slow_query_log = logging.getLogger('knowledgehub.slow_query')
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class Metrics:
+    """Per-process request and database counters in Prometheus text format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = defaultdict(int)
+        self.latency_sum = defaultdict(float)
+        self.latency_buckets = defaultdict(lambda: [0] * len(LATENCY_BUCKETS))
+        self.db_queries = defaultdict(int)
+        self.db_seconds = defaultdict(float)
+        self.slow_queries = 0
+
+    def observe(self, endpoint, method, status, seconds, queries, db_seconds):
+        key = (endpoint, method, str(status))
+        with self._lock:
+            self.requests[key] += 1
+            self.latency_sum[(endpoint, method)] += seconds
+            buckets = self.latency_buckets[(endpoint, method)]
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    buckets[i] += 1
+            self.db_queries[(endpoint, method)] += queries
+            self.db_seconds[(endpoint, method)] += db_seconds
+
+    def slow_query(self):
+        with self._lock:
+            self.slow_queries += 1
+
+    def render(self):
+        lines = []
+        with self._lock:
+            lines.append('# TYPE http_requests_total counter')
+            for (endpoint, method, status), value in sorted(self.requests.items()):
+                lines.append(f'http_requests_total{{endpoint="{endpoint}",method="{method}",status="{status}"}} {value}')
+
+            lines.append('# TYPE http_request_duration_seconds histogram')
+            for (endpoint, method), buckets in sorted(self.latency_buckets.items()):
+                labels = f'endpoint="{endpoint}",method="{method}"'
+                count = sum(value for (e, m, _), value in self.requests.items() if (e, m) == (endpoint, method))
+                for bound, value in zip(LATENCY_BUCKETS, buckets):
+                    lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {value}')
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {count}')
+                lines.append(f'http_request_duration_seconds_sum{{{labels}}} {self.latency_sum[(endpoint, method)]:.6f}')
+                lines.append(f'http_request_duration_seconds_count{{{labels}}} {count}')
+
+            lines.append('# TYPE db_queries_total counter')
+            for (endpoint, method), value in sorted(self.db_queries.items()):
+                lines.append(f'db_queries_total{{endpoint="{endpoint}",method="{method}"}} {value}')
+            lines.append('# TYPE db_query_seconds_total counter')
+            for (endpoint, method), value in sorted(self.db_seconds.items()):
+                lines.append(f'db_query_seconds_total{{endpoint="{endpoint}",method="{method}"}} {value:.6f}')
+
+            lines.append('# TYPE db_slow_queries_total counter')
+            lines.append(f'db_slow_queries_total {self.slow_queries}')
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
+
+
+def add_timing(name, seconds):
+    """Add ``seconds`` to the ``name`` phase of the current request, if any."""
+    if has_request_context():
+        timings = g.setdefault('timings', defaultdict(float))
+        timings[name] += seconds
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+def _make_after_cursor_execute(slow_ms, sample_rate):
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_started'].pop()
+        if has_request_context():
+            g.db_queries = g.get('db_queries', 0) + 1
+            add_timing('db', elapsed)
+
+        if elapsed * 1000 >= slow_ms and random.random() < sample_rate:
+            metrics.slow_query()
+            slow_query_log.warning(
+                '%.1f ms%s %s -- params: %.500r',
+                elapsed * 1000,
+                f' [{request.method} {request.path}]' if has_request_context() else '',
+                statement,
+                parameters,
+            )
+    return after_cursor_execute
+
+
+def _before_request():
+    g.request_started = time.perf_counter()
+
+
+def _after_request(response):
+    started = g.pop('request_started', None)
+    if started is None:
+        return response
+    total = time.perf_counter() - started
+    timings = g.get('timings', {})
+    queries = g.get('db_queries', 0)
+
+    parts = [f'db;dur={timings.get("db", 0) * 1000:.2f};desc="{queries} queries"']
+    parts.extend(
+        f'{name};dur={seconds * 1000:.2f}' for name, seconds in timings.items() if name != 'db'
+    )
+    parts.append(f'total;dur={total * 1000:.2f}')
+    response.headers['Server-Timing'] = ', '.join(parts)
+
+    metrics.observe(
+        request.url_rule.rule if request.url_rule else 'unmatched',
+        request.method,
+        response.status_code,
+        total,
+        queries,
+        timings.get('db', 0),
+    )
+    return response
+
+
+def _make_metrics_view(token):
+    # remote_addr is the proxy's address behind a reverse proxy, so it says
+    # nothing about who is asking; require the scrape token or an admin.
+    expected = f'Bearer {token}'.encode('utf-8') if token else None
+
+    def metrics_view():
+        authorization = request.headers.get('Authorization', '').encode('utf-8')
+        scraper = expected is not None and hmac.compare_digest(authorization, expected)
+        user = getattr(request, 'user', None)
+        if not scraper and not (user is not None and user.is_admin):
+            abort(404)
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+    return metrics_view
+
+
+def init_app(app):
+    """Time every request and its SQL, and serve ``/metrics``.
+
+    ``/metrics`` answers a scraper sending ``Authorization: Bearer
+    <METRICS_TOKEN>`` or a signed-in admin, and 404s for anyone else.
+    Config: ``METRICS_TOKEN``, ``SLOW_QUERY_MS`` (default 100),
+    ``SLOW_QUERY_SAMPLE_RATE`` (0-1, default 1.0) and ``SLOW_QUERY_LOG``
+    (a file path; otherwise the ``knowledgehub.slow_query`` logger uses
+    the app's handlers).
+    """
+    if app.config.get('SLOW_QUERY_LOG'):
+        handler = logging.FileHandler(app.config['SLOW_QUERY_LOG'])
+        handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+        slow_query_log.addHandler(handler)
+        slow_query_log.setLevel(logging.WARNING)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _make_after_cursor_execute(
+        app.config.get('SLOW_QUERY_MS', 100), app.config.get('SLOW_QUERY_SAMPLE_RATE', 1.0)
+    ))
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.add_url_rule('/metrics', 'metrics', _make_metrics_view(app.config.get('METRICS_TOKEN')))
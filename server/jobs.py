@@ -0,0 +1,318 @@
+"""Background jobs: a queue table in the app database plus worker processes.
+
+Requests enqueue work in their own transaction with ``enqueue`` and
+return; ``flask jobs work`` runs workers that claim due jobs, run their
+handler and retry failures with exponential backoff. A job whose worker
+died is picked up again once its lease runs out, so handlers must be safe
+to run twice.
+"""
+# Standard library imports
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+# Remote library imports
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import case, func, select
+
+# Local imports
+from config import db
+from models import Job
+from sqlhelpers import dialect_insert
+
+log = logging.getLogger('knowledgehub.jobs')
+
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_POLL_SECONDS = 1.0
+DEFAULT_LEASE_SECONDS = 600
+# How soon a failed lease renewal is tried again (capped at the usual interval).
+RENEW_RETRY_SECONDS = 5
+RETRY_BASE_SECONDS = 5
+MAX_RETRY_SECONDS = 3600
+
+# Candidates looked at per claim; another worker may win any one of them.
+CLAIM_BATCH = 10
+
+# GETs replayed by warm_cache: the first page of each listing people land on.
+WARM_PATHS = (
+    '/api/posts',
+    '/api/posts?sort=discussed',
+    '/api/posts?sort=active',
+    '/api/categories',
+)
+
+jobs = Job.__table__
+
+HANDLERS = {}
+
+
+def handler(kind):
+    """Register ``fn(session, **payload)`` as the handler for ``kind``."""
+    def register(fn):
+        HANDLERS[kind] = fn
+        return fn
+    return register
+
+
+def enqueue(session, kind, payload=None, run_at=None, key=None, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """Queue a ``kind`` job in the caller's transaction.
+
+    ``run_at`` schedules it for later. A job with an idempotency ``key`` is
+    only ever queued once: enqueueing the same key again (say, a retried
+    request) is a no-op. Returns ``True`` if a job was added.
+    """
+    if kind not in HANDLERS:
+        raise ValueError(f'Unknown job kind: {kind}')
+    now = datetime.utcnow()
+    connection = session.connection()
+    stmt = dialect_insert(connection, jobs).values(
+        kind=kind,
+        payload=json.dumps(payload or {}),
+        status='queued',
+        idempotency_key=key,
+        attempts=0,
+        max_attempts=max_attempts,
+        run_at=run_at or now,
+        created_at=now,
+    )
+    if key is not None:
+        stmt = stmt.on_conflict_do_nothing(index_elements=['idempotency_key'])
+    return session.execute(stmt).rowcount == 1
+
+
+def claim(session, worker):
+    """Mark the next due job as running under ``worker`` and return it, or ``None``.
+
+    A candidate only counts as claimed if it is still queued when the
+    UPDATE runs, so concurrent workers never run the same job.
+    """
+    now = datetime.utcnow()
+    due = (jobs.c.status == 'queued') & (jobs.c.run_at <= now)
+    candidates = session.scalars(
+        select(jobs.c.id).where(due).order_by(jobs.c.run_at, jobs.c.id).limit(CLAIM_BATCH)
+    ).all()
+    for job_id in candidates:
+        claimed = session.execute(
+            jobs.update()
+            .where(jobs.c.id == job_id, due)
+            .values(status='running', locked_by=worker, locked_at=now, attempts=jobs.c.attempts + 1)
+        )
+        if claimed.rowcount == 1:
+            session.commit()
+            return session.execute(select(jobs).where(jobs.c.id == job_id)).one()
+    session.rollback()
+    return None
+
+
+def release_expired(session, lease=DEFAULT_LEASE_SECONDS):
+    """Requeue running jobs whose worker has not renewed them for ``lease`` seconds."""
+    expired = session.execute(
+        jobs.update()
+        .where(jobs.c.status == 'running', jobs.c.locked_at < datetime.utcnow() - timedelta(seconds=lease))
+        .values(
+            status=case((jobs.c.attempts >= jobs.c.max_attempts, 'failed'), else_='queued'),
+            locked_by=None,
+            last_error='lease expired',
+        )
+    )
+    session.commit()
+    return expired.rowcount
+
+
+def retry_delay(attempts):
+    return min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), MAX_RETRY_SECONDS)
+
+
+def run(session, job, worker):
+    """Run ``job`` (a claimed row) and record how it went."""
+    try:
+        fn = HANDLERS.get(job.kind)
+        if fn is None:
+            raise LookupError(f'No handler for job kind {job.kind}')
+        fn(session, **json.loads(job.payload))
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        log.exception('Job %s (%s) failed on attempt %s', job.id, job.kind, job.attempts)
+        if job.attempts >= job.max_attempts:
+            values = {'status': 'failed', 'finished_at': datetime.utcnow()}
+        else:
+            values = {'status': 'queued', 'run_at': datetime.utcnow() + timedelta(seconds=retry_delay(job.attempts))}
+        values['last_error'] = f'{type(e).__name__}: {e}'
+    else:
+        values = {'status': 'done', 'finished_at': datetime.utcnow(), 'last_error': None}
+
+    # A worker that outlived its lease has lost the job to another one.
+    session.execute(
+        jobs.update().where(jobs.c.id == job.id, jobs.c.locked_by == worker).values(locked_by=None, **values)
+    )
+    session.commit()
+    return values['status']
+
+
+class Worker:
+    """Claims and runs jobs until ``stop`` is set (or the queue is empty, with ``burst``)."""
+
+    def __init__(self, app, name=None, poll=None, lease=None):
+        self.app = app
+        self.name = name or f'{socket.gethostname()}:{os.getpid()}'
+        self.poll = poll or app.config.get('JOBS_POLL_SECONDS', DEFAULT_POLL_SECONDS)
+        self.lease = lease or app.config.get('JOBS_LEASE_SECONDS', DEFAULT_LEASE_SECONDS)
+        self.stop = threading.Event()
+
+    def run(self, burst=False):
+        processed = 0
+        with self.app.app_context():
+            while not self.stop.is_set():
+                job = claim(db.session, self.name)
+                if job is None:
+                    if burst:
+                        break
+                    release_expired(db.session, self.lease)
+                    db.session.remove()
+                    self.stop.wait(self.poll)
+                    continue
+                with self._heartbeat(job.id):
+                    run(db.session, job, self.name)
+                # A fresh session per job keeps the identity map from growing.
+                db.session.remove()
+                processed += 1
+        return processed
+
+    @contextmanager
+    def _heartbeat(self, job_id):
+        # Renew the lease while a long job runs, on a connection of its own.
+        engine = db.engine
+        done = threading.Event()
+
+        def renew():
+            interval = self.lease / 3
+            wait = interval
+            while not done.wait(wait):
+                # A locked database or a dropped connection must not end the
+                # heartbeat, or the job would be handed to another worker.
+                try:
+                    with engine.begin() as connection:
+                        connection.execute(
+                            jobs.update()
+                            .where(jobs.c.id == job_id, jobs.c.locked_by == self.name)
+                            .values(locked_at=datetime.utcnow())
+                        )
+                except Exception:
+                    log.exception('Could not renew the lease on job %s; retrying', job_id)
+                    wait = min(RENEW_RETRY_SECONDS, interval)
+                else:
+                    wait = interval
+
+        thread = threading.Thread(target=renew, name=f'job-{job_id}-lease', daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            done.set()
+            thread.join()
+
+
+def _work_process(index, burst):
+    # Each process builds its own app, engine and pool. The like buffer is
+    # left to the web processes so two writers never share its journal.
+    from config import create_app
+
+    app = create_app(LIKE_BUFFER='off')
+    worker = Worker(app, name=f'{socket.gethostname()}:{os.getpid()}:{index}')
+    signal.signal(signal.SIGTERM, lambda signum, frame: worker.stop.set())
+    try:
+        worker.run(burst=burst)
+    except KeyboardInterrupt:
+        pass
+
+
+@handler('delete_user')
+def delete_user_job(session, user_id):
+    from deletes import delete_user
+
+    delete_user(session, user_id)
+
+
+@handler('reconcile_counters')
+def reconcile_counters_job(session, every=None):
+    """Rebuild every rollup from the source tables; with ``every`` (seconds) it reschedules itself."""
+    from counters import rebuild, rebuild_categories, reconcile_posts
+
+    rebuild(session)
+    reconcile_posts(session)
+    rebuild_categories(session)
+    if every:
+        run_at = datetime.utcnow() + timedelta(seconds=every)
+        # Keyed on the slot, so two workers finishing at once schedule it once.
+        slot = int(run_at.timestamp()) // every * every
+        enqueue(session, 'reconcile_counters', {'every': every}, run_at, key=f'reconcile_counters:{slot}')
+
+
+@handler('warm_cache')
+def warm_cache_job(session, paths=WARM_PATHS):
+    """Fill the response cache for ``paths``.
+
+    Only useful with a cache shared between processes (``CACHE_URL``);
+    with the in-process cache it would only warm the worker's own copy.
+    """
+    client = current_app.test_client()
+    for path in paths:
+        response = client.get(path)
+        if response.status_code != 200:
+            raise RuntimeError(f'GET {path} returned {response.status_code}')
+
+
+jobs_cli = AppGroup('jobs', help='Run and inspect background jobs.')
+
+
+@jobs_cli.command('work')
+@click.option('--processes', default=1, show_default=True, help='Worker processes to start.')
+@click.option('--burst', is_flag=True, help='Exit once the queue is empty.')
+def work_command(processes, burst):
+    """Run job workers until interrupted."""
+    if processes == 1:
+        _work_process(0, burst)
+        return
+    context = multiprocessing.get_context('spawn')
+    children = [context.Process(target=_work_process, args=(index, burst)) for index in range(processes)]
+    for child in children:
+        child.start()
+    try:
+        for child in children:
+            child.join()
+    except KeyboardInterrupt:
+        for child in children:
+            child.terminate()
+            child.join()
+
+
+@jobs_cli.command('enqueue')
+@click.argument('kind', type=click.Choice(sorted(HANDLERS)))
+@click.option('--payload', default='{}', help='Handler arguments as a JSON object.')
+@click.option('--delay', default=0, help='Seconds from now before it may run.')
+@click.option('--key', default=None, help='Idempotency key.')
+def enqueue_command(kind, payload, delay, key):
+    """Queue a job."""
+    run_at = datetime.utcnow() + timedelta(seconds=delay)
+    added = enqueue(db.session, kind, json.loads(payload), run_at, key)
+    db.session.commit()
+    click.echo('Job queued.' if added else f'A job with key {key} already exists.')
+
+
+@jobs_cli.command('status')
+def status_command():
+    """Count jobs by kind and status."""
+    rows = db.session.execute(
+        select(jobs.c.kind, jobs.c.status, func.count()).group_by(jobs.c.kind, jobs.c.status).order_by(jobs.c.kind)
+    )
+    for kind, status, count in rows:
+        click.echo(f'{kind:<24}{status:<10}{count:>8}')
@@ -0,0 +1,325 @@
+# Standard library imports
+import atexit
+import fcntl
+import glob
+import json
+import logging
+import os
+import threading
+from collections import defaultdict
+
+# Remote library imports
+from sqlalchemy import bindparam, exists, func, select
+
+# Local imports
+import cache
+from config import db
+from likes import IN_CHUNK_SIZE
+from models import Comment, CommentLike, User
+from sqlhelpers import dialect_insert
+
+log = logging.getLogger('knowledgehub.likes')
+
+DEFAULT_FLUSH_MS = 200
+
+# LIKE_BUFFER modes: 'off' writes every toggle in the request, 'memory'
+# keeps toggles in process until the next flush (a crash loses at most one
+# interval), 'file' also appends them to a journal that is replayed on start.
+MODES = ('off', 'memory', 'file')
+
+comments = Comment.__table__
+comment_likes = CommentLike.__table__
+users = User.__table__
+
+
+class LikeBuffer:
+    """Write-behind buffer for like toggles.
+
+    Toggles are coalesced per ``(comment_id, user_id)`` into the state the
+    pair should end up in, and a background thread writes them all in one
+    transaction every ``flush_ms``. Each entry remembers the state it
+    started from, so readers can fold the pending difference into
+    ``number_of_likes`` before it reaches the database.
+    """
+
+    def __init__(self):
+        self.mode = 'off'
+        self.engine = None
+        self.flush_ms = DEFAULT_FLUSH_MS
+        self.journal_path = None
+        self.fsync = False
+        self._owner = None
+        # {comment_id: {user_id: [liked_before, liked_after]}}
+        self._pending = defaultdict(dict)
+        self._flushing = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._journal = None
+        self._stopped = threading.Event()
+        self._thread = None
+
+    @property
+    def enabled(self):
+        return self.mode != 'off'
+
+    def start(self, engine, mode='memory', flush_ms=DEFAULT_FLUSH_MS, journal_path=None, fsync=False):
+        """Start flushing; in ``file`` mode each process journals to ``<journal_path>.<pid>``."""
+        if mode not in MODES:
+            raise ValueError(f'LIKE_BUFFER must be one of {", ".join(MODES)}')
+        self.stop()
+        self.engine = engine
+        self.mode = mode
+        self.flush_ms = flush_ms
+        self.journal_path = None
+        self.fsync = fsync
+        if mode == 'off':
+            return
+        if mode == 'file':
+            os.makedirs(os.path.dirname(os.path.abspath(journal_path)), exist_ok=True)
+            self._recover(journal_path)
+            self.journal_path = f'{journal_path}.{os.getpid()}'
+            # Held for as long as this process writes the journal; a lock
+            # that can be taken belongs to a process that is gone.
+            self._owner = open(self.journal_path + '.lock', 'w')
+            fcntl.flock(self._owner, fcntl.LOCK_EX)
+            self._journal = open(self.journal_path, 'a')
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name='like-buffer', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+        self.flush()
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+            # Everything is written; a journal left behind by a failed
+            # flush above is replayed by the next process to start.
+            os.remove(self.journal_path)
+            os.remove(self.journal_path + '.lock')
+            self._owner.close()
+            self._owner = None
+
+    def _run(self):
+        while not self._stopped.wait(self.flush_ms / 1000):
+            try:
+                self.flush()
+            except Exception:
+                log.exception('Flushing buffered likes failed; will retry')
+
+    def _state(self, comment_id, user_id):
+        for source in (self._pending, self._flushing):
+            entry = source.get(comment_id, {}).get(user_id)
+            if entry is not None:
+                return entry[1]
+        return None
+
+    def toggle(self, session, comment_id, user_id):
+        """Flip the like and return ``True`` if the comment is now liked."""
+        with self._lock:
+            current = self._state(comment_id, user_id)
+        if current is None:
+            current = session.execute(
+                select(comment_likes.c.comment_id).where(
+                    comment_likes.c.comment_id == comment_id,
+                    comment_likes.c.user_id == user_id,
+                )
+            ).first() is not None
+
+        with self._lock:
+            entry = self._pending[comment_id].get(user_id)
+            if entry is None:
+                before = self._state(comment_id, user_id)
+                before = current if before is None else before
+                entry = self._pending[comment_id][user_id] = [before, before]
+            entry[1] = not entry[1]
+            if self._journal is not None:
+                self._journal.write(json.dumps([comment_id, user_id, entry[1]]) + '\n')
+                self._journal.flush()
+                if self.fsync:
+                    os.fsync(self._journal.fileno())
+            return entry[1]
+
+    def delta(self, comment_id):
+        """Likes gained (or lost) by ``comment_id`` that are not written yet."""
+        with self._lock:
+            total = 0
+            for source in (self._flushing, self._pending):
+                for before, after in source.get(comment_id, {}).values():
+                    total += after - before
+            return total
+
+    def merge(self, items, user_id=None):
+        """Fold pending likes into serialized comments (``numberOfLikes``/``likedByUser``)."""
+        if not self.enabled:
+            return items
+        with self._lock:
+            if not self._pending and not self._flushing:
+                return items
+        for item in items:
+            item['numberOfLikes'] = (item['numberOfLikes'] or 0) + self.delta(item['id'])
+            if user_id and 'likedByUser' in item:
+                with self._lock:
+                    state = self._state(item['id'], user_id)
+                if state is not None:
+                    item['likedByUser'] = state
+        return items
+
+    def flush(self):
+        """Write every pending toggle in one transaction."""
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                self._flushing = self._pending
+                self._pending = defaultdict(dict)
+                if self._journal is not None:
+                    self._journal.close()
+                    self._rotate()
+                    self._journal = open(self.journal_path, 'a')
+
+            try:
+                written = self._write(self._flushing)
+            except Exception:
+                # Put the batch back underneath anything toggled since.
+                with self._lock:
+                    for comment_id, likers in self._flushing.items():
+                        for user_id, entry in likers.items():
+                            newer = self._pending[comment_id].get(user_id)
+                            if newer is None:
+                                self._pending[comment_id][user_id] = entry
+                            else:
+                                newer[0] = entry[0]
+                    self._flushing = {}
+                raise
+
+            with self._lock:
+                self._flushing = {}
+            if self._journal is not None and os.path.exists(self.journal_path + '.flushing'):
+                os.remove(self.journal_path + '.flushing')
+            return written
+
+    def _rotate(self):
+        flushing = self.journal_path + '.flushing'
+        if not os.path.exists(flushing):
+            os.replace(self.journal_path, flushing)
+            return
+        # The last flush failed and its batch went back into _pending; keep
+        # its journal and add the newer toggles after it.
+        with open(flushing, 'a') as older, open(self.journal_path) as newer:
+            older.write(newer.read())
+        os.remove(self.journal_path)
+
+    def _write(self, batch):
+        liked = []
+        unliked = []
+        for comment_id, likers in batch.items():
+            for user_id, (before, after) in likers.items():
+                if after and not before:
+                    liked.append({'b_comment_id': comment_id, 'b_user_id': user_id})
+                elif before and not after:
+                    unliked.append({'b_comment_id': comment_id, 'b_user_id': user_id})
+        touched = list(batch)
+
+        with self.engine.begin() as connection:
+            if liked:
+                # A like on a comment (or by a user) deleted in the meantime
+                # is dropped here rather than failing the whole batch, which
+                # would otherwise be retried forever.
+                comment_id, user_id = bindparam('b_comment_id'), bindparam('b_user_id')
+                connection.execute(
+                    dialect_insert(connection, comment_likes)
+                    .from_select(['comment_id', 'user_id'], select(comment_id, user_id).where(
+                        exists().where(comments.c.id == comment_id),
+                        exists().where(users.c.id == user_id),
+                    ))
+                    .on_conflict_do_nothing(index_elements=['comment_id', 'user_id']),
+                    liked,
+                )
+            if unliked:
+                connection.execute(
+                    comment_likes.delete().where(
+                        comment_likes.c.comment_id == bindparam('b_comment_id'),
+                        comment_likes.c.user_id == bindparam('b_user_id'),
+                    ),
+                    unliked,
+                )
+            # Recount rather than add deltas, so the counter converges even if
+            # another process toggled the same pair in the meantime.
+            likes_per_comment = (
+                select(func.count())
+                .where(comment_likes.c.comment_id == comments.c.id)
+                .scalar_subquery()
+            )
+            for start in range(0, len(touched), IN_CHUNK_SIZE):
+                connection.execute(
+                    comments.update()
+                    .where(comments.c.id.in_(touched[start:start + IN_CHUNK_SIZE]))
+                    .values(number_of_likes=likes_per_comment)
+                )
+
+        for namespace in cache.INVALIDATES['comment_likes']:
+            cache.invalidate(namespace)
+        return len(liked) + len(unliked)
+
+    def _recover(self, journal_path):
+        # Replay the journals of processes that died with toggles unwritten.
+        for lock_path in glob.glob(glob.escape(journal_path) + '.*.lock'):
+            with open(lock_path, 'a') as lock:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue  # still running
+                owner = lock_path[:-len('.lock')]
+                self._replay(owner)
+                if os.path.exists(lock_path):
+                    os.remove(lock_path)
+
+    def _replay(self, journal_path):
+        # A crash can leave both a half-flushed batch and newer toggles;
+        # replaying them in that order keeps the last toggle for each pair.
+        for path in (journal_path + '.flushing', journal_path):
+            if not os.path.exists(path):
+                continue
+            with open(path) as journal:
+                for line in journal:
+                    try:
+                        comment_id, user_id, after = json.loads(line)
+                    except ValueError:
+                        continue  # torn final line
+                    entry = self._pending[comment_id].setdefault(user_id, [not after, after])
+                    entry[1] = after
+        self.flush()
+        for path in (journal_path + '.flushing', journal_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+buffer = LikeBuffer()
+atexit.register(buffer.stop)
+
+
+def init_app(app):
+    """Start the buffer with the first request, so commands that merely load
+    the app never spin up a flush thread or touch the journal.
+
+    Config: ``LIKE_BUFFER`` (off, memory or file), ``LIKE_FLUSH_MS``,
+    ``LIKE_JOURNAL`` (journal path prefix for file mode) and ``LIKE_JOURNAL_FSYNC``.
+    """
+    started = threading.Lock()
+
+    def start_buffer():
+        if started.acquire(blocking=False):
+            buffer.start(
+                db.engine,
+                app.config['LIKE_BUFFER'],
+                app.config.get('LIKE_FLUSH_MS', DEFAULT_FLUSH_MS),
+                app.config.get('LIKE_JOURNAL') or os.path.join(app.instance_path, 'likes.journal'),
+                app.config.get('LIKE_JOURNAL_FSYNC', False),
+            )
+
+    app.before_request(start_buffer)
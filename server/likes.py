@@ -0,0 +1,98 @@
+# Standard library imports
+
+# Remote library imports
+from sqlalchemy import delete, func, select, update
+
+# Local imports
+from models import Comment, CommentLike
+from sqlhelpers import dialect_insert
+
+# Keeps IN lists under SQLite's bound parameter limit.
+IN_CHUNK_SIZE = 500
+
+
+def toggle_like(session, comment_id, user_id):
+    """Like or unlike ``comment_id`` for ``user_id`` without reading the likers.
+
+    The composite primary key decides which way the toggle goes: the insert
+    is ignored if the row already exists, in which case it is deleted
+    instead. The count only moves by rows actually inserted or deleted, so
+    a concurrent unlike that finds the row already gone leaves it alone.
+    Returns ``True`` if the comment is now liked. The caller owns the
+    transaction.
+    """
+    connection = session.connection()
+    stmt = dialect_insert(connection, CommentLike.__table__).values(
+        comment_id=comment_id, user_id=user_id
+    ).on_conflict_do_nothing(index_elements=['comment_id', 'user_id'])
+
+    if session.execute(stmt).rowcount:
+        step = 1
+    else:
+        deleted = session.execute(
+            delete(CommentLike).where(
+                CommentLike.comment_id == comment_id,
+                CommentLike.user_id == user_id,
+            )
+        )
+        if not deleted.rowcount:
+            return False
+        step = -1
+
+    session.execute(
+        update(Comment)
+        .where(Comment.id == comment_id)
+        .values(number_of_likes=func.coalesce(Comment.number_of_likes, 0) + step)
+        .execution_options(synchronize_session=False)
+    )
+    return step > 0
+
+
+def liked_statement(user_id, comment_ids):
+    return select(CommentLike.comment_id).where(
+        CommentLike.user_id == user_id,
+        CommentLike.comment_id.in_(comment_ids),
+    )
+
+
+def liked_comment_ids(session, user_id, comment_ids):
+    """Return the subset of ``comment_ids`` that ``user_id`` has liked."""
+    if not user_id or not comment_ids:
+        return set()
+    ids = list(comment_ids)
+    liked = set()
+    for start in range(0, len(ids), IN_CHUNK_SIZE):
+        liked.update(session.scalars(liked_statement(user_id, ids[start:start + IN_CHUNK_SIZE])))
+    return liked
+
+
+async def liked_comment_ids_async(connection, user_id, comment_ids):
+    """``liked_comment_ids`` for an ``AsyncConnection``."""
+    if not user_id or not comment_ids:
+        return set()
+    ids = list(comment_ids)
+    liked = set()
+    for start in range(0, len(ids), IN_CHUNK_SIZE):
+        result = await connection.execute(liked_statement(user_id, ids[start:start + IN_CHUNK_SIZE]))
+        liked.update(result.scalars())
+    return liked
+
+
+def likers_by_comment(session, comment_ids):
+    """Return ``{comment_id: [user_id, ...]}`` for ``comment_ids``.
+
+    One query per ``IN_CHUNK_SIZE`` comments rather than one per comment.
+    """
+    likers = {comment_id: [] for comment_id in comment_ids}
+    if not likers:
+        return likers
+    ids = list(likers)
+    for start in range(0, len(ids), IN_CHUNK_SIZE):
+        rows = session.execute(
+            select(CommentLike.comment_id, CommentLike.user_id).where(
+                CommentLike.comment_id.in_(ids[start:start + IN_CHUNK_SIZE])
+            )
+        )
+        for comment_id, user_id in rows:
+            likers[comment_id].append(user_id)
+    return likers
@@ -0,0 +1,28 @@
+"""Add keyset pagination indexes
+
+Revision ID: 3a91c2d7e4b5
+Revises: 0d8714115fbc
+Create Date: 2026-10-18 09:12:41.208113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3a91c2d7e4b5'
+down_revision = '0d8714115fbc'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'], unique=False)
+    op.create_index('ix_posts_updated_at_id', 'posts', ['updated_at', 'id'], unique=False)
+    op.create_index('ix_comments_created_at_id', 'comments', ['created_at', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_comments_created_at_id', table_name='comments')
+    op.drop_index('ix_posts_updated_at_id', table_name='posts')
+    op.drop_index('ix_users_created_at_id', table_name='users')
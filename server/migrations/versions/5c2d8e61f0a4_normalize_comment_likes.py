@@ -0,0 +1,96 @@
+"""Normalize comment likes into comment_likes
+
+Revision ID: 5c2d8e61f0a4
+Revises: b7e0f4a2c913
+Create Date: 2026-10-18 11:26:40.118372
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c2d8e61f0a4'
+down_revision = 'b7e0f4a2c913'
+branch_labels = None
+depends_on = None
+
+comments = sa.table('comments',
+    sa.column('id', sa.Integer),
+    sa.column('llikes', sa.Text),
+    sa.column('number_of_likes', sa.Integer),
+)
+comment_likes = sa.table('comment_likes',
+    sa.column('comment_id', sa.Integer),
+    sa.column('user_id', sa.Integer),
+)
+users = sa.table('users',
+    sa.column('id', sa.Integer),
+)
+
+
+def _liker_ids(llikes):
+    # llikes was free-form text; keep what reads as a JSON list of user ids
+    # (numbers or digit strings) and drop everything else.
+    try:
+        value = json.loads(llikes or '[]')
+    except ValueError:
+        return set()
+    if not isinstance(value, list):
+        return set()
+    ids = set()
+    for item in value:
+        if isinstance(item, int) and not isinstance(item, bool):
+            ids.add(item)
+        elif isinstance(item, str) and item.isdigit():
+            ids.add(int(item))
+    return ids
+
+
+def upgrade():
+    op.create_table('comment_likes',
+    sa.Column('comment_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['comment_id'], ['comments.id'], name=op.f('fk_comment_likes_comment_id_comments')),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('fk_comment_likes_user_id_users')),
+    sa.PrimaryKeyConstraint('comment_id', 'user_id')
+    )
+
+    bind = op.get_bind()
+    known_users = set(bind.execute(sa.select(users.c.id)).scalars())
+    rows = []
+    for comment_id, llikes in bind.execute(sa.select(comments.c.id, comments.c.llikes)):
+        rows.extend(
+            {'comment_id': comment_id, 'user_id': user_id}
+            for user_id in sorted(_liker_ids(llikes) & known_users)
+        )
+    if rows:
+        op.bulk_insert(comment_likes, rows)
+
+    likes_per_comment = (
+        sa.select(sa.func.count())
+        .where(comment_likes.c.comment_id == comments.c.id)
+        .scalar_subquery()
+    )
+    bind.execute(comments.update().values(number_of_likes=likes_per_comment))
+
+    with op.batch_alter_table('comments', schema=None) as batch_op:
+        batch_op.drop_column('llikes')
+
+
+def downgrade():
+    with op.batch_alter_table('comments', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('llikes', sa.Text(), nullable=True))
+
+    bind = op.get_bind()
+    likers = {}
+    for comment_id, user_id in bind.execute(sa.select(comment_likes.c.comment_id, comment_likes.c.user_id)):
+        likers.setdefault(comment_id, []).append(user_id)
+    bind.execute(comments.update().values(llikes='[]'))
+    for comment_id, user_ids in likers.items():
+        bind.execute(comments.update().where(comments.c.id == comment_id).values(llikes=json.dumps(user_ids)))
+
+    op.drop_table('comment_likes')
@@ -0,0 +1,55 @@
+"""Add FTS5 search index over posts
+
+Revision ID: 8f4a6b1d2c07
+Revises: 5c2d8e61f0a4
+Create Date: 2026-10-18 12:40:02.671530
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8f4a6b1d2c07'
+down_revision = '5c2d8e61f0a4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Other backends fall back to the in-process index in search.py.
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    op.execute(
+        "CREATE VIRTUAL TABLE posts_fts USING fts5("
+        "title, content, content='posts', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2')"
+    )
+    op.execute(
+        "CREATE TRIGGER posts_fts_ai AFTER INSERT ON posts BEGIN "
+        "INSERT INTO posts_fts(rowid, title, content) VALUES (new.id, new.title, new.content); "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER posts_fts_ad AFTER DELETE ON posts BEGIN "
+        "INSERT INTO posts_fts(posts_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content); "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER posts_fts_au AFTER UPDATE OF title, content ON posts BEGIN "
+        "INSERT INTO posts_fts(posts_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content); "
+        "INSERT INTO posts_fts(rowid, title, content) VALUES (new.id, new.title, new.content); "
+        "END"
+    )
+    op.execute("INSERT INTO posts_fts(posts_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    op.execute("DROP TRIGGER IF EXISTS posts_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS posts_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS posts_fts_ai")
+    op.execute("DROP TABLE IF EXISTS posts_fts")
@@ -0,0 +1,58 @@
+"""Make the timestamps listings are sorted by NOT NULL
+
+Revision ID: a3f1d7c9e265
+Revises: f8c3d6a9b042
+Create Date: 2026-10-19 10:12:47.318205
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3f1d7c9e265'
+down_revision = 'f8c3d6a9b042'
+branch_labels = None
+depends_on = None
+
+# (table, sort column, column to fall back on) for each keyset listing.
+SORT_KEYS = [
+    ('users', 'created_at', 'updated_at'),
+    ('posts', 'updated_at', 'created_at'),
+    ('comments', 'created_at', 'updated_at'),
+]
+
+
+def _triggers(table):
+    # SQLite drops a table's triggers (the posts FTS ones) when batch mode rebuilds it.
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return []
+    return bind.execute(
+        sa.text("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = :table"), {'table': table}
+    ).scalars().all()
+
+
+def _set_nullable(nullable):
+    for table, column, _ in SORT_KEYS:
+        triggers = _triggers(table)
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column(column, existing_type=sa.DateTime(), nullable=nullable)
+        for sql in triggers:
+            op.execute(sql)
+
+
+def upgrade():
+    now = datetime.utcnow()
+    for table, column, fallback in SORT_KEYS:
+        rows = sa.table(table, sa.column(column, sa.DateTime), sa.column(fallback, sa.DateTime))
+        op.get_bind().execute(
+            rows.update().where(rows.c[column].is_(None)).values({column: sa.func.coalesce(rows.c[fallback], now)})
+        )
+    _set_nullable(False)
+
+
+def downgrade():
+    _set_nullable(True)
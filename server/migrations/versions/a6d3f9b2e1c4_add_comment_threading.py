@@ -0,0 +1,49 @@
+"""Add reply threading to comments
+
+Revision ID: a6d3f9b2e1c4
+Revises: e2a9c4f71b38
+Create Date: 2026-10-18 18:02:47.551203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6d3f9b2e1c4'
+down_revision = 'e2a9c4f71b38'
+branch_labels = None
+depends_on = None
+
+comments = sa.table('comments',
+    sa.column('id', sa.Integer),
+    sa.column('path', sa.String),
+)
+
+
+def upgrade():
+    with op.batch_alter_table('comments', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('parent_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('path', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('depth', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('reply_count', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.create_foreign_key(batch_op.f('fk_comments_parent_id_comments'), 'comments', ['parent_id'], ['id'])
+        batch_op.create_index('ix_comments_post_id_path', ['post_id', 'path'], unique=False)
+
+    # Every existing comment is top level: its path is its own padded id.
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        padded = sa.func.printf('%010d/', comments.c.id)
+    else:
+        padded = sa.func.lpad(sa.cast(comments.c.id, sa.String), 10, '0') + '/'
+    bind.execute(comments.update().values(path=padded))
+
+
+def downgrade():
+    with op.batch_alter_table('comments', schema=None) as batch_op:
+        batch_op.drop_index('ix_comments_post_id_path')
+        batch_op.drop_constraint(batch_op.f('fk_comments_parent_id_comments'), type_='foreignkey')
+        batch_op.drop_column('reply_count')
+        batch_op.drop_column('depth')
+        batch_op.drop_column('path')
+        batch_op.drop_column('parent_id')
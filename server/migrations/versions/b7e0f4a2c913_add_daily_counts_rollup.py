@@ -0,0 +1,34 @@
+"""Add daily_counts rollup for dashboard counters
+
+Revision ID: b7e0f4a2c913
+Revises: 3a91c2d7e4b5
+Create Date: 2026-10-18 10:03:17.552904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e0f4a2c913'
+down_revision = '3a91c2d7e4b5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('daily_counts',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name', 'day')
+    )
+    for table in ('users', 'posts', 'comments'):
+        op.execute(
+            f"INSERT INTO daily_counts (name, day, count) "
+            f"SELECT '{table}', date(created_at), count(*) FROM {table} GROUP BY date(created_at)"
+        )
+
+
+def downgrade():
+    op.drop_table('daily_counts')
@@ -0,0 +1,47 @@
+"""Add comment_count and last_comment_at to posts
+
+Revision ID: c4e8a1f5d903
+Revises: a6d3f9b2e1c4
+Create Date: 2026-10-18 19:14:05.208337
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e8a1f5d903'
+down_revision = 'a6d3f9b2e1c4'
+branch_labels = None
+depends_on = None
+
+posts = sa.table('posts',
+    sa.column('id', sa.Integer),
+    sa.column('comment_count', sa.Integer),
+    sa.column('last_comment_at', sa.DateTime),
+)
+comments = sa.table('comments',
+    sa.column('post_id', sa.Integer),
+    sa.column('created_at', sa.DateTime),
+)
+
+
+def upgrade():
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('comment_count', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('last_comment_at', sa.DateTime(), nullable=True))
+        batch_op.create_index('ix_posts_comment_count', ['comment_count', 'id'], unique=False)
+        batch_op.create_index('ix_posts_last_comment_at', ['last_comment_at', 'id'], unique=False)
+
+    op.get_bind().execute(posts.update().values(
+        comment_count=sa.select(sa.func.count()).where(comments.c.post_id == posts.c.id).scalar_subquery(),
+        last_comment_at=sa.select(sa.func.max(comments.c.created_at)).where(comments.c.post_id == posts.c.id).scalar_subquery(),
+    ))
+
+
+def downgrade():
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.drop_index('ix_posts_last_comment_at')
+        batch_op.drop_index('ix_posts_comment_count')
+        batch_op.drop_column('last_comment_at')
+        batch_op.drop_column('comment_count')
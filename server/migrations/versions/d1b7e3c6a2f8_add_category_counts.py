@@ -0,0 +1,34 @@
+"""Add category_counts summary for category facets
+
+Revision ID: d1b7e3c6a2f8
+Revises: c4e8a1f5d903
+Create Date: 2026-10-18 21:02:44.913406
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd1b7e3c6a2f8'
+down_revision = 'c4e8a1f5d903'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('category_counts',
+    sa.Column('category', sa.String(), nullable=False),
+    sa.Column('post_count', sa.Integer(), nullable=False),
+    sa.Column('last_updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('category')
+    )
+    op.execute(
+        "INSERT INTO category_counts (category, post_count, last_updated_at) "
+        "SELECT category, count(*), max(updated_at) FROM posts "
+        "WHERE category IS NOT NULL GROUP BY category"
+    )
+
+
+def downgrade():
+    op.drop_table('category_counts')
@@ -0,0 +1,30 @@
+"""Add composite indexes for listing filters
+
+Revision ID: e2a9c4f71b38
+Revises: 8f4a6b1d2c07
+Create Date: 2026-10-18 15:21:09.384610
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2a9c4f71b38'
+down_revision = '8f4a6b1d2c07'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_posts_category_updated_at', 'posts', ['category', 'updated_at', 'id'], unique=False)
+    op.create_index('ix_posts_user_id_updated_at', 'posts', ['user_id', 'updated_at', 'id'], unique=False)
+    op.create_index('ix_posts_created_at', 'posts', ['created_at'], unique=False)
+    op.create_index('ix_comments_post_id_created_at', 'comments', ['post_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_comments_post_id_created_at', table_name='comments')
+    op.drop_index('ix_posts_created_at', table_name='posts')
+    op.drop_index('ix_posts_user_id_updated_at', table_name='posts')
+    op.drop_index('ix_posts_category_updated_at', table_name='posts')
@@ -0,0 +1,75 @@
+"""Cascade deletes from users and posts, index children by user
+
+Revision ID: f8c3d6a9b042
+Revises: e5a2c8f41d67
+Create Date: 2026-10-18 23:05:38.720164
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f8c3d6a9b042'
+down_revision = 'e5a2c8f41d67'
+branch_labels = None
+depends_on = None
+
+naming_convention = {
+    "fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s",
+}
+
+# (table, column, referred table) for every foreign key that cascades.
+FOREIGN_KEYS = [
+    ('posts', 'user_id', 'users'),
+    ('comments', 'post_id', 'posts'),
+    ('comments', 'user_id', 'users'),
+    ('comments', 'parent_id', 'comments'),
+    ('comment_likes', 'comment_id', 'comments'),
+    ('comment_likes', 'user_id', 'users'),
+]
+
+
+def _triggers(table):
+    # SQLite drops a table's triggers (the posts FTS ones) when batch mode rebuilds it.
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return []
+    return bind.execute(
+        sa.text("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = :table"), {'table': table}
+    ).scalars().all()
+
+
+def _replace_foreign_keys(ondelete):
+    # Older databases may have these constraints unnamed, or (posts) not at
+    # all, so drop whatever is there and recreate it under the convention.
+    inspector = sa.inspect(op.get_bind())
+    for table in ('posts', 'comments', 'comment_likes'):
+        existing = {tuple(fk['constrained_columns']): fk['name'] for fk in inspector.get_foreign_keys(table)}
+        triggers = _triggers(table)
+        with op.batch_alter_table(table, schema=None, naming_convention=naming_convention) as batch_op:
+            for fk_table, column, referred in FOREIGN_KEYS:
+                if fk_table != table:
+                    continue
+                name = f'fk_{table}_{column}_{referred}'
+                if (column,) in existing:
+                    batch_op.drop_constraint(existing[(column,)] or name, type_='foreignkey')
+                batch_op.create_foreign_key(name, referred, [column], ['id'], ondelete=ondelete)
+        for sql in triggers:
+            op.execute(sql)
+
+
+def upgrade():
+    _replace_foreign_keys('CASCADE')
+    with op.batch_alter_table('comments', schema=None) as batch_op:
+        batch_op.create_index('ix_comments_user_id', ['user_id', 'id'], unique=False)
+    with op.batch_alter_table('comment_likes', schema=None) as batch_op:
+        batch_op.create_index('ix_comment_likes_user_id', ['user_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('comment_likes', schema=None) as batch_op:
+        batch_op.drop_index('ix_comment_likes_user_id')
+    with op.batch_alter_table('comments', schema=None) as batch_op:
+        batch_op.drop_index('ix_comments_user_id')
+    _replace_foreign_keys(None)
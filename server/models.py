@@ -5,6 +5,9 @@ from datetime import datetime
 
 class User(db.Model, SerializerMixin):
     __tablename__ = 'users'
+    __table_args__ = (
+        db.Index('ix_users_created_at_id', 'created_at', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String, nullable=False, unique=True)
@@ -12,44 +15,127 @@ class User(db.Model, SerializerMixin):
     password = db.Column(db.String, nullable=False)
     profile_picture = db.Column(db.String, default='https://cdn.pixabay.com/photo/2015/10/05/22/37/blank-profile-picture-973460_960_720.png')
     is_admin = db.Column(db.Boolean, default=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    posts = db.relationship('Post', backref='author', lazy=True)
-    comments = db.relationship('Comment', backref='author', lazy=True)
+    # Children are removed by deletes.py, never loaded into the session just
+    # to be deleted; anything else deleting a user or post relies on ON
+    # DELETE CASCADE, which dbtuning turns on for SQLite.
+    posts = db.relationship('Post', backref='author', lazy=True, passive_deletes=True)
+    comments = db.relationship('Comment', backref='author', lazy=True, passive_deletes=True)
 
     def __repr__(self):
         return f'<User {self.id} - {self.username}>'
     
 class Post(db.Model, SerializerMixin):
     __tablename__ = 'posts'
+    __table_args__ = (
+        db.Index('ix_posts_updated_at_id', 'updated_at', 'id'),
+        db.Index('ix_posts_category_updated_at', 'category', 'updated_at', 'id'),
+        db.Index('ix_posts_user_id_updated_at', 'user_id', 'updated_at', 'id'),
+        db.Index('ix_posts_created_at', 'created_at'),
+        db.Index('ix_posts_comment_count', 'comment_count', 'id'),
+        db.Index('ix_posts_last_comment_at', 'last_comment_at', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     content = db.Column(db.String, nullable=False)
     title = db.Column(db.String, nullable=False, unique=True)
     image = db.Column(db.String, default='https://www.hostinger.com/tutorials/wp-content/uploads/sites/2/2021/09/how-to-write-a-blog-post.png')
     category = db.Column(db.String, default='uncategorized')
     slug = db.Column(db.String, nullable=False, unique=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Kept current by counters.py whenever comments are added or deleted.
+    comment_count = db.Column(db.Integer, nullable=False, default=0)
+    last_comment_at = db.Column(db.DateTime, nullable=True)
 
-    comments = db.relationship('Comment', backref='post', lazy=True)
+    comments = db.relationship('Comment', backref='post', lazy=True, passive_deletes=True)
 
     def __repr__(self):
         return f'<Post {self.id} - {self.title}>'
     
 class Comment(db.Model, SerializerMixin):
     __tablename__ = 'comments'
+    __table_args__ = (
+        db.Index('ix_comments_created_at_id', 'created_at', 'id'),
+        db.Index('ix_comments_post_id_created_at', 'post_id', 'created_at', 'id'),
+        db.Index('ix_comments_post_id_path', 'post_id', 'path'),
+        db.Index('ix_comments_user_id', 'user_id', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     content = db.Column(db.String, nullable=False)
-    post_id = db.Column(db.Integer, db.ForeignKey('posts.id'), nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    llikes = db.Column(db.Text, default='[]') 
+    post_id = db.Column(db.Integer, db.ForeignKey('posts.id', ondelete='CASCADE'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    parent_id = db.Column(db.Integer, db.ForeignKey('comments.id', ondelete='CASCADE'), nullable=True)
+    # Materialized path: the zero-padded ids from the root down to this
+    # comment, so a subtree is a prefix range and path order is thread order.
+    path = db.Column(db.String, nullable=True)
+    depth = db.Column(db.Integer, nullable=False, default=0)
+    reply_count = db.Column(db.Integer, nullable=False, default=0)
     number_of_likes = db.Column(db.Integer, default=0)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     def __repr__(self):
         return f'<Comment {self.id}>'
+
+class CommentLike(db.Model):
+    __tablename__ = 'comment_likes'
+    __table_args__ = (
+        db.Index('ix_comment_likes_user_id', 'user_id'),
+    )
+
+    comment_id = db.Column(db.Integer, db.ForeignKey('comments.id', ondelete='CASCADE'), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<CommentLike {self.comment_id} by {self.user_id}>'
+
+class DailyCount(db.Model):
+    __tablename__ = 'daily_counts'
+
+    name = db.Column(db.String, primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<DailyCount {self.name} {self.day}: {self.count}>'
+
+class CategoryCount(db.Model):
+    __tablename__ = 'category_counts'
+
+    # Kept current by counters.py whenever posts are added, moved or deleted.
+    category = db.Column(db.String, primary_key=True)
+    post_count = db.Column(db.Integer, nullable=False, default=0)
+    last_updated_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<CategoryCount {self.category}: {self.post_count}>'
+
+class Job(db.Model):
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        db.Index('ix_jobs_status_run_at', 'status', 'run_at', 'id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String, nullable=False)
+    payload = db.Column(db.Text, nullable=False, default='{}')
+    # queued -> running -> done, or back to queued until max_attempts, then failed.
+    status = db.Column(db.String, nullable=False, default='queued')
+    idempotency_key = db.Column(db.String, nullable=True, unique=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    run_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_by = db.Column(db.String, nullable=True)
+    locked_at = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<Job {self.id} {self.kind} {self.status}>'
@@ -0,0 +1,134 @@
+# Standard library imports
+import base64
+import binascii
+import json
+from collections import namedtuple
+from datetime import datetime
+
+# Remote library imports
+from sqlalchemy import tuple_
+
+# Local imports
+
+DEFAULT_LIMIT = 9
+MAX_LIMIT = 100
+
+Page = namedtuple('Page', ['items', 'next_cursor', 'prev_cursor'])
+Window = namedtuple('Window', ['query', 'limit', 'keyset', 'forward', 'start_index'])
+
+
+class InvalidPage(ValueError):
+    """A paging argument (cursor, limit, startIndex) the client sent is unusable."""
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+def int_arg(args, name, default, minimum=None):
+    value = args.get(name)
+    if value is None or value == '':
+        return default
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise InvalidPage(f'{name} must be an integer')
+    if minimum is not None and value < minimum:
+        raise InvalidPage(f'{name} must be at least {minimum}')
+    return value
+
+
+def page_limit(args):
+    return max(1, min(int_arg(args, 'limit', DEFAULT_LIMIT), MAX_LIMIT))
+
+
+def encode_cursor(sort_value, row_id):
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    payload = json.dumps([sort_value, row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if isinstance(sort_value, str):
+            sort_value = datetime.fromisoformat(sort_value)
+        elif not isinstance(sort_value, int):
+            raise TypeError(sort_value)
+        return sort_value, int(row_id)
+    except (ValueError, TypeError, binascii.Error):
+        raise InvalidCursor('Invalid cursor')
+
+
+def _cursor_for(item, sort_column, id_column):
+    return encode_cursor(getattr(item, sort_column.key), getattr(item, id_column.key))
+
+
+def page_window(query, sort_column, id_column, args, descending=True):
+    """Apply one page's cursor range, ORDER BY and LIMIT to ``query``.
+
+    Works on a ``Query`` or a ``select()``, so the async read path shares
+    the same plan; hand the fetched rows to ``make_page``. A row without a
+    sort key has no place in the keyset, so a nullable ``sort_column`` only
+    lists the rows that have one.
+    """
+    if sort_column.nullable:
+        query = query.filter(sort_column.isnot(None))
+    limit = page_limit(args)
+    after = args.get('cursor')
+    before = args.get('before')
+    key = tuple_(sort_column, id_column)
+
+    if after or before:
+        sort_value, row_id = decode_cursor(after or before)
+        # Walking backwards flips the comparison and the ORDER BY, the page
+        # is reversed again in make_page so the client always sees one direction.
+        forward = bool(after)
+        if forward == descending:
+            query = query.filter(key < tuple_(sort_value, row_id))
+            query = query.order_by(sort_column.desc(), id_column.desc())
+        else:
+            query = query.filter(key > tuple_(sort_value, row_id))
+            query = query.order_by(sort_column.asc(), id_column.asc())
+        return Window(query.limit(limit + 1), limit, True, forward, 0)
+
+    start_index = int_arg(args, 'startIndex', 0, minimum=0)
+    if descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+    if start_index:
+        query = query.offset(start_index)
+    return Window(query.limit(limit + 1), limit, False, True, start_index)
+
+
+def make_page(rows, window, sort_column, id_column):
+    """Trim the over-fetched ``rows`` of ``window`` into a ``Page``."""
+    has_more = len(rows) > window.limit
+    rows = list(rows[:window.limit])
+    if not window.forward:
+        rows.reverse()
+    if not rows:
+        return Page([], None, None)
+
+    if window.keyset:
+        next_cursor = _cursor_for(rows[-1], sort_column, id_column) if (has_more or not window.forward) else None
+        prev_cursor = _cursor_for(rows[0], sort_column, id_column) if (window.forward or has_more) else None
+    else:
+        next_cursor = _cursor_for(rows[-1], sort_column, id_column) if has_more else None
+        prev_cursor = _cursor_for(rows[0], sort_column, id_column) if window.start_index else None
+    return Page(rows, next_cursor, prev_cursor)
+
+
+def paginate(query, sort_column, id_column, args, descending=True):
+    """Return one page of ``query`` ordered by ``(sort_column, id_column)``.
+
+    Clients walk forward with ``?cursor=<nextCursor>`` and back with
+    ``?before=<prevCursor>``; both become an index range scan on the
+    matching composite index. ``startIndex`` is still honoured for old
+    clients but falls back to OFFSET.
+    """
+    window = page_window(query, sort_column, id_column, args, descending)
+    return make_page(window.query.all(), window, sort_column, id_column)
@@ -0,0 +1,112 @@
+# Standard library imports
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Remote library imports
+import bcrypt
+from werkzeug.security import check_password_hash
+
+# Local imports
+
+DEFAULT_ROUNDS = 12
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+DEFAULT_QUEUE = 64
+DEFAULT_TIMEOUT = 10
+
+
+class HasherBusy(Exception):
+    """Raised when too many hashes are already queued; callers answer 503."""
+
+
+class PasswordHasher:
+    """bcrypt on a small thread pool shared by every request.
+
+    bcrypt releases the GIL while it hashes, so running it on the pool keeps
+    the number of concurrent hashes at ``workers`` without stalling the
+    request threads serving cheap reads. At most ``queue`` calls may be
+    waiting for the pool; beyond that ``HasherBusy`` is raised instead of
+    letting logins pile up.
+    """
+
+    def __init__(self, rounds=DEFAULT_ROUNDS, workers=DEFAULT_WORKERS, queue=DEFAULT_QUEUE, timeout=DEFAULT_TIMEOUT):
+        self._executor = None
+        self.configure(rounds, workers, queue, timeout)
+
+    def configure(self, rounds=DEFAULT_ROUNDS, workers=DEFAULT_WORKERS, queue=DEFAULT_QUEUE, timeout=DEFAULT_TIMEOUT):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        self.rounds = rounds
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+        self._slots = threading.BoundedSemaphore(workers + queue)
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise HasherBusy('Too many concurrent password checks, try again shortly')
+        try:
+            return self._executor.submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        return self._run(_hash, password, self.rounds)
+
+    def hash_many(self, passwords):
+        """Hash a batch on the pool; bulk callers are not subject to the queue bound."""
+        rounds = self.rounds
+        return list(self._executor.map(lambda password: _hash(password, rounds), passwords))
+
+    def check(self, password, hashed):
+        if not hashed:
+            return False
+        if is_bcrypt(hashed):
+            return self._run(_check, password, hashed)
+        # Werkzeug hashes from older seeds; needs_rehash() replaces them.
+        return self._run(check_password_hash, hashed, password)
+
+    def needs_rehash(self, hashed):
+        return not is_bcrypt(hashed) or cost(hashed) != self.rounds
+
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _check(password, hashed):
+    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+
+
+def is_bcrypt(hashed):
+    return hashed.startswith(('$2a$', '$2b$', '$2y$'))
+
+
+def cost(hashed):
+    """The work factor of a bcrypt hash such as ``$2b$12$...``."""
+    return int(hashed.split('$')[2])
+
+
+hasher = PasswordHasher()
+
+
+def hash_password(password):
+    return hasher.hash(password)
+
+
+def check_password(password, hashed):
+    return hasher.check(password, hashed)
+
+
+def needs_rehash(hashed):
+    return hasher.needs_rehash(hashed)
+
+
+def init_app(app):
+    """Config: ``BCRYPT_LOG_ROUNDS`` (cost, default 12), ``PASSWORD_HASH_WORKERS``,
+    ``PASSWORD_HASH_QUEUE`` and ``PASSWORD_HASH_TIMEOUT`` (seconds)."""
+    hasher.configure(
+        app.config.get('BCRYPT_LOG_ROUNDS', DEFAULT_ROUNDS),
+        app.config.get('PASSWORD_HASH_WORKERS', DEFAULT_WORKERS),
+        app.config.get('PASSWORD_HASH_QUEUE', DEFAULT_QUEUE),
+        app.config.get('PASSWORD_HASH_TIMEOUT', DEFAULT_TIMEOUT),
+    )
@@ -0,0 +1,45 @@
+# Standard library imports
+from contextlib import contextmanager
+
+# Remote library imports
+from sqlalchemy import event
+
+# Local imports
+
+
+class QueryCounter:
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+
+@contextmanager
+def count_queries(engine):
+    """Record every statement ``engine`` executes inside the block.
+
+        with count_queries(db.engine) as counter:
+            client.get('/api/posts?include=author')
+        assert counter.count <= 3, counter.statements
+    """
+    counter = QueryCounter()
+    event.listen(engine, 'before_cursor_execute', counter)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, 'before_cursor_execute', counter)
+
+
+@contextmanager
+def assert_max_queries(engine, limit):
+    with count_queries(engine) as counter:
+        yield counter
+    if counter.count > limit:
+        raise AssertionError(
+            f'Expected at most {limit} queries, got {counter.count}:\n' + '\n'.join(counter.statements)
+        )
@@ -0,0 +1,102 @@
+# Standard library imports
+import sys
+from datetime import datetime
+
+# Remote library imports
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import create_engine, func, select, tuple_
+
+# Local imports
+from config import db
+from models import Comment, CommentLike, Job, Post, User
+
+SINCE = datetime(2024, 1, 1)
+
+# (name, statement, must_search). Every listing query the controllers run,
+# in the shape they run it. must_search marks filtered queries that have to
+# seek into an index rather than walk one in order.
+CHECKS = [
+    ('posts page', select(Post).order_by(Post.updated_at.desc(), Post.id.desc()).limit(10), False),
+    ('posts page after cursor', select(Post).where(tuple_(Post.updated_at, Post.id) < tuple_(SINCE, 1))
+        .order_by(Post.updated_at.desc(), Post.id.desc()).limit(10), True),
+    ('posts by category', select(Post).where(Post.category == 'x')
+        .order_by(Post.updated_at.desc(), Post.id.desc()).limit(10), True),
+    ('posts by author', select(Post).where(Post.user_id == 1)
+        .order_by(Post.updated_at.desc(), Post.id.desc()).limit(10), True),
+    ('posts most discussed', select(Post).order_by(Post.comment_count.desc(), Post.id.desc()).limit(10), False),
+    ('posts recently active', select(Post).where(Post.last_comment_at.isnot(None))
+        .order_by(Post.last_comment_at.desc(), Post.id.desc()).limit(10), True),
+    ('post by slug', select(Post).where(Post.slug == 'x'), True),
+    ('slugs taken for base', select(Post.slug).where(Post.slug >= 'x', Post.slug < 'x.'), True),
+    ('posts created since', select(func.count()).select_from(Post).where(Post.created_at >= SINCE), True),
+    ('comments page', select(Comment).order_by(Comment.created_at.desc(), Comment.id.desc()).limit(10), False),
+    ('comments for post', select(Comment).where(Comment.post_id == 1).order_by(Comment.created_at.desc()), True),
+    ('comment thread', select(Comment).where(Comment.post_id == 1, Comment.depth < 3)
+        .order_by(Comment.path).limit(50), True),
+    ('comment subtree after cursor', select(Comment).where(
+        Comment.post_id == 1, Comment.path > '0000000001/', Comment.path < '0000000001/~')
+        .order_by(Comment.path).limit(50), True),
+    ('comments created since', select(func.count()).select_from(Comment).where(Comment.created_at >= SINCE), True),
+    ('comments by user', select(Comment.id).where(Comment.user_id.in_([1, 2])).limit(500), True),
+    ('users page', select(User).order_by(User.created_at.desc(), User.id.desc()).limit(10), False),
+    ('users created since', select(func.count()).select_from(User).where(User.created_at >= SINCE), True),
+    ('comment likes for user', select(CommentLike.comment_id)
+        .where(CommentLike.user_id == 1, CommentLike.comment_id.in_([1, 2, 3])), True),
+    ('comment likes by user', select(CommentLike.comment_id).where(CommentLike.user_id.in_([1, 2])).limit(500), True),
+    ('due jobs', select(Job.id).where(Job.status == 'queued', Job.run_at <= SINCE)
+        .order_by(Job.run_at, Job.id).limit(10), True),
+]
+
+
+def explain(connection, statement):
+    # Expanding IN lists are rendered as placeholders unless asked not to.
+    compiled = statement.compile(dialect=connection.dialect, compile_kwargs={'render_postcompile': True})
+    params = [compiled.params[name] for name in compiled.positiontup]
+    params = [value.isoformat(' ') if isinstance(value, datetime) else value for value in params]
+    return [row[-1] for row in connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + compiled.string, tuple(params))]
+
+
+def problems(plan, must_search):
+    found = []
+    for line in plan:
+        if line.startswith('SCAN') and 'USING' not in line:
+            found.append(f'full table scan: {line}')
+        if 'USE TEMP B-TREE' in line:
+            found.append(f'sort without index: {line}')
+    if must_search and not any(line.startswith('SEARCH') for line in plan):
+        found.append('no index seek: ' + '; '.join(plan))
+    return found
+
+
+def check_plans(engine):
+    """Return ``{name: [problem, ...]}`` for every check that degraded."""
+    failures = {}
+    with engine.connect() as connection:
+        for name, statement, must_search in CHECKS:
+            found = problems(explain(connection, statement), must_search)
+            if found:
+                failures[name] = found
+    return failures
+
+
+@click.command('check-plans')
+@click.option('--current', is_flag=True, help='Check the configured database instead of a fresh schema.')
+@with_appcontext
+def check_plans_command(current):
+    """Fail if any listing query stops using an index (SQLite only)."""
+    if current:
+        engine = db.engine
+    else:
+        engine = create_engine('sqlite://')
+        db.metadata.create_all(engine)
+    if engine.dialect.name != 'sqlite':
+        raise click.UsageError('EXPLAIN QUERY PLAN checks need a SQLite database.')
+
+    failures = check_plans(engine)
+    for name, found in failures.items():
+        for problem in found:
+            click.echo(f'{name}: {problem}', err=True)
+    if failures:
+        sys.exit(1)
+    click.echo(f'{len(CHECKS)} query plans OK.')
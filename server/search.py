@@ -0,0 +1,223 @@
+# Standard library imports
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter, namedtuple
+
+# Remote library imports
+import click
+from flask.cli import AppGroup
+from sqlalchemy import column, func, literal_column, select, table, text
+from sqlalchemy.exc import OperationalError
+
+# Local imports
+from config import db
+
+SearchHit = namedtuple('SearchHit', ['post', 'rank', 'title_snippet', 'content_snippet'])
+
+HIGHLIGHT_OPEN = '<mark>'
+HIGHLIGHT_CLOSE = '</mark>'
+SNIPPET_WORDS = 12
+TITLE_WEIGHT = 10.0
+CONTENT_WEIGHT = 1.0
+# Upper bound on ranked ids pulled from the in-memory index before the
+# listing filters are applied in SQL.
+CANDIDATE_LIMIT = 1000
+
+posts_fts = table('posts_fts', column('rowid'), column('title'), column('content'))
+
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(value):
+    folded = unicodedata.normalize('NFKD', value or '')
+    folded = ''.join(ch for ch in folded if not unicodedata.combining(ch))
+    return _TOKEN.findall(folded.lower())
+
+
+def _fts_query(term):
+    # Quote every token so user input can never be parsed as FTS5 syntax.
+    return ' '.join('"%s"' % token for token in tokenize(term))
+
+
+class InvertedIndex:
+    """In-process BM25 index over post titles and content.
+
+    Used when the database has no FTS5. The index is built lazily and then
+    topped up from ``posts.updated_at`` on every search, so writes from
+    other processes are picked up; deleted posts drop out because hits are
+    always re-checked against ``posts`` in SQL.
+    """
+
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings = {}
+        self._doc_terms = {}
+        self._doc_lengths = {}
+        self._total_length = 0
+        self._watermark = None
+
+    def _remove(self, post_id):
+        terms = self._doc_terms.pop(post_id, None)
+        if terms is None:
+            return
+        for token in terms:
+            postings = self._postings[token]
+            postings.pop(post_id, None)
+            if not postings:
+                del self._postings[token]
+        self._total_length -= self._doc_lengths.pop(post_id)
+
+    def _add(self, post_id, title, content):
+        self._remove(post_id)
+        terms = Counter()
+        for token in tokenize(title):
+            terms[token] += TITLE_WEIGHT
+        for token in tokenize(content):
+            terms[token] += CONTENT_WEIGHT
+        for token, weight in terms.items():
+            self._postings.setdefault(token, {})[post_id] = weight
+        self._doc_terms[post_id] = terms
+        length = sum(terms.values())
+        self._doc_lengths[post_id] = length
+        self._total_length += length
+
+    def refresh(self, session, model):
+        query = select(model.id, model.title, model.content, model.updated_at)
+        if self._watermark is not None:
+            query = query.where(model.updated_at >= self._watermark)
+        rows = session.execute(query).all()
+        with self._lock:
+            for post_id, title, content, updated_at in rows:
+                self._add(post_id, title, content)
+                if updated_at and (self._watermark is None or updated_at > self._watermark):
+                    self._watermark = updated_at
+
+    def search(self, term):
+        tokens = tokenize(term)
+        if not tokens:
+            return []
+        with self._lock:
+            postings = [self._postings.get(token) for token in tokens]
+            if not all(postings):
+                return []
+            documents = len(self._doc_lengths)
+            average_length = self._total_length / documents
+            candidates = set.intersection(*(set(p) for p in postings))
+            scores = {}
+            for post_id in candidates:
+                norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[post_id] / average_length)
+                score = 0.0
+                for posting in postings:
+                    idf = math.log(1 + (documents - len(posting) + 0.5) / (len(posting) + 0.5))
+                    tf = posting[post_id]
+                    score += idf * tf * (self.k1 + 1) / (tf + norm)
+                scores[post_id] = score
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+_index = InvertedIndex()
+_fts_available = {}
+
+
+def _highlight(value, tokens, window=None):
+    words = (value or '').split()
+    hits = [i for i, word in enumerate(words) if set(tokenize(word)) & tokens]
+    if window is not None:
+        start = max(0, (hits[0] if hits else 0) - window // 2)
+        words = words[start:start + window]
+        hits = [i - start for i in hits if start <= i < start + window]
+        prefix = '...' if start else ''
+        suffix = '...' if start + window < len((value or '').split()) else ''
+    else:
+        prefix = suffix = ''
+    for i in hits:
+        words[i] = HIGHLIGHT_OPEN + words[i] + HIGHLIGHT_CLOSE
+    return prefix + ' '.join(words) + suffix
+
+
+def has_fts(session):
+    bind = session.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return False
+    key = str(bind.url)
+    if key not in _fts_available:
+        _fts_available[key] = session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'posts_fts'")
+        ).first() is not None
+    return _fts_available[key]
+
+
+def search_posts(query, model, term, limit, offset=0):
+    """Rank the posts matched by ``query`` against ``term``.
+
+    ``query`` is a ``model`` query carrying any other listing filters.
+    Returns a list of ``SearchHit`` ordered best first.
+    """
+    session = query.session
+    match = _fts_query(term)
+    if not match:
+        return []
+
+    if has_fts(session):
+        rank = func.bm25(literal_column('posts_fts'), TITLE_WEIGHT, CONTENT_WEIGHT).label('rank')
+        title_snippet = func.highlight(literal_column('posts_fts'), 0, HIGHLIGHT_OPEN, HIGHLIGHT_CLOSE)
+        content_snippet = func.snippet(
+            literal_column('posts_fts'), 1, HIGHLIGHT_OPEN, HIGHLIGHT_CLOSE, '...', SNIPPET_WORDS
+        )
+        try:
+            rows = (
+                query.join(posts_fts, posts_fts.c.rowid == model.id)
+                .filter(literal_column('posts_fts').op('MATCH')(match))
+                .add_columns(rank, title_snippet, content_snippet)
+                .order_by(rank)
+                .offset(offset)
+                .limit(limit)
+                .all()
+            )
+        except OperationalError:
+            session.rollback()
+            _fts_available[str(session.get_bind().url)] = False
+        else:
+            return [SearchHit(post, -score, title, content) for post, score, title, content in rows]
+
+    _index.refresh(session, model)
+    ranked = _index.search(term)[:CANDIDATE_LIMIT]
+    if not ranked:
+        return []
+
+    scores = dict(ranked)
+    posts = query.filter(model.id.in_(list(scores))).all()
+    posts.sort(key=lambda post: scores[post.id], reverse=True)
+    tokens = set(tokenize(term))
+    return [
+        SearchHit(
+            post,
+            scores[post.id],
+            _highlight(post.title, tokens),
+            _highlight(post.content, tokens, SNIPPET_WORDS),
+        )
+        for post in posts[offset:offset + limit]
+    ]
+
+
+def rebuild(session):
+    if has_fts(session):
+        session.execute(text("INSERT INTO posts_fts(posts_fts) VALUES ('rebuild')"))
+        session.commit()
+    else:
+        global _index
+        _index = InvertedIndex()
+
+
+search_cli = AppGroup('search', help='Maintain the post search index.')
+
+
+@search_cli.command('rebuild')
+def rebuild_command():
+    rebuild(db.session)
+    click.echo('Search index rebuilt.')
@@ -1,68 +1,225 @@
 #!/usr/bin/env python3
 
 # Standard library imports
-from random import choice as rc
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from multiprocessing import Pool
 
 # Remote library imports
 from faker import Faker
-from werkzeug.security import generate_password_hash
+from sqlalchemy import func, insert, select
 
 # Local imports
-from app import app
-from models import db, User, Post, Comment  # Import your models
+from config import create_app
+from counters import rebuild as rebuild_counters, rebuild_categories, reconcile_posts
+from models import db, User, Post, Comment, CommentLike  # Import your models
+import passwords
+from passwords import hash_password
+from slugs import slugify
+from threads import segment
+
+# Large prime used to scatter popular posts across the id range, so the
+# most commented posts are not simply the oldest ones.
+SCATTER = 2654435761
+
+# Default reference time for created_at, fixed so reruns produce the same rows.
+SEED_EPOCH = datetime(2026, 1, 1)
+
+_fake = None
 
-fake = Faker()
 
 def generate_random_password():
-    return generate_password_hash('randompassword123')  # Use generate_password_hash to hash the password
+    return hash_password('randompassword123')  # Same bcrypt cost as signup, so logins don't rehash
+
+
+def _generators(seed, start):
+    # One Faker per worker process, reseeded per chunk so the output only
+    # depends on --seed and --chunk-size, not on which worker ran a chunk.
+    global _fake
+    if _fake is None:
+        _fake = Faker()
+    _fake.seed_instance(seed * 1000003 + start)
+    return _fake, random.Random(seed * 1000003 + start)
+
+
+def _timestamp(rng, now, days):
+    return now - timedelta(seconds=rng.random() * days * 86400)
+
+
+def user_rows(task):
+    start, count, seed, now, days, password = task
+    fake, rng = _generators(seed, start)
+    rows = []
+    for i in range(start, start + count):
+        created_at = _timestamp(rng, now, days)
+        rows.append({
+            'id': i,
+            'username': f'{fake.user_name()}{i}',
+            'email': f'user{i}@{fake.free_email_domain()}',
+            'password': password,
+            'created_at': created_at,
+            'updated_at': created_at,
+        })
+    return rows
+
+
+def post_rows(task):
+    start, count, seed, now, days, first_user, users = task
+    fake, rng = _generators(seed, start)
+    rows = []
+    for i in range(start, start + count):
+        # The id suffix keeps titles and slugs unique without a lookup.
+        title = f'{fake.sentence().rstrip(".")} {i}'
+        created_at = _timestamp(rng, now, days)
+        rows.append({
+            'id': i,
+            'user_id': first_user + rng.randrange(users),
+            'title': title,
+            'slug': slugify(title),
+            'content': fake.text(),
+            'category': rng.choice(('uncategorized', 'javascript', 'reactjs', 'nextjs', 'python')),
+            'created_at': created_at,
+            'updated_at': created_at,
+        })
+    return rows
+
+
+def comment_rows(task):
+    start, count, seed, now, days, first_user, users, first_post, posts, skew, replies = task
+    fake, rng = _generators(seed, start)
+    rows = []
+    for i in range(start, start + count):
+        created_at = _timestamp(rng, now, days)
+        row = {
+            'id': i,
+            'content': fake.sentence(),
+            'user_id': first_user + rng.randrange(users),
+            'parent_id': None,
+            'path': segment(i),
+            'depth': 0,
+            'reply_count': 0,
+            'number_of_likes': 0,
+            'created_at': created_at,
+            'updated_at': created_at,
+        }
+        if rows and rng.random() < replies:
+            # Reply to an earlier comment from this chunk, so the parent's
+            # path and reply_count are known without a lookup.
+            parent = rng.choice(rows)
+            parent['reply_count'] += 1
+            row.update(
+                post_id=parent['post_id'],
+                parent_id=parent['id'],
+                path=parent['path'] + row['path'],
+                depth=parent['depth'] + 1,
+                created_at=max(created_at, parent['created_at']),
+            )
+            row['updated_at'] = row['created_at']
+        else:
+            # u ** skew piles the mass onto low ranks: the top 1% of posts get
+            # 0.01 ** (1 / skew) of all comments (~21% at skew=3).
+            rank = int(posts * rng.random() ** skew)
+            row['post_id'] = first_post + (rank * SCATTER) % posts
+        rows.append(row)
+    return rows
+
+
+def next_id(model):
+    return (db.session.scalar(select(func.max(model.id))) or 0) + 1
+
+
+def bulk_insert(model, make_rows, tasks, pool, label):
+    started = time.perf_counter()
+    total = 0
+    rows_iter = pool.imap(make_rows, tasks) if pool else map(make_rows, tasks)
+    for rows in rows_iter:
+        # A list of dicts becomes a single executemany per chunk.
+        db.session.execute(insert(model), rows)
+        db.session.commit()
+        total += len(rows)
+    elapsed = time.perf_counter() - started
+    print(f'  {label}: {total} rows in {elapsed:.1f}s ({total / max(elapsed, 1e-9):,.0f} rows/s)')
+
+
+def chunks(start, count, size):
+    for offset in range(0, count, size):
+        yield start + offset, min(size, count - offset)
+
+
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f'must be at least 1, got {value}')
+    return number
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Seed the database with deterministic fake data.')
+    parser.add_argument('--users', type=positive_int, default=10)
+    parser.add_argument('--posts', type=int, default=20)
+    parser.add_argument('--comments', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0, help='Same seed and chunk size, same rows.')
+    parser.add_argument('--chunk-size', type=positive_int, default=5000)
+    parser.add_argument('--workers', type=positive_int, default=1, help='Processes used to generate rows.')
+    parser.add_argument('--days', type=int, default=365, help='Spread created_at over this many days.')
+    parser.add_argument('--now', type=datetime.fromisoformat, default=SEED_EPOCH,
+                        help=f'Newest possible created_at, ISO 8601 (default {SEED_EPOCH.isoformat()}).')
+    parser.add_argument('--skew', type=float, default=3.0, help='Power-law skew of comments per post (1 = uniform).')
+    parser.add_argument('--replies', type=float, default=0.3, help='Fraction of comments that reply to another comment.')
+    parser.add_argument('--append', action='store_true', help='Keep existing rows instead of clearing them.')
+    return parser.parse_args()
 
-def create_users(num):
-    users = []
-    for _ in range(num):
-        password = generate_random_password()
-        user = User(username=fake.user_name(), email=fake.email(), password=password)
-        users.append(user)
-        db.session.add(user)
-    db.session.commit()
-    return users
-
-def create_posts(users, num):
-    posts = []
-    for _ in range(num):
-        user = rc(users)
-        title = fake.sentence()
-        slug = generate_slug(title)  # Generate a unique slug based on the title
-        post = Post(title=title, content=fake.text(), user_id=user.id, slug=slug)
-        posts.append(post)
-        db.session.add(post)
-    db.session.commit()
-    return posts
-
-def generate_slug(title):
-    # Convert title to lowercase and replace spaces with hyphens
-    return title.lower().replace(' ', '-')
-
-
-def create_comments(users, posts, num):
-    for _ in range(num):
-        user = rc(users)
-        post = rc(posts)
-        comment = Comment(content=fake.sentence(), user_id=user.id, post_id=post.id)
-        db.session.add(comment)
-    db.session.commit()
 
 if __name__ == '__main__':
+    args = parse_args()
+    app = create_app(blueprints=())
+    passwords.init_app(app)  # Not serving, so create_app leaves the hasher alone
+
     with app.app_context():
         print("Starting seed...")
 
-        # Clear existing data
-        db.session.query(Comment).delete()
-        db.session.query(Post).delete()
-        db.session.query(User).delete()
+        if not args.append:
+            # Clear existing data
+            db.session.query(CommentLike).delete()
+            db.session.query(Comment).delete()
+            db.session.query(Post).delete()
+            db.session.query(User).delete()
+            db.session.commit()
+
+        now = args.now
+        password = generate_random_password()
+        pool = Pool(args.workers) if args.workers > 1 else None
+
+        try:
+            # Create and add fake data
+            first_user = next_id(User)
+            bulk_insert(User, user_rows, (
+                (start, count, args.seed, now, args.days, password)
+                for start, count in chunks(first_user, args.users, args.chunk_size)
+            ), pool, 'users')
+
+            first_post = next_id(Post)
+            bulk_insert(Post, post_rows, (
+                (start, count, args.seed, now, args.days, first_user, args.users)
+                for start, count in chunks(first_post, args.posts, args.chunk_size)
+            ), pool, 'posts')
+
+            if args.posts:
+                first_comment = next_id(Comment)
+                bulk_insert(Comment, comment_rows, (
+                    (start, count, args.seed, now, args.days, first_user, args.users, first_post, args.posts, args.skew, args.replies)
+                    for start, count in chunks(first_comment, args.comments, args.chunk_size)
+                ), pool, 'comments')
+        finally:
+            if pool:
+                pool.close()
+                pool.join()
 
-        # Create and add fake data
-        users = create_users(10)
-        posts = create_posts(users, 20)
-        create_comments(users, posts, 50)
+        # Bulk inserts bypass the session events that keep the rollup current.
+        rebuild_counters(db.session)
+        reconcile_posts(db.session)
+        rebuild_categories(db.session)
 
         print("Seeding complete!")
@@ -0,0 +1,169 @@
+# Standard library imports
+import json
+import time
+from datetime import date, datetime
+
+# Remote library imports
+from flask import Response, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import select
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+# Local imports
+from instrumentation import add_timing
+from models import CategoryCount, Comment, Post, User
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+if orjson is not None:
+    def dumps(value):
+        return orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS)
+else:
+    _encoder = json.JSONEncoder(default=_default, separators=(',', ':'), ensure_ascii=False)
+
+    def dumps(value):
+        return _encoder.encode(value).encode('utf-8')
+
+
+def loads(value):
+    if orjson is not None:
+        return orjson.loads(value)
+    return json.loads(value)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Compact JSON for ``jsonify``, backed by orjson when it is installed."""
+
+    def dumps(self, obj, **kwargs):
+        started = time.perf_counter()
+        data = dumps(obj).decode('utf-8')
+        add_timing('serialize', time.perf_counter() - started)
+        return data
+
+    def loads(self, s, **kwargs):
+        return loads(s)
+
+
+class Schema:
+    """Read-only projection of a model onto a fixed set of output keys.
+
+    The column list and the SELECT are built once, rows come back as plain
+    tuples (no ORM instances, no identity map), and each row becomes a dict
+    with a single ``zip``.
+    """
+
+    def __init__(self, model, fields):
+        self.model = model
+        self.keys = tuple(fields)
+        self.columns = tuple(getattr(model, attr) for attr in fields.values())
+        self._select = select(*self.columns)
+
+    def select(self):
+        return self._select
+
+    def dump_row(self, row):
+        return dict(zip(self.keys, row))
+
+    def dump_rows(self, rows):
+        keys = self.keys
+        return [dict(zip(keys, row)) for row in rows]
+
+    def dump_object(self, obj):
+        return {key: getattr(obj, column.key) for key, column in zip(self.keys, self.columns)}
+
+
+USER_SCHEMA = Schema(User, {
+    'id': 'id',
+    'username': 'username',
+    'email': 'email',
+    'profile_picture': 'profile_picture',
+    'is_admin': 'is_admin',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+})
+
+POST_SCHEMA = Schema(Post, {
+    'id': 'id',
+    'user_id': 'user_id',
+    'content': 'content',
+    'title': 'title',
+    'image': 'image',
+    'category': 'category',
+    'slug': 'slug',
+    'comment_count': 'comment_count',
+    'last_comment_at': 'last_comment_at',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+})
+
+COMMENT_SCHEMA = Schema(Comment, {
+    'id': 'id',
+    'content': 'content',
+    'post_id': 'post_id',
+    'user_id': 'user_id',
+    'parent_id': 'parent_id',
+    'depth': 'depth',
+    'reply_count': 'reply_count',
+    'number_of_likes': 'number_of_likes',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+})
+
+CATEGORY_SCHEMA = Schema(CategoryCount, {
+    'category': 'category',
+    'post_count': 'post_count',
+    'last_updated_at': 'last_updated_at',
+})
+
+
+def json_response(data, status=200):
+    return Response(dumps(data), status=status, mimetype='application/json')
+
+
+def iter_json_array(items, chunk_size=500):
+    """Yield a JSON array of ``items`` in chunks so the body can be streamed."""
+    yield b'['
+    buffer = []
+    first = True
+    for item in items:
+        buffer.append(dumps(item))
+        if len(buffer) >= chunk_size:
+            yield (b'' if first else b',') + b','.join(buffer)
+            first = False
+            buffer = []
+    if buffer:
+        yield (b'' if first else b',') + b','.join(buffer)
+    yield b']'
+
+
+def stream_json_array(items):
+    # The generator runs after the view returns; keep the request context
+    # (and with it the DB session) alive until the last chunk is sent.
+    return Response(stream_with_context(iter_json_array(items)), mimetype='application/json')
+
+
+def iter_ndjson(items, chunk_size=500):
+    """Yield ``items`` as newline-delimited JSON, ``chunk_size`` lines at a time."""
+    buffer = []
+    for item in items:
+        buffer.append(dumps(item))
+        if len(buffer) >= chunk_size:
+            yield b'\n'.join(buffer) + b'\n'
+            buffer = []
+    if buffer:
+        yield b'\n'.join(buffer) + b'\n'
+
+
+def stream_ndjson(items):
+    return Response(stream_with_context(iter_ndjson(items)), mimetype='application/x-ndjson')
@@ -0,0 +1,77 @@
+# Standard library imports
+import re
+import unicodedata
+
+# Remote library imports
+from sqlalchemy import select
+
+# Local imports
+from cache import LocalCache
+from models import Post
+
+SLUG_CACHE_SIZE = 10000
+SLUG_CACHE_TTL = 3600
+
+# slug -> post id. Slugs never change once assigned; an entry left behind
+# by a deleted post is caught by the id lookup and dropped.
+slug_ids = LocalCache(max_entries=SLUG_CACHE_SIZE, ttl=SLUG_CACHE_TTL)
+
+
+def slugify(title):
+    """``'Héllo, Wörld!'`` -> ``'hello-world'``: ASCII letters and digits joined by hyphens."""
+    title = unicodedata.normalize('NFKD', title).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]+', '-', title.lower()).strip('-') or 'post'
+
+
+def _suffix(base, slug):
+    """1 for ``base`` itself, ``n`` for ``base-n``, None for anything else."""
+    if slug == base:
+        return 1
+    match = re.fullmatch(re.escape(base) + r'-(\d+)', slug)
+    return int(match.group(1)) if match else None
+
+
+def _highest_suffix(session, base, reserved):
+    # Slugs only contain [a-z0-9-] and '-' sorts just before '.', so
+    # [base, base + '.') is exactly base and base-*: one range seek on the
+    # unique slug index.
+    taken = session.scalars(select(Post.slug).where(Post.slug >= base, Post.slug < base + '.'))
+    suffixes = [_suffix(base, slug) for slug in list(taken) + list(reserved)]
+    return max((n for n in suffixes if n is not None), default=0)
+
+
+def unique_slugs(session, titles, reserved=()):
+    """Collision-free slugs for ``titles``, in order.
+
+    The first post with a given base slug gets it as is, later ones get
+    ``base-2``, ``base-3`` and so on. Costs one query per distinct base;
+    ``reserved`` are slugs already claimed by the caller (say, explicit
+    slugs elsewhere in the same batch).
+    """
+    highest = {}
+    slugs = []
+    for title in titles:
+        base = slugify(title)
+        if base not in highest:
+            highest[base] = _highest_suffix(session, base, reserved)
+        highest[base] += 1
+        slugs.append(base if highest[base] == 1 else f'{base}-{highest[base]}')
+    return slugs
+
+
+def unique_slug(session, title):
+    return unique_slugs(session, [title])[0]
+
+
+def find_post(session, slug):
+    """The post with ``slug``, or None, looked up through ``slug_ids``."""
+    post_id = slug_ids.get(slug)
+    if post_id is not None:
+        post = session.get(Post, post_id)
+        if post is not None and post.slug == slug:
+            return post
+
+    post = session.scalars(select(Post).where(Post.slug == slug)).first()
+    if post is not None:
+        slug_ids.set(slug, post.id)
+    return post
@@ -0,0 +1,25 @@
+# Standard library imports
+
+# Remote library imports
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+
+# Local imports
+
+
+def dialect_insert(connection, table):
+    """Return an INSERT for ``table`` that supports ``ON CONFLICT`` clauses."""
+    if connection.dialect.name == 'postgresql':
+        return postgresql.insert(table)
+    return sqlite.insert(table)
+
+
+def listen_all(target, listeners):
+    """Register ``[(event name, fn), ...]`` on ``target``, skipping any already there.
+
+    ``create_app`` can run more than once per process (tests, workers), and
+    a listener registered twice would apply its side effects twice.
+    """
+    for identifier, fn in listeners:
+        if not event.contains(target, identifier, fn):
+            event.listen(target, identifier, fn)
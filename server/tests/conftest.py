@@ -0,0 +1,68 @@
+# Standard library imports
+from datetime import datetime
+
+# Remote library imports
+import jwt
+import pytest
+from sqlalchemy import insert
+
+# Local imports
+import cache
+from config import create_app, db
+from models import Comment, Post, User
+
+
+@pytest.fixture
+def app(tmp_path):
+    """The full app on a throwaway SQLite file with the ``testing`` profile."""
+    app = create_app(
+        SQLALCHEMY_DATABASE_URI=f'sqlite:///{tmp_path / "test.db"}',
+        DB_PROFILE='testing',
+        BCRYPT_LOG_ROUNDS=4,
+        SECRET_KEY='test-secret-key-long-enough-for-hs256',
+        TESTING=True,
+    )
+    with app.app_context():
+        db.create_all()
+    # The response cache is process-wide; entries from another test's database must not leak in.
+    cache.backend.clear()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def sign_in(client, user_id, is_admin=False):
+    """Give ``client`` the access_token cookie signin would have set."""
+    token = jwt.encode({'id': user_id, 'isAdmin': is_admin}, client.application.config['SECRET_KEY'])
+    client.set_cookie('localhost', 'access_token', token)
+
+
+def add_users(count, start=1):
+    now = datetime.utcnow()
+    db.session.execute(insert(User), [{
+        'id': i, 'username': f'user{i}', 'email': f'user{i}@example.com', 'password': 'x',
+        'created_at': now, 'updated_at': now,
+    } for i in range(start, start + count)])
+
+
+def add_posts(count, users=1, start=1):
+    now = datetime.utcnow()
+    db.session.execute(insert(Post), [{
+        'id': i, 'user_id': 1 + i % users, 'title': f'Post {i}', 'slug': f'post-{i}', 'content': 'Body',
+        'category': 'python', 'created_at': now, 'updated_at': now,
+    } for i in range(start, start + count)])
+
+
+def add_comments(count, posts=1, users=1, start=1):
+    now = datetime.utcnow()
+    db.session.execute(insert(Comment), [{
+        'id': i, 'post_id': 1 + i % posts, 'user_id': 1 + i % users, 'content': f'Comment {i}',
+        'path': f'{i:010d}/', 'depth': 0, 'reply_count': 0, 'number_of_likes': 0,
+        'created_at': now, 'updated_at': now,
+    } for i in range(start, start + count)])
@@ -0,0 +1,111 @@
+# Standard library imports
+import asyncio
+import json
+from datetime import datetime
+
+# Remote library imports
+import pytest
+from sqlalchemy import insert
+
+# Local imports
+import counters
+from asgi import AsyncReads
+from conftest import add_comments, add_posts, add_users
+from config import db
+from likes import IN_CHUNK_SIZE
+from models import CommentLike
+
+
+def call(app, path, query='', headers=(), method='GET'):
+    """Run one request through the ASGI app; return ``(status, headers, body)``."""
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': method,
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'root_path': '',
+        'query_string': query.encode(), 'server': ('testserver', 80), 'client': ('127.0.0.1', 1234),
+        'headers': [(name.lower().encode(), value.encode()) for name, value in headers],
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    async def run():
+        await app(scope, receive, send)
+        await app.engine.dispose()
+
+    asyncio.run(run())
+    start = messages[0]
+    body = b''.join(message.get('body', b'') for message in messages[1:])
+    return start['status'], {name.decode(): value.decode() for name, value in start['headers']}, body
+
+
+@pytest.fixture
+def asgi_app(app):
+    return AsyncReads(app)
+
+
+def test_post_listing_and_conditional_get(app, asgi_app):
+    with app.app_context():
+        add_users(1)
+        add_posts(3)
+        counters.rebuild(db.session)
+
+    status, headers, body = call(asgi_app, '/api/posts', 'limit=2')
+    assert status == 200
+    listing = json.loads(body)
+    assert [post['id'] for post in listing['posts']] == [3, 2]
+    assert listing['totalPosts'] == 3
+    assert listing['nextCursor']
+
+    status, _, body = call(asgi_app, '/api/posts', f"limit=2&cursor={listing['nextCursor']}")
+    assert [post['id'] for post in json.loads(body)['posts']] == [1]
+
+    etag = headers['etag']
+    status, _, body = call(asgi_app, '/api/posts', 'limit=2', [('If-None-Match', f'"other", {etag}')])
+    assert (status, body) == (304, b'')
+    status, _, _ = call(asgi_app, '/api/posts', 'limit=2', [('If-None-Match', f'W/{etag}')])
+    assert status == 304
+    # A listed ETag that merely contains the current one is not a match.
+    status, _, _ = call(asgi_app, '/api/posts', 'limit=2', [('If-None-Match', f'"x{etag[1:]}')])
+    assert status == 200
+
+
+def test_bad_paging_arguments_are_a_400(asgi_app):
+    for query, error in (('limit=ten', 'limit must be an integer'), ('cursor=nope', 'Invalid cursor')):
+        status, _, body = call(asgi_app, '/api/posts', query)
+        assert (status, json.loads(body)) == (400, {'error': error})
+
+
+def test_comment_thread_marks_likes_past_one_chunk(app, asgi_app):
+    count = IN_CHUNK_SIZE + 10
+    with app.app_context():
+        add_users(2)
+        add_posts(1)
+        add_comments(count)
+        db.session.execute(insert(CommentLike), [
+            {'comment_id': i, 'user_id': 2, 'created_at': datetime.utcnow()} for i in range(1, count + 1, 2)
+        ])
+        db.session.commit()
+
+    status, _, body = call(asgi_app, '/api/comments/1', 'userId=2')
+    assert status == 200
+    comments = json.loads(body)
+    assert len(comments) == count
+    assert {comment['id'] for comment in comments if comment['likedByUser']} == set(range(1, count + 1, 2))
+
+    _, _, body = call(asgi_app, '/api/comments/1')
+    assert not any(comment['likedByUser'] for comment in json.loads(body))
+
+
+def test_other_routes_fall_back_to_flask(app, asgi_app):
+    with app.app_context():
+        add_users(1)
+        add_posts(1)
+        db.session.commit()
+
+    status, _, body = call(asgi_app, '/api/posts/post-1')
+    assert status == 200
+    assert json.loads(body)['slug'] == 'post-1'
@@ -0,0 +1,93 @@
+# Standard library imports
+import time
+from datetime import datetime, timedelta
+
+# Remote library imports
+import jwt
+import pytest
+from sqlalchemy import insert
+
+# Local imports
+import auth_middleware
+from auth_middleware import TokenCache, token_cache
+from config import db
+from models import User
+from passwords import hash_password
+
+
+@pytest.fixture(autouse=True)
+def empty_token_cache():
+    token_cache.clear()
+
+
+@pytest.fixture
+def users(app):
+    with app.app_context():
+        password = hash_password('secret')
+        db.session.execute(insert(User), [
+            {'id': 1, 'username': 'admin', 'email': 'admin@example.com', 'password': password, 'is_admin': True},
+            {'id': 2, 'username': 'reader', 'email': 'reader@example.com', 'password': password},
+        ])
+        db.session.commit()
+
+
+def signin(client, email):
+    response = client.post('/api/signin', json={'email': email, 'password': 'secret'})
+    assert response.status_code == 200
+    return response
+
+
+def test_token_cache_is_a_bounded_lru_that_drops_expired_claims():
+    cache = TokenCache(max_entries=2)
+    later = time.time() + 60
+    cache.set(b'a', {'id': 1, 'exp': later})
+    cache.set(b'b', {'id': 2, 'exp': later})
+    assert cache.get(b'a') == {'id': 1, 'exp': later}
+    cache.set(b'c', {'id': 3, 'exp': later})
+    # b was the least recently used.
+    assert cache.get(b'b') is None
+    assert cache.get(b'a') and cache.get(b'c')
+
+    cache.set(b'old', {'id': 4, 'exp': time.time() - 1})
+    assert cache.get(b'old') is None
+    cache.set(b'no-exp', {'id': 5})
+    assert cache.get(b'no-exp') is None
+
+
+def test_request_user_comes_from_the_signin_cookie(users, client):
+    assert client.get('/api/users').status_code == 403
+
+    signin(client, 'reader@example.com')
+    assert client.get('/api/users').status_code == 403
+    assert client.put('/api/users/1', json={}).status_code == 403
+    assert client.put('/api/users/2', json={'profilePicture': 'me.png'}).status_code == 200
+
+    signin(client, 'admin@example.com')
+    assert client.get('/api/users').status_code == 200
+
+
+def test_verified_tokens_are_decoded_once(users, client, monkeypatch):
+    decodes = []
+    real_decode = jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        decodes.append(args[0])
+        return real_decode(*args, **kwargs)
+
+    monkeypatch.setattr(auth_middleware.jwt, 'decode', counting_decode)
+    signin(client, 'admin@example.com')
+    for _ in range(3):
+        assert client.get('/api/users').status_code == 200
+    assert len(decodes) == 1
+
+
+@pytest.mark.parametrize('claims, key', [
+    ({'id': 1, 'isAdmin': True, 'exp': datetime.utcnow() - timedelta(minutes=1)}, None),
+    ({'id': 1, 'isAdmin': True}, 'not-the-secret-key-but-just-as-long'),
+    ({'isAdmin': True}, None),
+])
+def test_bad_tokens_leave_the_request_anonymous(app, users, client, claims, key):
+    token = jwt.encode(claims, key or app.config['SECRET_KEY'])
+    client.set_cookie('localhost', 'access_token', token)
+    assert client.get('/api/users').status_code == 403
+    assert len(token_cache._entries) == 0
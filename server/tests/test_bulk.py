@@ -0,0 +1,130 @@
+# Standard library imports
+import json
+
+# Remote library imports
+import pytest
+from sqlalchemy import select
+
+# Local imports
+from conftest import add_posts, add_users, sign_in
+from config import db
+from models import Comment, Post, User
+from passwords import check_password
+
+
+@pytest.fixture
+def admin(app, client):
+    with app.app_context():
+        add_users(2)
+        db.session.execute(User.__table__.update().where(User.id == 1).values(is_admin=True))
+        db.session.commit()
+    sign_in(client, 1, is_admin=True)
+    return client
+
+
+@pytest.mark.parametrize('kind', ['users', 'posts', 'comments'])
+def test_bulk_create_needs_an_admin(app, client, kind):
+    with app.app_context():
+        add_users(1)
+        db.session.commit()
+
+    assert client.post(f'/{kind}/bulk', json=[]).status_code == 403
+    sign_in(client, 1)
+    response = client.post(f'/{kind}/bulk', json=[])
+    assert response.status_code == 403
+    assert response.get_json() == {'error': f'You are not allowed to bulk create {kind}'}
+
+
+def test_bulk_users_are_hashed_and_never_admins(app, admin):
+    response = admin.post('/users/bulk', json=[
+        {'username': 'ada', 'email': 'ada@example.com', 'password': 'secret1', 'isAdmin': True},
+        {'username': 'bob', 'email': 'bob@example.com', 'password': 'secret2'},
+    ])
+    assert response.status_code == 201
+    assert response.get_json() == {'created': 2, 'errors': []}
+
+    with app.app_context():
+        users = db.session.execute(
+            select(User.username, User.password, User.is_admin).where(User.id > 2).order_by(User.id)
+        ).all()
+    assert [(username, is_admin) for username, _, is_admin in users] == [('ada', False), ('bob', False)]
+    assert check_password('secret1', users[0].password)
+
+
+def test_partial_import_reports_each_rejected_item(app, admin):
+    with app.app_context():
+        add_posts(1)
+        db.session.commit()
+
+    response = admin.post('/posts/bulk', json=[
+        {'userId': 1, 'title': 'First', 'content': 'Body'},
+        {'userId': 1, 'content': 'No title'},
+        {'userId': 99, 'title': 'Orphan', 'content': 'Body'},
+        {'userId': 2, 'title': 'Post 1', 'content': 'Taken title'},
+        {'userId': 2, 'title': 'First', 'content': 'Duplicate in batch'},
+        'not an object',
+        {'userId': 2, 'title': 'Second', 'content': 'Body', 'slug': 'second-post'},
+    ])
+    assert response.status_code == 207
+    body = response.get_json()
+    assert body['created'] == 2
+    assert body['errors'] == [
+        {'index': 1, 'error': 'Missing required fields: title'},
+        {'index': 2, 'error': 'User not found: 99'},
+        {'index': 3, 'error': 'Title already exists: Post 1'},
+        {'index': 4, 'error': 'Duplicate title in this batch: First'},
+        {'index': 5, 'error': 'Each item must be an object'},
+    ]
+    with app.app_context():
+        assert db.session.scalars(select(Post.slug).where(Post.id > 1).order_by(Post.id)).all() == ['first', 'second-post']
+
+
+def test_bulk_comments_thread_replies(app, admin):
+    with app.app_context():
+        add_posts(2)
+        db.session.commit()
+
+    response = admin.post('/comments/bulk', json=[{'postId': 1, 'userId': 2, 'content': 'Root'}])
+    assert response.status_code == 201
+    with app.app_context():
+        root_id = db.session.scalar(select(Comment.id))
+
+    lines = [
+        json.dumps({'postId': 1, 'userId': 1, 'content': 'Reply', 'parentId': root_id}),
+        '{not json',
+        json.dumps({'postId': 2, 'userId': 1, 'content': 'Wrong post', 'parentId': root_id}),
+    ]
+    response = admin.post('/comments/bulk', data='\n'.join(lines), content_type='application/x-ndjson')
+    assert response.status_code == 207
+    errors = response.get_json()['errors']
+    assert [error['index'] for error in errors] == [1, 2]
+    assert errors[0]['error'].startswith('line 2:')
+    assert errors[1]['error'] == f'Parent comment not found on this post: {root_id}'
+
+    with app.app_context():
+        root = db.session.get(Comment, root_id)
+        reply = db.session.scalars(select(Comment).where(Comment.parent_id == root_id)).one()
+        assert root.reply_count == 1
+        assert (reply.depth, reply.path.startswith(root.path)) == (1, True)
+        assert db.session.get(Post, 1).comment_count == 2
+
+
+def test_nothing_created_is_a_400(admin):
+    response = admin.post('/comments/bulk', json=[{'postId': 5, 'userId': 1, 'content': 'Missing post'}])
+    assert response.status_code == 400
+    assert response.get_json() == {'created': 0, 'errors': [{'index': 0, 'error': 'Post not found: 5'}]}
+
+
+def test_unusable_bodies_are_rejected_whole(app, admin):
+    response = admin.post('/users/bulk', data='{"username": "ada"}', content_type='application/json')
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Expected a JSON array or an NDJSON body'}
+
+    response = admin.post('/users/bulk', data='[{', content_type='application/json')
+    assert response.status_code == 400
+    assert response.get_json()['error'].startswith('Invalid JSON')
+
+    app.config['BULK_MAX_ITEMS'] = 2
+    response = admin.post('/posts/bulk', json=[{}, {}, {}])
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'At most 2 items per request'}
@@ -0,0 +1,93 @@
+# Standard library imports
+from datetime import datetime, timezone
+
+# Remote library imports
+from sqlalchemy import update
+
+# Local imports
+import cache
+from conftest import add_comments, add_posts, add_users
+from config import db
+from deletes import delete_posts
+from likes import toggle_like
+from models import Comment, User
+
+
+def generations():
+    return {namespace: cache.backend.generation(namespace) for namespace in ('posts', 'post_comments', 'post_authors')}
+
+
+def bumped(before):
+    after = generations()
+    return {namespace for namespace in after if after[namespace] != before[namespace]}
+
+
+def test_writes_only_invalidate_what_they_change(app):
+    with app.app_context():
+        add_users(2)
+        add_posts(2)
+        add_comments(2, posts=2)
+        db.session.commit()
+
+        before = generations()
+        toggle_like(db.session, 1, 2)
+        db.session.commit()
+        assert bumped(before) == {'post_comments'}
+
+        before = generations()
+        db.session.get(User, 2).profile_picture = 'https://example.com/me.png'
+        db.session.commit()
+        assert bumped(before) == {'post_authors'}
+
+        before = generations()
+        db.session.get(Comment, 2).content = 'Edited'
+        db.session.commit()
+        assert bumped(before) == {'post_comments'}
+
+        before = generations()
+        db.session.execute(update(Comment).where(Comment.id == 2).values(post_id=1))
+        db.session.commit()
+        assert bumped(before) == {'posts', 'post_comments'}
+
+        before = generations()
+        db.session.add(Comment(content='New', post_id=1, user_id=1))
+        db.session.commit()
+        assert bumped(before) == {'posts', 'post_comments'}
+
+
+def test_if_modified_since_does_not_hide_a_delete(app, client):
+    with app.app_context():
+        add_users(1)
+        add_posts(3)
+        db.session.commit()
+
+    first = client.get('/api/posts')
+    assert first.status_code == 200 and first.last_modified
+    assert client.get('/api/posts', headers={'If-None-Match': first.headers['ETag']}).status_code == 304
+
+    with app.app_context():
+        # The newest post survives, so the page's max updated_at does not move.
+        delete_posts(db.session, [1])
+
+    second = client.get('/api/posts', headers={'If-Modified-Since': first.headers['Last-Modified']})
+    assert second.status_code == 200
+    assert len(second.get_json()['posts']) == 2
+
+
+def test_included_authors_are_invalidated_with_users(app, client):
+    with app.app_context():
+        add_users(1)
+        add_posts(1)
+        db.session.commit()
+    assert client.get('/api/posts?include=author').get_json()['posts'][0]['author']['username'] == 'user1'
+
+    with app.app_context():
+        db.session.get(User, 1).username = 'renamed'
+        db.session.commit()
+    assert client.get('/api/posts?include=author').get_json()['posts'][0]['author']['username'] == 'renamed'
+
+
+def test_redis_entries_round_trip_without_pickle():
+    entry = cache.CachedResponse(b'{"posts":[]}\n', 'application/json', 'abc', datetime(2024, 5, 1, tzinfo=timezone.utc))
+    assert cache._decode(cache._encode(entry)) == entry
+    assert cache._decode(cache._encode(entry._replace(last_modified=None))).last_modified is None
@@ -0,0 +1,55 @@
+# Standard library imports
+from datetime import datetime, timedelta
+
+# Remote library imports
+from sqlalchemy import select
+
+# Local imports
+from conftest import add_users
+from config import db
+from counters import Counts, get_counts, rebuild
+from models import DailyCount, Post, User
+
+
+def user(i, created_at=None):
+    return User(id=i, username=f'user{i}', email=f'user{i}@example.com', password='x', created_at=created_at)
+
+
+def test_session_writes_keep_the_rollup_current(app):
+    with app.app_context():
+        db.session.add_all([user(1), user(2), user(3, datetime.utcnow() - timedelta(days=40))])
+        db.session.commit()
+        assert get_counts(db.session, 'users') == Counts(3, 2)
+        assert db.session.scalar(select(db.func.count()).select_from(DailyCount).where(DailyCount.name == 'users')) == 2
+
+        # The cached counts are dropped on commit, not left for CACHE_TTL.
+        db.session.delete(db.session.get(User, 3))
+        db.session.commit()
+        assert get_counts(db.session, 'users') == Counts(2, 2)
+
+        db.session.add(user(4))
+        db.session.flush()
+        db.session.rollback()
+        assert get_counts(db.session, 'users') == Counts(2, 2)
+
+
+def test_rebuild_recounts_writes_that_bypassed_the_session(app, client):
+    with app.app_context():
+        db.session.add(user(1))
+        db.session.commit()
+        add_users(4, start=2)
+        db.session.add(Post(user_id=1, title='Old', slug='old', content='Body',
+                            created_at=datetime.utcnow() - timedelta(days=90)))
+        db.session.commit()
+        assert get_counts(db.session, 'users') == Counts(1, 1)
+
+        rebuild(db.session, ['users'])
+        assert get_counts(db.session, 'users') == Counts(5, 5)
+
+    listing = client.get('/api/posts').get_json()
+    assert (listing['totalPosts'], listing['lastMonthPosts']) == (1, 0)
+
+    result = app.test_cli_runner().invoke(args=['counters', 'rebuild'])
+    assert 'Counters rebuilt.' in result.output
+    with app.app_context():
+        assert get_counts(db.session, 'posts') == Counts(1, 0)
@@ -0,0 +1,72 @@
+# Standard library imports
+
+# Remote library imports
+from sqlalchemy import func, select
+
+# Local imports
+from conftest import add_posts, add_users
+from config import db
+from deletes import delete_subtree
+from likes import toggle_like
+from models import Comment, CommentLike, Post
+
+
+def add_comment(parent=None, path=True):
+    comment = Comment(content='Comment', post_id=1, user_id=1, parent_id=parent and parent.id)
+    db.session.add(comment)
+    db.session.flush()
+    if not path:
+        comment.path = None
+        db.session.flush()
+    return comment
+
+
+def count(model):
+    return db.session.scalar(select(func.count()).select_from(model))
+
+
+def test_delete_subtree_removes_replies_likes_and_stats(app):
+    with app.app_context():
+        add_users(1)
+        add_posts(1)
+        root = add_comment()
+        reply = add_comment(root)
+        add_comment(reply)
+        survivor = add_comment()
+        toggle_like(db.session, reply.id, 1)
+        db.session.commit()
+        root_id, reply_id, survivor_id = root.id, reply.id, survivor.id
+
+        assert delete_subtree(db.session, reply_id) == 2
+        db.session.commit()
+
+        assert db.session.scalars(select(Comment.id).order_by(Comment.id)).all() == [root_id, survivor_id]
+        assert count(CommentLike) == 0
+        assert db.session.get(Comment, root_id).reply_count == 0
+        assert db.session.get(Post, 1).comment_count == 2
+
+
+def test_delete_subtree_without_path_still_deletes_the_comment(app):
+    with app.app_context():
+        add_users(1)
+        add_posts(1)
+        comment_id = add_comment(path=False).id
+        db.session.commit()
+
+        assert delete_subtree(db.session, comment_id) == 1
+        assert delete_subtree(db.session, comment_id) == 0
+        db.session.commit()
+        assert count(Comment) == 0
+
+
+def test_orm_delete_cascades_in_the_database(app):
+    with app.app_context():
+        add_users(1)
+        add_posts(1)
+        toggle_like(db.session, add_comment().id, 1)
+        db.session.commit()
+
+        # Outside deletes.py, passive_deletes leaves the children to ON DELETE CASCADE.
+        db.session.delete(db.session.get(Post, 1))
+        db.session.commit()
+        assert (count(Comment), count(CommentLike)) == (0, 0)
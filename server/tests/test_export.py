@@ -0,0 +1,37 @@
+# Standard library imports
+import tracemalloc
+
+# Remote library imports
+
+# Local imports
+from conftest import add_comments, add_posts, add_users
+from config import db
+
+
+def peak_while_streaming(client, path):
+    tracemalloc.start()
+    try:
+        response = client.get(path, buffered=False)
+        lines = sum(chunk.count(b'\n') for chunk in response.response)
+        response.close()
+        return lines, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_ndjson_export_memory_stays_flat(app, client):
+    """Four times the rows must not need (anywhere near) four times the memory."""
+    with app.app_context():
+        add_users(10)
+        add_posts(50, users=10)
+        add_comments(5000, posts=50, users=10)
+        db.session.commit()
+    small_lines, small_peak = peak_while_streaming(client, '/comments?format=ndjson')
+
+    with app.app_context():
+        add_comments(15000, posts=50, users=10, start=5001)
+        db.session.commit()
+    large_lines, large_peak = peak_while_streaming(client, '/comments?format=ndjson')
+
+    assert (small_lines, large_lines) == (5000, 20000)
+    assert large_peak < small_peak * 1.5 + 1024 * 1024, (small_peak, large_peak)
@@ -0,0 +1,41 @@
+# Standard library imports
+
+# Remote library imports
+
+# Local imports
+from conftest import add_comments, add_posts, add_users
+from config import db
+from querycount import assert_max_queries
+
+
+def test_posts_page_includes_authors_without_n_plus_one(app, client):
+    with app.app_context():
+        add_users(5)
+        add_posts(50, users=5)
+        db.session.commit()
+        engine = db.engine
+
+    # The page with its authors joined in, plus the post counters.
+    with assert_max_queries(engine, 2):
+        response = client.get('/api/posts?include=author&limit=50')
+    assert response.status_code == 200
+    posts = response.get_json()['posts']
+    assert len(posts) == 50
+    assert all(post['author']['id'] == post['user_id'] for post in posts)
+
+
+def test_posts_page_includes_comments(app, client):
+    with app.app_context():
+        add_users(2)
+        add_posts(10, users=2)
+        add_comments(30, posts=10, users=2)
+        db.session.commit()
+
+    response = client.get('/api/posts?include=comments&limit=10')
+    assert response.status_code == 200
+    assert sum(len(post['comments']) for post in response.get_json()['posts']) == 30
+
+
+def test_unknown_include_is_rejected(client):
+    response = client.get('/api/posts?include=commentCount')
+    assert response.status_code == 400
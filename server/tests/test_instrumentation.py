@@ -0,0 +1,62 @@
+# Standard library imports
+
+# Remote library imports
+import pytest
+
+# Local imports
+from conftest import add_users, sign_in
+from config import create_app, db
+from instrumentation import metrics
+
+
+@pytest.fixture
+def scraped_app(app):
+    # The token is read when the route is registered, so build a second app.
+    scraped = create_app(
+        SQLALCHEMY_DATABASE_URI=app.config['SQLALCHEMY_DATABASE_URI'],
+        DB_PROFILE='testing',
+        SECRET_KEY=app.config['SECRET_KEY'],
+        METRICS_TOKEN='scrape-me',
+        SLOW_QUERY_MS=0,
+        TESTING=True,
+    )
+    yield scraped
+    with scraped.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+def test_metrics_need_the_token_or_an_admin(app, scraped_app):
+    with app.app_context():
+        add_users(2)
+        db.session.commit()
+    client = scraped_app.test_client()
+
+    assert client.get('/metrics').status_code == 404
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 404
+    sign_in(client, 2)
+    assert client.get('/metrics').status_code == 404
+
+    response = client.get('/metrics', headers={'Authorization': 'Bearer scrape-me'})
+    assert response.status_code == 200
+    assert b'# TYPE http_requests_total counter' in response.data
+
+    sign_in(client, 1, is_admin=True)
+    assert client.get('/metrics').status_code == 200
+
+
+def test_without_a_token_only_admins_see_metrics(app, client):
+    with app.app_context():
+        add_users(1)
+        db.session.commit()
+
+    assert client.get('/metrics', headers={'Authorization': 'Bearer '}).status_code == 404
+    sign_in(client, 1, is_admin=True)
+    assert client.get('/metrics').status_code == 200
+
+
+def test_slow_queries_are_counted(scraped_app):
+    before = metrics.slow_queries
+    with scraped_app.app_context():
+        db.session.execute(db.select(1))
+    assert metrics.slow_queries > before
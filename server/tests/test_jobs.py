@@ -0,0 +1,132 @@
+# Standard library imports
+import time
+from datetime import datetime, timedelta
+
+# Remote library imports
+import pytest
+from sqlalchemy import event, select
+
+# Local imports
+import jobs
+from config import db
+from models import Job
+
+calls = []
+
+
+@pytest.fixture(autouse=True)
+def handlers(monkeypatch):
+    calls.clear()
+
+    def record(session, **payload):
+        calls.append(payload)
+
+    def fail(session, **payload):
+        raise RuntimeError('boom')
+
+    monkeypatch.setitem(jobs.HANDLERS, 'record', record)
+    monkeypatch.setitem(jobs.HANDLERS, 'fail', fail)
+
+
+def job(job_id):
+    db.session.expire_all()
+    return db.session.get(Job, job_id)
+
+
+def test_idempotency_key_queues_once(app):
+    with app.app_context():
+        assert jobs.enqueue(db.session, 'record', {'n': 1}, key='once')
+        assert not jobs.enqueue(db.session, 'record', {'n': 2}, key='once')
+        assert jobs.enqueue(db.session, 'record', {'n': 3})
+        db.session.commit()
+        assert db.session.scalars(select(Job.payload).order_by(Job.id)).all() == ['{"n": 1}', '{"n": 3}']
+
+        with pytest.raises(ValueError):
+            jobs.enqueue(db.session, 'no_such_kind')
+
+
+def test_claim_takes_each_due_job_once(app):
+    with app.app_context():
+        jobs.enqueue(db.session, 'record', run_at=datetime.utcnow() + timedelta(hours=1))
+        jobs.enqueue(db.session, 'record', {'n': 1})
+        db.session.commit()
+
+        claimed = jobs.claim(db.session, 'w1')
+        assert (claimed.id, claimed.status, claimed.locked_by, claimed.attempts) == (2, 'running', 'w1', 1)
+        # The other job is not due yet and this one is taken.
+        assert jobs.claim(db.session, 'w2') is None
+
+        assert jobs.run(db.session, claimed, 'w1') == 'done'
+        assert calls == [{'n': 1}]
+        assert (job(2).status, job(2).locked_by) == ('done', None)
+
+
+def test_failures_back_off_then_give_up(app):
+    with app.app_context():
+        jobs.enqueue(db.session, 'fail', max_attempts=2)
+        db.session.commit()
+
+        before = datetime.utcnow()
+        assert jobs.run(db.session, jobs.claim(db.session, 'w1'), 'w1') == 'queued'
+        retry = job(1)
+        assert retry.last_error == 'RuntimeError: boom'
+        assert retry.run_at >= before + timedelta(seconds=jobs.retry_delay(1))
+        assert jobs.claim(db.session, 'w1') is None
+
+        db.session.execute(jobs.jobs.update().values(run_at=datetime.utcnow()))
+        db.session.commit()
+        assert jobs.run(db.session, jobs.claim(db.session, 'w1'), 'w1') == 'failed'
+        assert job(1).attempts == 2
+
+    assert [jobs.retry_delay(n) for n in (1, 2, 3)] == [5, 10, 20]
+    assert jobs.retry_delay(20) == jobs.MAX_RETRY_SECONDS
+
+
+def test_expired_lease_is_requeued_and_the_old_worker_loses_it(app):
+    with app.app_context():
+        jobs.enqueue(db.session, 'record', max_attempts=2)
+        db.session.commit()
+        stale = jobs.claim(db.session, 'w1')
+
+        assert jobs.release_expired(db.session, lease=60) == 0
+        db.session.execute(jobs.jobs.update().values(locked_at=datetime.utcnow() - timedelta(minutes=5)))
+        db.session.commit()
+        assert jobs.release_expired(db.session, lease=60) == 1
+        assert (job(1).status, job(1).last_error) == ('queued', 'lease expired')
+
+        fresh = jobs.claim(db.session, 'w2')
+        # w1 finishing late must not overwrite w2's claim.
+        jobs.run(db.session, stale, 'w1')
+        assert (job(1).status, job(1).locked_by) == ('running', 'w2')
+
+        db.session.execute(jobs.jobs.update().values(locked_at=datetime.utcnow() - timedelta(minutes=5)))
+        db.session.commit()
+        jobs.release_expired(db.session, lease=60)
+        assert job(fresh.id).status == 'failed'
+
+
+def test_heartbeat_survives_a_failed_renewal(app, monkeypatch):
+    monkeypatch.setattr(jobs, 'RENEW_RETRY_SECONDS', 0.05)
+    failures = []
+
+    def fail_first_renewal(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('UPDATE jobs') and not failures:
+            failures.append(statement)
+            raise RuntimeError('database is locked')
+
+    with app.app_context():
+        jobs.enqueue(db.session, 'record')
+        db.session.commit()
+        worker = jobs.Worker(app, name='w1', lease=0.3)
+        claimed = jobs.claim(db.session, 'w1')
+        claimed_at = claimed.locked_at
+
+        event.listen(db.engine, 'before_cursor_execute', fail_first_renewal)
+        try:
+            with worker._heartbeat(claimed.id):
+                time.sleep(0.5)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', fail_first_renewal)
+
+        assert len(failures) == 1
+        assert job(claimed.id).locked_at > claimed_at
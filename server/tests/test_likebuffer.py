@@ -0,0 +1,90 @@
+# Standard library imports
+import json
+import os
+
+# Remote library imports
+from sqlalchemy import select
+
+# Local imports
+from conftest import add_comments, add_posts, add_users
+from config import create_app, db
+from likebuffer import LikeBuffer, buffer
+from models import Comment, CommentLike
+
+# Long enough that only explicit flushes write anything.
+NEVER_MS = 3600 * 1000
+
+
+def seed(app):
+    with app.app_context():
+        add_users(1)
+        add_posts(1)
+        add_comments(2)
+        db.session.commit()
+
+
+def likes(app):
+    with app.app_context():
+        return db.session.execute(select(CommentLike.comment_id, CommentLike.user_id)).all()
+
+
+def test_flush_drops_likes_on_missing_rows_instead_of_retrying(app):
+    seed(app)
+    likes_buffer = LikeBuffer()
+    with app.app_context():
+        likes_buffer.start(db.engine, 'memory', NEVER_MS)
+        try:
+            likes_buffer.toggle(db.session, 1, 1)
+            likes_buffer.toggle(db.session, 404, 1)
+            likes_buffer.toggle(db.session, 2, 404)
+            assert likes_buffer.flush() == 3
+            assert likes_buffer.flush() == 0
+            assert db.session.scalar(select(Comment.number_of_likes).where(Comment.id == 1)) == 1
+        finally:
+            likes_buffer.stop()
+    assert likes(app) == [(1, 1)]
+
+
+def test_file_mode_journals_per_process_and_recovers_dead_ones(app, tmp_path):
+    seed(app)
+    journal = str(tmp_path / 'likes.journal')
+    # Left behind by a process that died before flushing.
+    with open(f'{journal}.99999', 'w') as dead:
+        dead.write(json.dumps([2, 1, True]) + '\n')
+    open(f'{journal}.99999.lock', 'w').close()
+
+    likes_buffer = LikeBuffer()
+    with app.app_context():
+        likes_buffer.start(db.engine, 'file', NEVER_MS, journal)
+        assert likes(app) == [(2, 1)]
+        assert likes_buffer.journal_path == f'{journal}.{os.getpid()}'
+
+        likes_buffer.toggle(db.session, 1, 1)
+        with open(likes_buffer.journal_path) as own:
+            assert [json.loads(line) for line in own] == [[1, 1, True]]
+
+        # A second buffer (another worker) leaves a live journal alone.
+        other = LikeBuffer()
+        other._recover(journal)
+        assert os.path.exists(likes_buffer.journal_path)
+        likes_buffer.stop()
+
+    assert sorted(likes(app)) == [(1, 1), (2, 1)]
+    assert not [name for name in os.listdir(tmp_path) if name.startswith('likes.journal')]
+
+
+def test_buffer_starts_with_the_first_request(tmp_path):
+    app = create_app(
+        SQLALCHEMY_DATABASE_URI=f'sqlite:///{tmp_path / "lazy.db"}',
+        DB_PROFILE='testing',
+        LIKE_BUFFER='memory',
+        TESTING=True,
+    )
+    try:
+        assert not buffer.enabled
+        app.test_client().get('/')
+        assert buffer.enabled
+    finally:
+        buffer.start(None, 'off')
+        with app.app_context():
+            db.engine.dispose()
@@ -0,0 +1,50 @@
+# Standard library imports
+
+# Remote library imports
+from sqlalchemy import delete, false, select
+
+# Local imports
+import likes
+from conftest import add_comments, add_posts, add_users
+from config import db
+from likes import IN_CHUNK_SIZE, liked_comment_ids, toggle_like
+from models import Comment, CommentLike
+
+
+def likes_of(comment_id):
+    return db.session.scalar(select(Comment.number_of_likes).where(Comment.id == comment_id))
+
+
+def test_toggle_like_counts_only_rows_it_changed(app, monkeypatch):
+    with app.app_context():
+        add_users(1)
+        add_posts(1)
+        add_comments(1)
+        db.session.commit()
+
+        assert toggle_like(db.session, 1, 1) is True
+        assert likes_of(1) == 1
+        assert toggle_like(db.session, 1, 1) is False
+        assert likes_of(1) == 0
+
+        # Two unlikes at once: both inserts conflict, but the row is gone by
+        # the time the loser deletes, so its count must not move.
+        assert toggle_like(db.session, 1, 1) is True
+        monkeypatch.setattr(likes, 'delete', lambda model: delete(model).where(false()))
+        assert toggle_like(db.session, 1, 1) is False
+        assert likes_of(1) == 1
+
+
+def test_liked_comment_ids_chunks_large_pages(app):
+    count = IN_CHUNK_SIZE * 2 + 1
+    with app.app_context():
+        add_users(1)
+        add_posts(1)
+        add_comments(count)
+        db.session.execute(CommentLike.__table__.insert(), [
+            {'comment_id': comment_id, 'user_id': 1} for comment_id in range(1, count + 1, 2)
+        ])
+        db.session.commit()
+
+        liked = liked_comment_ids(db.session, 1, range(1, count + 1))
+        assert liked == set(range(1, count + 1, 2))
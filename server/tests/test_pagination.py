@@ -0,0 +1,106 @@
+# Standard library imports
+from datetime import datetime, timedelta
+
+# Remote library imports
+import pytest
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+
+# Local imports
+from conftest import add_comments, add_posts, add_users, sign_in
+from config import db
+from models import Post
+
+
+def walk(client, path, key='posts'):
+    seen, cursor = [], None
+    while True:
+        response = client.get(path + (f'&cursor={cursor}' if cursor else ''))
+        assert response.status_code == 200, response.get_json()
+        body = response.get_json()
+        seen.extend(item['id'] for item in body[key])
+        cursor = body['nextCursor']
+        if not cursor:
+            return seen
+
+
+def test_nullable_sort_key_pages_without_null_rows(app, client):
+    with app.app_context():
+        add_users(1)
+        add_posts(7)
+        now = datetime.utcnow()
+        for post_id in (2, 3, 5):
+            db.session.execute(update(Post).where(Post.id == post_id).values(last_comment_at=now - timedelta(hours=post_id)))
+        db.session.commit()
+
+    assert walk(client, '/api/posts?sort=active&limit=1') == [2, 3, 5]
+    assert walk(client, '/api/posts?sort=active&order=asc&limit=2') == [5, 3, 2]
+
+
+def test_sort_keys_are_required(app):
+    with app.app_context():
+        add_users(1)
+        add_posts(1)
+        with pytest.raises(IntegrityError):
+            db.session.execute(update(Post).values(updated_at=None))
+        db.session.rollback()
+
+
+def test_cursor_walks_comments_and_users(app, client):
+    with app.app_context():
+        add_users(5)
+        add_posts(1)
+        add_comments(7, users=5)
+        db.session.commit()
+    sign_in(client, 1, is_admin=True)
+
+    assert walk(client, '/api/comments?limit=3', 'comments') == [7, 6, 5, 4, 3, 2, 1]
+    assert walk(client, '/api/comments?limit=3&sort=asc', 'comments') == [1, 2, 3, 4, 5, 6, 7]
+    assert walk(client, '/api/users?limit=2', 'users') == [5, 4, 3, 2, 1]
+
+
+def test_before_walks_back_to_the_previous_page(app, client):
+    with app.app_context():
+        add_users(1)
+        add_posts(7)
+        db.session.commit()
+
+    first = client.get('/api/posts?limit=3').get_json()
+    assert first['prevCursor'] is None
+    second = client.get(f"/api/posts?limit=3&cursor={first['nextCursor']}").get_json()
+    assert [post['id'] for post in second['posts']] == [4, 3, 2]
+
+    back = client.get(f"/api/posts?limit=3&before={second['prevCursor']}").get_json()
+    assert [post['id'] for post in back['posts']] == [7, 6, 5]
+    assert back['nextCursor'] and back['prevCursor'] is None
+
+
+@pytest.mark.parametrize('query, error', [
+    ('cursor=not-a-cursor', 'Invalid cursor'),
+    ('before=bm90LWpzb24', 'Invalid cursor'),
+    ('limit=ten', 'limit must be an integer'),
+    ('startIndex=x', 'startIndex must be an integer'),
+    ('startIndex=-1', 'startIndex must be at least 0'),
+])
+def test_bad_paging_arguments_are_a_400(app, client, query, error):
+    with app.app_context():
+        add_users(1)
+        add_posts(2)
+        db.session.commit()
+    sign_in(client, 1, is_admin=True)
+
+    for path in ('/api/posts', '/api/comments', '/api/users'):
+        response = client.get(f'{path}?{query}')
+        assert response.status_code == 400, path
+        assert response.get_json() == {'error': error}
+
+
+def test_bad_search_paging_arguments_are_a_400(app, client):
+    with app.app_context():
+        add_users(1)
+        add_posts(2)
+        db.session.commit()
+
+    for query, error in (('limit=ten', 'limit must be an integer'), ('startIndex=-3', 'startIndex must be at least 0')):
+        response = client.get(f'/api/posts?searchTerm=post&{query}')
+        assert (response.status_code, response.get_json()) == (400, {'error': error})
@@ -0,0 +1,85 @@
+# Standard library imports
+import threading
+from contextlib import contextmanager
+
+# Remote library imports
+import pytest
+from sqlalchemy import insert
+from werkzeug.security import generate_password_hash
+
+# Local imports
+import passwords
+from config import db
+from models import User
+from passwords import HasherBusy, PasswordHasher
+
+
+@contextmanager
+def occupied(hasher):
+    """Hold every pool slot of ``hasher`` until the block exits."""
+    release = threading.Event()
+    started = threading.Event()
+
+    def block():
+        started.set()
+        release.wait()
+
+    thread = threading.Thread(target=hasher._run, args=(block,))
+    thread.start()
+    started.wait()
+    try:
+        yield
+    finally:
+        release.set()
+        thread.join()
+
+
+def test_calls_beyond_the_pool_and_queue_are_refused():
+    hasher = PasswordHasher(rounds=4, workers=1, queue=0, timeout=0.05)
+    with occupied(hasher):
+        with pytest.raises(HasherBusy):
+            hasher.hash('secret')
+    hashed = hasher.hash('secret')
+    assert passwords.cost(hashed) == 4
+    assert hasher.check('secret', hashed)
+
+
+def add_user(password_hash):
+    db.session.execute(insert(User).values(
+        id=1, username='ada', email='ada@example.com', password=password_hash,
+    ))
+    db.session.commit()
+
+
+def test_a_busy_hasher_is_a_503(app, client):
+    with app.app_context():
+        add_user(passwords.hash_password('secret'))
+    app.config.update(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_QUEUE=0, PASSWORD_HASH_TIMEOUT=0.05)
+    passwords.init_app(app)
+
+    with occupied(passwords.hasher):
+        response = client.post('/api/signin', json={'email': 'ada@example.com', 'password': 'secret'})
+        assert response.status_code == 503
+        assert 'try again' in response.get_json()['error']
+        response = client.post('/api/signup', json={'username': 'bob', 'email': 'bob@example.com', 'password': 'secret'})
+        assert response.status_code == 503
+    assert client.post('/api/signin', json={'email': 'ada@example.com', 'password': 'secret'}).status_code == 200
+
+
+@pytest.mark.parametrize('old_hash', [
+    lambda: generate_password_hash('secret'),
+    lambda: passwords._hash('secret', 5),
+])
+def test_signin_upgrades_outdated_hashes(app, client, old_hash):
+    with app.app_context():
+        add_user(old_hash())
+
+    assert client.post('/api/signin', json={'email': 'ada@example.com', 'password': 'wrong'}).status_code == 400
+    response = client.post('/api/signin', json={'email': 'ada@example.com', 'password': 'secret'})
+    assert response.status_code == 200
+
+    with app.app_context():
+        stored = db.session.get(User, 1).password
+    assert passwords.is_bcrypt(stored) and passwords.cost(stored) == app.config['BCRYPT_LOG_ROUNDS']
+    assert not passwords.needs_rehash(stored)
+    assert client.post('/api/signin', json={'email': 'ada@example.com', 'password': 'secret'}).status_code == 200
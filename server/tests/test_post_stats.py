@@ -0,0 +1,79 @@
+# Standard library imports
+from datetime import datetime, timedelta
+
+# Remote library imports
+from sqlalchemy import func, select, update
+
+# Local imports
+from conftest import add_comments, add_posts, add_users
+from config import db
+from counters import reconcile_posts
+from deletes import delete_comments
+from models import Comment, Post
+
+EARLY = datetime(2026, 1, 1)
+
+
+def stats(post_id):
+    db.session.expire_all()
+    return db.session.execute(
+        select(Post.comment_count, Post.last_comment_at, Post.updated_at).where(Post.id == post_id)
+    ).one()
+
+
+def comment(post_id, minutes):
+    return Comment(post_id=post_id, user_id=1, content='Hi', created_at=EARLY + timedelta(minutes=minutes))
+
+
+def test_comment_writes_keep_the_post_stats(app):
+    with app.app_context():
+        add_users(1)
+        add_posts(2)
+        db.session.commit()
+        updated_at = stats(1).updated_at
+
+        first, newest = comment(1, 1), comment(1, 5)
+        db.session.add_all([first, newest, comment(2, 3)])
+        db.session.commit()
+        # Comment activity is not an edit of the post.
+        assert stats(1) == (2, EARLY + timedelta(minutes=5), updated_at)
+        assert stats(2)[:2] == (1, EARLY + timedelta(minutes=3))
+
+        db.session.delete(newest)
+        db.session.commit()
+        assert stats(1)[:2] == (1, EARLY + timedelta(minutes=1))
+
+        delete_comments(db.session, [first.id])
+        db.session.commit()
+        assert stats(1)[:2] == (0, None)
+
+
+def test_listing_sorts_by_the_stats(app, client):
+    with app.app_context():
+        add_users(1)
+        add_posts(3)
+        db.session.add_all([comment(1, 9), comment(2, 1), comment(2, 2)])
+        db.session.commit()
+
+    def ids(sort):
+        return [post['id'] for post in client.get(f'/api/posts?sort={sort}').get_json()['posts']]
+
+    assert ids('discussed') == [2, 1, 3]
+    # Posts without comments have no last_comment_at and are left out.
+    assert ids('active') == [1, 2]
+
+
+def test_reconcile_repairs_bulk_writes(app):
+    with app.app_context():
+        add_users(1)
+        add_posts(2)
+        add_comments(4, posts=2)
+        db.session.commit()
+        assert stats(1)[0] == stats(2)[0] == 0
+
+        db.session.execute(update(Post).where(Post.id == 2).values(comment_count=40, updated_at=Post.updated_at))
+        db.session.commit()
+        reconcile_posts(db.session)
+        latest = db.session.scalar(select(func.max(Comment.created_at)).where(Comment.post_id == 1))
+        assert stats(1)[:2] == (2, latest)
+        assert stats(2)[0] == 2
@@ -0,0 +1,20 @@
+# Standard library imports
+
+# Remote library imports
+from sqlalchemy import create_engine
+
+# Local imports
+from config import db
+from queryplans import CHECKS, check_plans
+
+
+def test_every_listing_query_uses_an_index():
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine)
+    assert len(CHECKS) and check_plans(engine) == {}
+
+
+def test_check_plans_command(app):
+    result = app.test_cli_runner().invoke(args=['check-plans'])
+    assert result.exit_code == 0, result.output
+    assert f'{len(CHECKS)} query plans OK.' in result.output
@@ -0,0 +1,78 @@
+# Standard library imports
+import importlib.util
+from datetime import datetime
+from pathlib import Path
+
+# Remote library imports
+import pytest
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import insert
+
+# Local imports
+import search
+from conftest import add_users
+from config import db
+from models import Post
+
+FTS_MIGRATION = Path(__file__).resolve().parent.parent / 'migrations' / 'versions' / '8f4a6b1d2c07_add_posts_fts_index.py'
+
+
+def run_fts_migration(connection):
+    """Create posts_fts and its triggers with the migration's own DDL."""
+    spec = importlib.util.spec_from_file_location('add_posts_fts_index', FTS_MIGRATION)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    with Operations.context(MigrationContext.configure(connection)):
+        migration.upgrade()
+
+
+@pytest.fixture
+def fts_app(app):
+    with app.app_context():
+        add_users(2)
+        now = datetime.utcnow()
+        db.session.execute(insert(Post), [
+            {'id': 1, 'user_id': 1, 'title': 'Baking bread', 'slug': 'baking-bread', 'category': 'python',
+             'content': 'Flour, water and a long proof.', 'created_at': now, 'updated_at': now},
+            {'id': 2, 'user_id': 2, 'title': 'Weekend notes', 'slug': 'weekend-notes', 'category': 'reactjs',
+             'content': 'Mostly gardening, then some bread at the end.', 'created_at': now, 'updated_at': now},
+            {'id': 3, 'user_id': 1, 'title': 'Sourdough starters', 'slug': 'sourdough-starters', 'category': 'python',
+             'content': 'Feed it daily.', 'created_at': now, 'updated_at': now},
+        ])
+        db.session.commit()
+        with db.engine.begin() as connection:
+            run_fts_migration(connection)
+        assert search.has_fts(db.session)
+    return app
+
+
+def search_ids(client, query):
+    response = client.get(f'/api/posts?{query}')
+    assert response.status_code == 200
+    # A failed MATCH would silently fall back to the in-process index.
+    with client.application.app_context():
+        assert search.has_fts(db.session)
+    return [post['id'] for post in response.get_json()['posts']], response.get_json()['highlights']
+
+
+def test_title_matches_rank_above_content_matches(fts_app, client):
+    ids, highlights = search_ids(client, 'searchTerm=bread')
+    assert ids == [1, 2]
+    assert highlights['1']['title'] == 'Baking <mark>bread</mark>'
+    assert '<mark>bread</mark>' in highlights['2']['content']
+
+
+def test_update_trigger_reindexes_the_new_title(fts_app, client):
+    with fts_app.app_context():
+        db.session.get(Post, 3).title = 'Rye loaves'
+        db.session.commit()
+
+    assert search_ids(client, 'searchTerm=sourdough')[0] == []
+    assert search_ids(client, 'searchTerm=rye')[0] == [3]
+
+
+def test_search_applies_the_listing_filters(fts_app, client):
+    assert search_ids(client, 'searchTerm=bread&category=reactjs')[0] == [2]
+    assert search_ids(client, 'searchTerm=bread&userId=1')[0] == [1]
+    assert search_ids(client, 'searchTerm=bread&limit=1&startIndex=1')[0] == [2]
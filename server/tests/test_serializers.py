@@ -0,0 +1,51 @@
+# Standard library imports
+import json
+from datetime import datetime
+
+# Remote library imports
+import pytest
+from sqlalchemy import select
+
+# Local imports
+from conftest import add_comments, add_posts, add_users
+from config import db
+from models import Post
+from serializers import POST_SCHEMA, dumps, iter_json_array, iter_ndjson
+
+
+def test_dumps_is_compact_and_writes_iso_datetimes():
+    assert dumps({'a': [1, 2], 'at': datetime(2024, 5, 1, 12, 30)}) == b'{"a":[1,2],"at":"2024-05-01T12:30:00"}'
+
+
+@pytest.mark.parametrize('count', [0, 1, 3, 4, 7])
+def test_streamed_arrays_are_valid_json_at_every_chunk_boundary(count):
+    items = [{'id': i} for i in range(count)]
+    assert json.loads(b''.join(iter_json_array(items, chunk_size=3))) == items
+    lines = b''.join(iter_ndjson(items, chunk_size=3)).splitlines()
+    assert [json.loads(line) for line in lines] == items
+
+
+def test_rows_and_objects_dump_the_same(app):
+    with app.app_context():
+        add_users(1)
+        add_posts(2)
+        db.session.commit()
+        from_rows = POST_SCHEMA.dump_rows(db.session.execute(POST_SCHEMA.select().order_by(Post.id)))
+        from_objects = [POST_SCHEMA.dump_object(post) for post in db.session.scalars(select(Post).order_by(Post.id))]
+    assert from_rows == from_objects
+    assert list(from_rows[0]) == list(POST_SCHEMA.keys)
+
+
+def test_exports_stream_the_schema_projection(app, client):
+    with app.app_context():
+        add_users(2)
+        add_posts(3, users=2)
+        add_comments(5, posts=3, users=2)
+        db.session.commit()
+
+    posts = client.get('/posts').get_json()
+    assert [post['id'] for post in posts] == [1, 2, 3]
+    assert set(posts[0]) == set(POST_SCHEMA.keys)
+    comments = client.get('/comments').get_json()
+    assert [comment['likes'] for comment in comments] == [[]] * 5
+    assert 'password' not in client.get('/users').get_json()[0]
@@ -0,0 +1,65 @@
+# Standard library imports
+from datetime import datetime
+
+# Remote library imports
+import pytest
+from sqlalchemy import insert
+
+# Local imports
+from conftest import add_users, sign_in
+from config import db
+from deletes import delete_posts
+from models import Post
+from slugs import slug_ids, slugify, unique_slugs
+
+
+@pytest.fixture(autouse=True)
+def empty_slug_cache():
+    slug_ids.clear()
+
+
+def test_slugify():
+    assert slugify('Héllo, Wörld!') == 'hello-world'
+    assert slugify('  SQLite & Python 3.11  ') == 'sqlite-python-3-11'
+    assert slugify('日本語') == 'post'
+
+
+def test_unique_slugs_continue_after_the_highest_suffix(app):
+    with app.app_context():
+        add_users(1)
+        now = datetime.utcnow()
+        db.session.execute(insert(Post), [
+            {'user_id': 1, 'title': title, 'slug': slug, 'content': 'Body', 'created_at': now, 'updated_at': now}
+            for title, slug in (('A', 'hello-world'), ('B', 'hello-world-3'), ('C', 'hello-worlds'), ('D', 'hello-world-x'))
+        ])
+        db.session.commit()
+
+        assert unique_slugs(db.session, ['Hello world', 'Other', 'Hello, World!']) == [
+            'hello-world-4', 'other', 'hello-world-5',
+        ]
+        assert unique_slugs(db.session, ['Other'], reserved=['other', 'other-2']) == ['other-3']
+
+
+def test_get_post_by_slug(app, client):
+    with app.app_context():
+        add_users(1)
+        db.session.commit()
+    sign_in(client, 1, is_admin=True)
+
+    for title in ('Hello, World!', 'Hello World'):
+        assert client.post('/api/posts', json={'title': title, 'content': 'Body'}).status_code == 201
+
+    response = client.get('/api/posts/hello-world-2')
+    assert response.status_code == 200
+    post = response.get_json()
+    assert (post['title'], post['slug']) == ('Hello World', 'hello-world-2')
+
+    # Slugs stay put when the title changes.
+    assert client.put(f"/api/posts/{post['id']}", json={'title': 'Renamed'}).status_code == 200
+    assert client.get('/api/posts/hello-world-2').get_json()['title'] == 'Renamed'
+
+    with app.app_context():
+        delete_posts(db.session, [post['id']])
+    assert client.get('/api/posts/hello-world-2').status_code == 404
+    assert client.get('/api/posts/no-such-post').status_code == 404
+    assert client.get('/api/posts/hello-world').status_code == 200
@@ -0,0 +1,68 @@
+# Standard library imports
+
+# Remote library imports
+import pytest
+
+# Local imports
+from conftest import add_posts, add_users
+from config import db
+
+
+@pytest.fixture
+def thread(app, client):
+    """Post 1 with a chain a > b > c > d and a second root e; returns their ids."""
+    with app.app_context():
+        add_users(2)
+        add_posts(1)
+        db.session.commit()
+
+    ids = {}
+    for name, parent in (('a', None), ('b', 'a'), ('c', 'b'), ('d', 'c'), ('e', None)):
+        response = client.post('/api/comments', json={
+            'postId': 1, 'userId': 1, 'content': name, 'parentId': ids.get(parent),
+        })
+        assert response.status_code == 200, response.get_json()
+        ids[name] = response.get_json()['id']
+    return ids
+
+
+def shape(nodes):
+    return [(node['content'], shape(node['replies'])) for node in nodes]
+
+
+def test_thread_nests_replies_down_to_the_depth(client, thread):
+    body = client.get('/api/comments/1/thread').get_json()
+    assert shape(body['comments']) == [('a', [('b', [('c', [])])]), ('e', [])]
+    assert body['nextCursor'] is None
+    a = body['comments'][0]
+    assert (a['depth'], a['replyCount'], a['replies'][0]['parentId']) == (0, 1, thread['a'])
+
+    body = client.get('/api/comments/1/thread?depth=10').get_json()
+    assert shape(body['comments']) == [('a', [('b', [('c', [('d', [])])])]), ('e', [])]
+
+
+def test_thread_under_one_comment(client, thread):
+    body = client.get(f"/api/comments/1/thread?parentId={thread['b']}&depth=1").get_json()
+    assert shape(body['comments']) == [('c', [])]
+    assert client.get('/api/comments/1/thread?parentId=999').status_code == 404
+
+
+def test_thread_pages_in_path_order(client, thread):
+    first = client.get('/api/comments/1/thread?limit=2').get_json()
+    assert shape(first['comments']) == [('a', [('b', [])])]
+    second = client.get(f"/api/comments/1/thread?limit=2&cursor={first['nextCursor']}").get_json()
+    # c's parent was on the previous page, so it comes back as a top-level node.
+    assert shape(second['comments']) == [('c', []), ('e', [])]
+    assert second['nextCursor'] is None
+
+    response = client.get('/api/comments/1/thread?cursor=../etc')
+    assert (response.status_code, response.get_json()) == (400, {'error': 'Invalid cursor'})
+
+
+def test_thread_marks_the_users_likes(client, thread):
+    assert client.put(f"/api/comments/{thread['c']}/like", json={'userId': 2}).get_json()['likedByUser']
+
+    body = client.get('/api/comments/1/thread?userId=2').get_json()
+    c = body['comments'][0]['replies'][0]['replies'][0]
+    assert (c['content'], c['likedByUser'], c['numberOfLikes']) == ('c', True, 1)
+    assert not body['comments'][0]['likedByUser']
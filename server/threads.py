@@ -0,0 +1,177 @@
+# Standard library imports
+import re
+from collections import namedtuple
+
+# Remote library imports
+from sqlalchemy import bindparam, select
+from sqlalchemy.orm import aliased
+from sqlalchemy.orm.attributes import set_committed_value
+
+# Local imports
+from likes import liked_comment_ids
+from models import Comment
+from pagination import InvalidCursor
+from sqlhelpers import listen_all
+
+SEGMENT_WIDTH = 10
+DEFAULT_DEPTH = 3
+MAX_DEPTH = 20
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+# Sorts after every digit and '/', so ``[path, path + PATH_END)`` is the
+# subtree under ``path`` as an index range.
+PATH_END = '~'
+PATH_PATTERN = re.compile(r'(\d{%d}/)+' % SEGMENT_WIDTH)
+
+Thread = namedtuple('Thread', ['comments', 'next_cursor'])
+
+comments = Comment.__table__
+
+
+def segment(comment_id):
+    return f'{comment_id:0{SEGMENT_WIDTH}d}/'
+
+
+def _assign_path(mapper, connection, target):
+    # The id only exists once the row is in, so the path is set right after.
+    path, depth = segment(target.id), 0
+    if target.parent_id:
+        parent_path, parent_depth = connection.execute(
+            select(comments.c.path, comments.c.depth).where(comments.c.id == target.parent_id)
+        ).one()
+        path, depth = parent_path + path, parent_depth + 1
+        connection.execute(
+            comments.update().where(comments.c.id == target.parent_id)
+            .values(reply_count=comments.c.reply_count + 1, updated_at=comments.c.updated_at)
+        )
+    connection.execute(
+        comments.update().where(comments.c.id == target.id)
+        .values(path=path, depth=depth, updated_at=comments.c.updated_at)
+    )
+    set_committed_value(target, 'path', path)
+    set_committed_value(target, 'depth', depth)
+
+
+def _release_parent(mapper, connection, target):
+    if target.parent_id:
+        connection.execute(
+            comments.update().where(comments.c.id == target.parent_id)
+            .values(reply_count=comments.c.reply_count - 1, updated_at=comments.c.updated_at)
+        )
+
+
+def init_app(app):
+    """Keep comment paths and reply counts current on every ORM insert and delete."""
+    listen_all(Comment, [
+        ('after_insert', _assign_path),
+        ('after_delete', _release_parent),
+    ])
+
+
+def record_inserts(session, rows, ids, parents):
+    """Give bulk-inserted comments their paths, which the insert event never saw.
+
+    ``rows`` and ``ids`` are the inserted rows and their new ids in order,
+    ``parents`` maps each ``parent_id`` used to its ``(path, depth)``.
+    """
+    paths = []
+    replies = {}
+    for row, comment_id in zip(rows, ids):
+        parent = parents.get(row.get('parent_id'))
+        paths.append({
+            'b_id': comment_id,
+            'b_path': (parent[0] if parent else '') + segment(comment_id),
+            'b_depth': parent[1] + 1 if parent else 0,
+        })
+        if parent:
+            replies[row['parent_id']] = replies.get(row['parent_id'], 0) + 1
+
+    session.execute(
+        comments.update().where(comments.c.id == bindparam('b_id'))
+        .values(path=bindparam('b_path'), depth=bindparam('b_depth'), updated_at=comments.c.updated_at),
+        paths,
+    )
+    if replies:
+        session.execute(
+            comments.update().where(comments.c.id == bindparam('b_id'))
+            .values(reply_count=comments.c.reply_count + bindparam('b_count'), updated_at=comments.c.updated_at),
+            [{'b_id': parent_id, 'b_count': count} for parent_id, count in replies.items()],
+        )
+
+
+def in_subtree(column, path):
+    return (column >= path) & (column < path + PATH_END)
+
+
+def thread_statement(post_id, parent_id, depth, limit, cursor):
+    columns = (
+        Comment.id, Comment.content, Comment.post_id, Comment.user_id, Comment.parent_id,
+        Comment.depth, Comment.reply_count, Comment.number_of_likes, Comment.created_at,
+        Comment.updated_at, Comment.path,
+    )
+    if parent_id:
+        parent = aliased(Comment)
+        stmt = select(*columns).join(parent, parent.id == parent_id).where(
+            Comment.post_id == post_id,
+            Comment.path > parent.path,
+            Comment.path < parent.path + PATH_END,
+            Comment.depth <= parent.depth + depth,
+        )
+    else:
+        stmt = select(*columns).where(Comment.post_id == post_id, Comment.depth < depth)
+    if cursor:
+        stmt = stmt.where(Comment.path > cursor)
+    return stmt.order_by(Comment.path).limit(limit + 1)
+
+
+def load_thread(session, post_id, args, merge_pending=None):
+    """Return one page of a post's comment tree, or ``None`` if ``parentId`` is unknown.
+
+    ``parentId`` narrows it to the replies under one comment, ``depth``
+    bounds how many levels below that are returned and ``limit`` how many
+    comments. Comments come back in thread order, nested under their parent
+    when it is on the same page; ``cursor`` continues after the last one,
+    so a hot thread renders its first screen from one short index range.
+    ``merge_pending(nodes, user_id)`` folds in likes not written yet.
+    """
+    parent_id = args.get('parentId', type=int)
+    depth = max(1, min(args.get('depth', DEFAULT_DEPTH, type=int), MAX_DEPTH))
+    limit = max(1, min(args.get('limit', DEFAULT_LIMIT, type=int), MAX_LIMIT))
+    cursor = args.get('cursor')
+    if cursor and not PATH_PATTERN.fullmatch(cursor):
+        raise InvalidCursor('Invalid cursor')
+
+    rows = session.execute(thread_statement(post_id, parent_id, depth, limit, cursor)).all()
+    if not rows and parent_id and session.get(Comment, parent_id) is None:
+        return None
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    user_id = args.get('userId', type=int)
+    liked = liked_comment_ids(session, user_id, [row.id for row in rows])
+
+    nodes = {}
+    roots = []
+    for row in rows:
+        node = {
+            'id': row.id,
+            'content': row.content,
+            'postId': row.post_id,
+            'userId': row.user_id,
+            'parentId': row.parent_id,
+            'depth': row.depth,
+            'replyCount': row.reply_count,
+            'numberOfLikes': row.number_of_likes,
+            'likedByUser': row.id in liked,
+            'createdAt': row.created_at,
+            'updatedAt': row.updated_at,
+            'replies': [],
+        }
+        nodes[row.id] = node
+        parent = nodes.get(row.parent_id)
+        (parent['replies'] if parent else roots).append(node)
+
+    if merge_pending is not None:
+        merge_pending(nodes.values(), user_id)
+    return Thread(roots, rows[-1].path if has_more else None)